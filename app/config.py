@@ -2,14 +2,95 @@ import os
 
 # Timeouts
 HTTP_TIMEOUT = 5.0  # seconds
-PORT_SCAN_TIMEOUT = 1.0  # seconds per port
+PORT_SCAN_TIMEOUT = 1.0  # seconds per port (upper bound; shrinks to the observed RTT)
+PORT_SCAN_MIN_TIMEOUT = 0.2  # lower bound for the adaptive per-host timeout
+TLS_TIMEOUT = 5.0  # seconds per handshake
+
+# TLS handshake concurrency (asyncio checker)
+TLS_MAX_CONCURRENCY = 500
+TLS_PER_HOST_CONCURRENCY = 2
+
+# HTTP connection pool (shared by the passive checkers of a scan run)
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept open
+
+# HTTP probing
+# "stream": read the status line and headers, drain at most HTTP_PROBE_MAX_BYTES of body
+# "head":   HEAD request, falling back to a streamed GET when HEAD is rejected
+# "get":    download the full body (legacy behaviour)
+HTTP_PROBE_MODE = "stream"
+HTTP_PROBE_MAX_BYTES = 16384  # bodies that fit are drained so the connection stays reusable
 
 # Ports
 DEFAULT_PORTS = [21, 22, 80, 443, 3306, 5432, 6379]
 
+# Port scanning concurrency (adapts between MIN and MAX, capped by the fd limit)
+PORT_SCAN_INITIAL_CONCURRENCY = 256
+PORT_SCAN_MIN_CONCURRENCY = 16
+PORT_SCAN_MAX_CONCURRENCY = 2048
+PORT_SCAN_FD_RESERVE = 64  # descriptors kept free for everything else
+PORT_SCAN_FD_RETRIES = 8  # retries of a probe that ran out of descriptors, with doubling waits
+
+# DNS
+DNS_CACHE_TTL = 300  # seconds a resolved address set is reused
+DNS_CACHE_SIZE = 10000  # hostnames kept in the in-process cache
+
+# Domain normalization (offline: the public suffix list is never downloaded)
+SUFFIX_LIST_FILE = os.environ.get("CYBERSAFE_SUFFIX_LIST")  # pinned public_suffix_list.dat; default: tldextract's bundled snapshot
+DOMAIN_CACHE_SIZE = 65536  # normalized inputs memoized in-process
+
+# Host health: unreachable hosts are skipped with exponential backoff
+HEALTH_BACKOFF_BASE = 60.0  # seconds after the first failure
+HEALTH_BACKOFF_MAX = 6 * 3600.0
+HEALTH_MAX_HOSTS = 100000  # failing hosts remembered in-process
+
+# Bulk scanning (python -m app.scan)
+BULK_CONCURRENCY = 50  # targets scanned at the same time
+
+# Recurring monitoring (python -m app.scheduler)
+SCHEDULER_CONCURRENCY = 20  # global budget: scans in flight across every domain set
+SCHEDULER_JITTER = 0.1  # each run moves by up to +/- this fraction of the set's interval
+
+# Background scan jobs (Streamlit UI)
+JOB_WORKERS = 4  # scans executed concurrently
+JOB_QUEUE_DEPTH = 100  # pending jobs accepted before submissions are refused
+JOB_POLL_INTERVAL = 1.0  # seconds between UI refreshes while a job runs
+
+# Report exports
+REPORT_PDF_WORKERS = 2  # processes rendering PDFs, off the UI and scan threads
+REPORT_CACHE_TTL = 86400  # rendered artifacts are keyed by a hash of the results
+REPORT_STREAM_CHUNK_SIZE = 65536  # characters buffered per chunk when streaming HTML
+PORTFOLIO_CHUNK_SIZE = 250  # domains per PDF chunk in portfolio reports
+PORTFOLIO_PDF_WORKERS = os.cpu_count() or 1  # processes rendering portfolio PDF chunks
+
+# Metrics (timing histograms and counters, exported in the Prometheus text format)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # histogram bounds, seconds
+METRICS_WRITE_INTERVAL = 15.0  # seconds between rewrites of a --metrics file during long runs
+
 # Caching
 CACHE_DIR = os.path.join(os.getcwd(), ".cache")
 CACHE_TTL = 43200  # 12 hours in seconds
+JOBS_DIR = os.path.join(CACHE_DIR, "jobs")
+JOB_TTL = 86400  # job records (status and results) are kept for a day
+REPORT_TEMPLATE_CACHE_DIR = os.path.join(CACHE_DIR, "templates")  # compiled Jinja bytecode
+
+# Scan history (permanent, unlike the cache)
+DATA_DIR = os.path.join(os.getcwd(), ".data")
+HISTORY_DB = os.environ.get("CYBERSAFE_HISTORY_DB", os.path.join(DATA_DIR, "history.sqlite3"))
+MEMORY_CACHE_SIZE = 1024  # entries kept in the in-process tier in front of diskcache
+
+# Per-module result TTLs (seconds); a scan only re-runs the modules whose entry is stale
+MODULE_CACHE_TTLS = {
+    "headers": 3600,
+    "cors": 3600,
+    "methods": 3600,
+    "tls": 21600,  # minimum; extended up to the expiry warning threshold (see TLS_CACHE_MAX_TTL)
+    "ports": 1800,
+}
+TLS_CACHE_MAX_TTL = 7 * 86400
+TLS_EXPIRY_WARNING_DAYS = 30  # certificates closer to expiry than this are flagged
+INCREMENTAL_STATE_TTL = 30 * 86400  # validators (ETag, certificate fingerprint) kept for incremental rescans
 
 # Scoring Weights
 WEIGHTS = {
@@ -20,5 +101,8 @@ WEIGHTS = {
     "ports": 10,
 }
 
+# CORS probe: sent as the Origin of the shared GET so reflection can be detected
+CORS_PROBE_ORIGIN = "https://evil.com"
+
 # User Agent
 USER_AGENT = "Cybersafe/1.0 (Security Hygiene Checker; +https://github.com/yourusername/cybersafe)"
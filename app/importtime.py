@@ -0,0 +1,66 @@
+"""Import-time profiler: what importing a module costs, per module and per top-level package."""
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def profile_imports(module: str = "app.main") -> List[Dict[str, Any]]:
+    """
+    Imports `module` in a subprocess and returns one entry per module imported:
+    {"module", "self_us", "cumulative_us", "depth"} in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    if proc.returncode != 0 and not entries:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()}")
+    return entries
+
+def by_package(entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Self time (µs) summed per top-level package, most expensive first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        totals[entry["module"].split(".")[0]] += entry["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def total_us(entries: List[Dict[str, Any]]) -> int:
+    """Total import time (µs) of the profiled module, including everything it pulled in."""
+    return sum(entry["self_us"] for entry in entries)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.importtime", description="Per-module import cost of a Cybersafe entry point.")
+    parser.add_argument("module", nargs="?", default="app.main", help="Module to import (default: app.main).")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table.")
+    args = parser.parse_args(argv)
+
+    entries = profile_imports(args.module)
+    print(f"import {args.module}: {total_us(entries) / 1000:.1f} ms, {len(entries)} modules\n")
+
+    print("By package (self time):")
+    for package, us in list(by_package(entries).items())[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {package}")
+
+    print("\nSlowest modules (self time):")
+    for entry in sorted(entries, key=lambda e: e["self_us"], reverse=True)[:args.top]:
+        print(f"  {entry['self_us'] / 1000:8.1f} ms  {entry['module']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
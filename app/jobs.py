@@ -0,0 +1,211 @@
+"""Background scan jobs, run off the Streamlit request path and persisted in diskcache."""
+import asyncio
+import datetime
+import threading
+import uuid
+import diskcache
+from typing import Any, Dict, List, Optional
+
+from app.config import (
+    JOBS_DIR,
+    JOB_TTL,
+    JOB_WORKERS,
+    JOB_QUEUE_DEPTH,
+    TLS_MAX_CONCURRENCY,
+    TLS_PER_HOST_CONCURRENCY,
+)
+from app.pipeline import scan_key, scan_target
+from app.registry import checker_names
+from app.scanner.http_client import create_client
+from app.scanner.limits import HostLimiter
+from app.utils.caching import ScanCache
+from app.utils.history import HistoryStore
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when the queue already holds `max_queue` pending jobs."""
+
+class JobQueue:
+    """
+    Bounded queue of scan jobs executed by `workers` concurrent worker coroutines.
+    All workers share one HTTP client, TLS limiter and scan cache; every completed scan is
+    recorded in the history store.
+    `submitted` counts scans actually queued, `coalesced` the duplicates that joined one instead.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queue: int = JOB_QUEUE_DEPTH, directory: str = JOBS_DIR):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.store = diskcache.Cache(directory)
+        self.submitted = 0
+        self.coalesced = 0
+        # scan_key -> id of the queued or running job for it; only touched on the loop thread
+        self._in_flight: Dict[str, str] = {}
+        self._mark_interrupted()
+
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="cybersafe-jobs", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(self, url: str, domain: str, active: bool, ports: List[int]) -> str:
+        """
+        Queues a scan and returns its job id. If an identical scan is already queued or running,
+        returns that job's id instead. Raises QueueFull when the queue is at capacity.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "key": scan_key(url, active, ports),
+            "status": QUEUED,
+            "url": url,
+            "domain": domain,
+            "options": {"active": active, "ports": list(ports)},
+            "modules": checker_names(active),
+            "results": {},
+            "error": None,
+            "created": _now(),
+            "started": None,
+            "finished": None,
+        }
+        try:
+            return asyncio.run_coroutine_threadsafe(self._enqueue(job), self._loop).result()
+        except asyncio.QueueFull:
+            raise QueueFull(f"Scan queue is full ({self.max_queue} jobs pending). Try again shortly.")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job record (status, partial or final results), or None if unknown/expired."""
+        return self.store.get(_key(job_id))
+
+    def pending(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        """Scans queued, duplicate scans saved by joining an in-flight job, and current load."""
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "pending": self.pending(),
+        }
+
+    def shutdown(self) -> None:
+        """Stops the workers. Running jobs are cancelled and left in the store as failed."""
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self.store.close()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._client = create_client()
+        self._tls_limiter = HostLimiter(TLS_MAX_CONCURRENCY, TLS_PER_HOST_CONCURRENCY)
+        self._cache = ScanCache()
+        self._history = HistoryStore()
+        self._tasks = [self._loop.create_task(self._work()) for _ in range(self.workers)]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _enqueue(self, job: Dict[str, Any]) -> str:
+        existing = self._in_flight.get(job["key"])
+        if existing is not None:
+            self.coalesced += 1
+            return existing
+        self._save(job)
+        try:
+            self._queue.put_nowait(job["id"])
+        except asyncio.QueueFull:
+            self.store.delete(_key(job["id"]))
+            raise
+        self._in_flight[job["key"]] = job["id"]
+        self.submitted += 1
+        return job["id"]
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None:
+            # Expired from the store while queued; nothing left to run
+            self._in_flight = {k: v for k, v in self._in_flight.items() if v != job_id}
+            return
+        job["status"] = RUNNING
+        job["started"] = _now()
+        self._save(job)
+
+        def on_result(key: str, value: Any) -> None:
+            # Persist partial results so pollers can render modules as they complete
+            job["results"][key] = value
+            self._save(job)
+
+        try:
+            job["results"] = await scan_target(
+                job["url"], job["options"]["active"], job["options"]["ports"],
+                self._client, self._tls_limiter, self._cache, on_result=on_result,
+            )
+            # SQLite writes are blocking; keep them off the event loop
+            await asyncio.to_thread(self._history.record, job["domain"], job["url"], job["results"])
+            job["status"] = DONE
+        except asyncio.CancelledError:
+            job["status"] = FAILED
+            job["error"] = "Scan cancelled (scanner shutting down)."
+            raise
+        except Exception as e:
+            job["status"] = FAILED
+            job["error"] = str(e)
+        finally:
+            job["finished"] = _now()
+            self._save(job)
+            self._in_flight.pop(job["key"], None)
+
+    async def _stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._client.aclose()
+        self._cache.close()
+        self._history.close()
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        self.store.set(_key(job["id"]), job, expire=JOB_TTL)
+
+    def _mark_interrupted(self) -> None:
+        """Jobs left queued or running by a previous process will never finish; say so."""
+        for key in list(self.store.iterkeys()):
+            job = self.store.get(key)
+            if job and job["status"] in (QUEUED, RUNNING):
+                job["status"] = FAILED
+                job["error"] = "Scan interrupted by a scanner restart."
+                job["finished"] = _now()
+                self._save(job)
+
+def _key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+_default_queue: Optional[JobQueue] = None
+_default_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Returns the process-wide job queue, starting it on first use."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
@@ -1,59 +1,19 @@
 import streamlit as st
-import asyncio
-import tldextract
-import datetime
 import sys
 import os
-from urllib.parse import urlparse
+import time
 
 # Fix for Streamlit Cloud: Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.ui import render_sidebar, render_results
-from app.scanner.headers_checker import check_headers
-from app.scanner.tls_checker import check_tls
-from app.scanner.cors_checker import check_cors
-from app.scanner.methods_checker import check_methods
-from app.scanner.ports_checker import check_ports
-from app.utils.caching import ScanCache
-from app.utils.scoring import calculate_score
-from app.utils.reports import generate_html, generate_pdf
-from app.config import DEFAULT_PORTS
+from app.ui import render_sidebar, render_results, create_results_view, update_results_view
+from app.utils.domains import normalize_target
+from app.utils.reports import get_report_artifacts, PDF_READY, PDF_PENDING, PDF_FAILED
+from app.config import DEFAULT_PORTS, JOB_POLL_INTERVAL
 
 # Set page config
 st.set_page_config(page_title="Cybersafe", page_icon="🛡️", layout="wide")
 
-async def run_scan(url: str, active: bool, ports: list):
-    """Runs the scan asynchronously."""
-    
-    # Create tasks
-    tasks = {
-        "headers": asyncio.to_thread(check_headers, url),
-        "tls": asyncio.to_thread(check_tls, url),
-        "cors": asyncio.to_thread(check_cors, url),
-        "methods": asyncio.to_thread(check_methods, url),
-    }
-    
-    if active:
-        tasks["ports"] = check_ports(url, ports)
-    
-    results = {}
-    
-    # Run tasks and update UI
-    # We can't easily update UI from async tasks in Streamlit without some tricks,
-    # so we'll just await them all for now or use a placeholder.
-    
-    # Let's run them concurrently
-    results_list = await asyncio.gather(*tasks.values(), return_exceptions=True)
-    
-    for key, result in zip(tasks.keys(), results_list):
-        if isinstance(result, Exception):
-            results[key] = {"error": str(result), "score": 0, "findings": []}
-        else:
-            results[key] = result
-            
-    return results
-
 def main():
     st.title("Cybersafe 🛡️")
     st.markdown("### Website Security Hygiene Scanner")
@@ -65,13 +25,7 @@ def main():
     url_input = st.text_input("Enter Domain or URL (e.g., example.com)", "https://example.com")
     
     # Normalize URL
-    if not url_input.startswith("http"):
-        url_input = f"https://{url_input}"
-        
-    extracted = tldextract.extract(url_input)
-    domain = f"{extracted.domain}.{extracted.suffix}"
-    if extracted.subdomain:
-        domain = f"{extracted.subdomain}.{domain}"
+    url_input, domain = normalize_target(url_input)
         
     # Validation for Active Scan
     if active_checked:
@@ -91,53 +45,89 @@ def main():
             else:
                 st.error("Active scan blocked due to missing consent or mismatch.")
                 return
+        
+        # The scan runs on the background worker pool; this page only tracks the job id
+        from app.jobs import get_job_queue, QueueFull
+        try:
+            job_id = get_job_queue().submit(url_input, domain, run_active, DEFAULT_PORTS)
+        except QueueFull as e:
+            st.error(str(e))
+            return
+        st.session_state["job_id"] = job_id
+        st.query_params["job"] = job_id
+    
+    # The job id survives reruns (session state) and browser refreshes (query string)
+    job_id = st.session_state.get("job_id") or st.query_params.get("job")
+    if job_id:
+        render_job(job_id)
 
-        with st.spinner(f"Scanning {domain}..."):
-            # Check cache
-            cache = ScanCache()
-            cache_key = f"{domain}_{run_active}_{advanced_tls_checked}"
-            cached_results = cache.get(cache_key)
-            
-            if cached_results:
-                st.success("Loaded results from cache.")
-                results = cached_results
-            else:
-                # Run Scan
-                try:
-                    results = asyncio.run(run_scan(url_input, run_active, DEFAULT_PORTS))
-                    
-                    # Calculate Score
-                    results["score"] = calculate_score(results)
-                    results["timestamp"] = datetime.datetime.now().isoformat()
-                    
-                    # Cache results
-                    cache.set(cache_key, results)
-                    
-                except Exception as e:
-                    st.error(f"Scan failed: {e}")
-                    return
-            
-            # Render Results
-            render_results(results)
-            
-            # Export
-            st.markdown("### Export Report")
-            col1, col2, col3 = st.columns(3)
-            
-            # HTML
-            html_report = generate_html(domain, results.get("timestamp"), results.get("score"), results)
-            col1.download_button("Download HTML", html_report, file_name=f"cybersafe_report_{domain}.html", mime="text/html")
-            
-            # PDF
-            try:
-                pdf_report = generate_pdf(html_report)
-                col2.download_button("Download PDF", pdf_report, file_name=f"cybersafe_report_{domain}.pdf", mime="application/pdf")
-            except Exception as e:
-                col2.error(f"PDF generation failed: {e}")
-                
-            # JSON
-            import json
-            col3.download_button("Download JSON", json.dumps(results, indent=2), file_name=f"cybersafe_report_{domain}.json", mime="application/json")
+def render_job(job_id: str):
+    """Shows a scan job: partial results while it runs (polling), full results and exports once done."""
+    # Imported on first use: the job queue pulls in the whole scanner stack (httpx, resolver, ...),
+    # which a cold page load with no scan to show does not need
+    from app.jobs import get_job_queue, QUEUED, RUNNING, FAILED
+    job = get_job_queue().get(job_id)
+    if job is None:
+        st.warning("Scan job not found (it may have expired). Start a new scan.")
+        return
+    
+    domain = job["domain"]
+    results = job["results"]
+    
+    if job["status"] in (QUEUED, RUNNING):
+        label = f"Scanning {domain}..." if job["status"] == RUNNING else f"Queued: {domain} (waiting for a free worker)..."
+        with st.spinner(label):
+            # Fill each tab with the modules completed so far
+            view = create_results_view(job["modules"])
+            for key, value in results.items():
+                update_results_view(view, key, value)
+            time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    
+    if job["status"] == FAILED:
+        st.error(f"Scan failed: {job['error']}")
+        return
+    
+    if results.get("short_circuit"):
+        sc = results["short_circuit"]
+        st.warning(f"Host unreachable ({sc['reason']}). Remaining checks were skipped; retry in {sc['retry_after']:.0f}s.")
+    
+    if not results["cache"]["misses"]:
+        st.success("Loaded results from cache.")
+    elif results["cache"]["hits"]:
+        st.info(f"Reused cached results for: {', '.join(results['cache']['hits'])}.")
+    
+    # Render Results
+    render_results(results)
+    
+    render_exports(domain, results)
+
+def render_exports(domain: str, results):
+    """Export buttons. Artifacts are cached by a hash of the results; the PDF is rendered only on request."""
+    artifacts = get_report_artifacts()
+    st.markdown("### Export Report")
+    col1, col2, col3 = st.columns(3)
+    
+    # HTML
+    col1.download_button("Download HTML", artifacts.html(domain, results), file_name=f"cybersafe_report_{domain}.html", mime="text/html")
+    
+    # PDF (rendered in a worker process; poll until it is ready)
+    state, payload = artifacts.pdf_status(domain, results)
+    if state == PDF_READY:
+        col2.download_button("Download PDF", payload, file_name=f"cybersafe_report_{domain}.pdf", mime="application/pdf")
+    elif state == PDF_PENDING:
+        col2.info("Rendering PDF...")
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    else:
+        if state == PDF_FAILED:
+            col2.error(f"PDF generation failed: {payload}")
+        if col2.button("Prepare PDF" if state != PDF_FAILED else "Retry PDF"):
+            artifacts.request_pdf(domain, results)
+            st.rerun()
+        
+    # JSON
+    col3.download_button("Download JSON", artifacts.json(results), file_name=f"cybersafe_report_{domain}.json", mime="application/json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,381 @@
+import asyncio
+import datetime
+import inspect
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.scanner.headers_checker import analyze_headers
+from app.scanner.tls_checker import check_tls_async, tls_port
+from app.scanner.cors_checker import analyze_cors
+from app.scanner.methods_checker import analyze_methods
+from app.scanner.ports_checker import check_ports
+from app.scanner.http_client import RequestTrace, client_session, fetch_options, fetch_probe
+from app.scanner.resolver import resolve_target
+from app.scanner.health import default_health, is_definitive_failure, is_timeout
+from app.config import INCREMENTAL_STATE_TTL
+from app.registry import CHECKERS, INPUTS, Checker, ScanContext, checker_names, plan, register_checker, register_input
+from app.utils.caching import module_key, ports_variant
+from app.utils.domains import parse_target
+from app.utils.metrics import ScanTimings
+from app.utils.scoring import calculate_score
+
+def scan_key(url: str, active: bool, ports: List[int]) -> str:
+    """Identity of a scan request: identical keys produce identical scans and can share one run."""
+    return f"{url}|active:{ports_variant(ports)}" if active else f"{url}|passive"
+
+class HostUnreachable(Exception):
+    """Raised by a stage that cannot run because the host was proven unreachable."""
+
+# Shared inputs, fetched at most once per scan
+# "dns" resolves the host once for every socket-level check
+# "probe" is the single GET whose response feeds both the headers and CORS analyzers
+@register_input("dns", report=True, port=None)
+async def _resolve(ctx: ScanContext) -> Dict[str, Any]:
+    return await resolve_target(ctx.host, ctx.resolver)
+
+@register_input("probe")
+async def _probe(ctx: ScanContext):
+    return await _traced(ctx, "probe", fetch_probe, headers=ctx.probe_headers)
+
+@register_input("options")
+async def _options(ctx: ScanContext):
+    return await _traced(ctx, "options", fetch_options)
+
+async def _traced(ctx: ScanContext, request: str, fetch: Callable, **kwargs):
+    """Sends an HTTP input's request with a RequestTrace and adds its connection timings to the scan's."""
+    trace = RequestTrace()
+    try:
+        response = await fetch(ctx.url, ctx.session, trace=trace, **kwargs)
+    except Exception as e:
+        ctx.timings.record_http(request, trace)
+        if is_timeout(e):
+            ctx.timings.metrics.inc("cybersafe_timeouts_total", stage=request)
+        raise
+    ctx.timings.record_http(request, trace)
+    return response
+
+def _addresses(dns: Dict[str, Any]) -> Optional[List[str]]:
+    """Resolved addresses for a socket-level check; raises when the host does not resolve."""
+    if dns.get("error") and not dns["addresses"]:
+        raise HostUnreachable(dns["error"])
+    return dns["addresses"] or None
+
+# Built-in checkers, registered in display order
+@register_checker("headers", needs=("probe",))
+def _headers(ctx: ScanContext, response) -> Dict[str, Any]:
+    return analyze_headers(response)
+
+@register_checker("tls", needs=("dns",), port=tls_port)
+async def _tls(ctx: ScanContext, dns: Dict[str, Any]) -> Dict[str, Any]:
+    return await check_tls_async(ctx.url, ctx.tls_limiter, _addresses(dns))
+
+@register_checker("cors", needs=("probe",))
+def _cors(ctx: ScanContext, response) -> Dict[str, Any]:
+    return analyze_cors(response)
+
+@register_checker("methods", needs=("options",))
+def _methods(ctx: ScanContext, response) -> Dict[str, Any]:
+    return analyze_methods(response)
+
+@register_checker("ports", needs=("dns",), active=True, port=None)
+async def _ports(ctx: ScanContext, dns: Dict[str, Any]) -> Dict[str, Any]:
+    return await check_ports(ctx.url, ctx.ports, _addresses(dns))
+
+def _connects_to(name: str, url: str, port: int) -> bool:
+    """Whether the input or checker `name` connects to `port` (see app.registry)."""
+    node = INPUTS.get(name) or CHECKERS[name]
+    return node.port is not None and node.port(url) == port
+
+def _skipped(reason: str) -> Dict[str, Any]:
+    return {"error": f"Skipped: {reason}", "score": 0, "findings": [], "skipped": True}
+
+def _definitive_failure(key: str, task: "asyncio.Future") -> Optional[str]:
+    """
+    Returns the reason when a finished first-contact stage proves the target unreachable:
+    the whole host for "dns", the URL's host:port for "probe".
+    """
+    if task.cancelled():
+        return None
+    if key == "dns":
+        dns = task.result()
+        if dns.get("error") and not dns["addresses"]:
+            return f"DNS resolution failed: {dns['error']}"
+    elif key == "probe":
+        exc = task.exception()
+        if exc is not None and is_definitive_failure(exc):
+            return f"Connection failed: {exc or type(exc).__name__}"
+    return None
+
+async def _fetch_input(name: str, ctx: ScanContext) -> Any:
+    with ctx.timings.span(name):
+        return await INPUTS[name].fetch(ctx)
+
+async def _run_checker(checker: Checker, ctx: ScanContext, inputs: List["asyncio.Future"]) -> Dict[str, Any]:
+    # A failed input fails the checker with the same exception; a cancelled one cancels it
+    values = [await task for task in inputs]
+    with ctx.timings.span(checker.name):
+        result = checker.run(ctx, *values)
+        return await result if inspect.isawaitable(result) else result
+
+def _succeeded(task: "asyncio.Future") -> bool:
+    return not task.cancelled() and task.exception() is None
+
+def _checker_result(task: "asyncio.Future", reason: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+    """(result, executed) of a finished async checker task."""
+    if task.cancelled() or isinstance(task.exception(), HostUnreachable):
+        return _skipped(reason), False
+    if task.exception() is not None:
+        return {"error": str(task.exception()), "score": 0, "findings": []}, True
+    return task.result(), True
+
+def _evaluate(checker: Checker, ctx: ScanContext, inputs: List["asyncio.Future"], reason: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+    """(result, executed) of a pure checker whose inputs have all finished."""
+    for task in inputs:
+        if task.cancelled() or isinstance(task.exception(), HostUnreachable):
+            return _skipped(reason), False
+        if task.exception() is not None:
+            # Every consumer of a failed fetch reports its error
+            return {"error": str(task.exception()), "score": 0, "findings": []}, True
+    try:
+        with ctx.timings.span(checker.name):
+            return checker.run(ctx, *(task.result() for task in inputs)), True
+    except HostUnreachable:
+        return _skipped(reason), False
+    except Exception as e:
+        return {"error": str(e), "score": 0, "findings": []}, True
+
+def _outcome(result: Dict[str, Any], executed: bool, reused: bool) -> str:
+    """Outcome label of a checker result for the cybersafe_checks_total counter."""
+    if reused:
+        return "reused"
+    if not executed:
+        return "skipped"
+    return "error" if "error" in result else "ok"
+
+def _probe_consumers(names: List[str]) -> List[str]:
+    return [name for name in names if "probe" in CHECKERS[name].needs]
+
+def _conditional_headers(state: Optional[Dict[str, Any]], consumers: List[str]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since from the previous scan, when the probe's results were kept."""
+    headers = {}
+    if state and consumers and all(module in state for module in consumers):
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+def _not_modified(task: "asyncio.Future") -> bool:
+    return _succeeded(task) and task.result().status_code == 304
+
+def _record_validators(state: Dict[str, Any], key: str, task: "asyncio.Future", entries) -> List[str]:
+    """
+    Updates the incremental `state` from a freshly executed stage.
+    Returns the modules whose validators differ from the previous scan (page or certificate changed).
+    """
+    results = {module: result for module, result, _ in entries if module in CHECKERS}
+    changed = []
+    if key == "probe":
+        if task.cancelled() or task.exception() is not None or any("error" in r for r in results.values()):
+            return changed
+        response = task.result()
+        validators = {"etag": response.headers.get("etag"), "last_modified": response.headers.get("last-modified")}
+        if (state.get("etag") or state.get("last_modified")) and validators != {k: state.get(k) for k in validators}:
+            changed = list(results)
+        state.update(validators)
+        if any(validators.values()):
+            state.update(results)
+        else:
+            # Nothing to revalidate against next time
+            for module in results:
+                state.pop(module, None)
+    elif key == "tls":
+        fingerprint = results["tls"].get("details", {}).get("fingerprint")
+        if fingerprint:
+            if state.get("fingerprint") and state["fingerprint"] != fingerprint:
+                changed = ["tls"]
+            state["fingerprint"] = fingerprint
+    return changed
+
+async def iter_scan(
+    url: str, active: bool, ports: list, client=None, tls_limiter=None, resolver=None, cache=None, health=None,
+    incremental: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Runs every registered checker and yields (key, value) pairs as soon as each is available,
+    then the "short_circuit", "incremental" and "cache" summaries when they apply, and "timings".
+    """
+    parsed = parse_target(url)
+    hostname = parsed.host
+    target = parsed.key
+    health = health or default_health
+    modules = checker_names(active)
+    variants = {"ports": ports_variant(ports)} if active else {}
+    incremental = incremental and cache is not None
+    # Per-stage and HTTP connection timings; counters and histograms go to default_metrics
+    timings = ScanTimings()
+    metrics = timings.metrics
+    mode = "active" if active else "passive"
+    metrics.inc("cybersafe_scans_total", mode=mode)
+    
+    # With a cache, each module's result is kept under its own key and TTL and only stale
+    # modules run. Incremental rescans revalidate instead of trusting the module TTLs
+    from_cache = []
+    if cache is not None and not incremental:
+        for module in modules:
+            cached = cache.get_module(target, module, variants.get(module, ""))
+            metrics.inc("cybersafe_cache_lookups_total", cache="module", result="miss" if cached is None else "hit")
+            if cached is not None:
+                from_cache.append(module)
+                metrics.inc("cybersafe_checks_total", check=module, outcome="cached")
+                yield module, cached
+    stale = [m for m in modules if m not in from_cache]
+    
+    # Validators of the previous scan: the probe becomes a conditional GET whose 304 reuses the
+    # stored headers and CORS results, and certificate fingerprints are compared
+    state = (cache.get_module(target, "validators") or {}) if incremental else {}
+    conditional = _conditional_headers(state, _probe_consumers(stale)) if incremental else {}
+    new_state = dict(state)
+    reused, ran, changed = [], [], []
+    
+    # Hosts whose DNS failed are backed off in `health` as a whole; a connect timeout backs off
+    # only the URL's host:port, and checks on other ports still run. Backed-off checks never start
+    short_circuit = backoff = None
+    endpoint = f"{hostname}:{parsed.port}"
+    for key, blocked in ((hostname, stale), (endpoint, [m for m in stale if _connects_to(m, url, parsed.port)])):
+        retry_after = health.retry_after(key) if blocked else 0
+        if retry_after > 0:
+            status = health.status(key)
+            backoff = {"stage": "backoff", "reason": status["reason"], "retry_after": round(retry_after, 1)}
+            for module in blocked:
+                metrics.inc("cybersafe_checks_total", check=module, outcome="skipped")
+                yield module, _skipped(f"host unreachable, retry in {retry_after:.0f}s")
+            stale = [m for m in stale if m not in blocked]
+            break
+    if stale:
+        # All HTTP checks share one pooled client (the caller's `client` if given), so an origin
+        # costs one handshake; TLS and port checks connect to the addresses resolved once by "dns"
+        async with client_session(client) as session:
+            ctx = ScanContext(url, hostname, session, tls_limiter, resolver, ports, conditional, timings)
+            # One task per shared input and per async checker; pure checkers are evaluated
+            # as soon as their inputs are in, in registration order
+            tasks: Dict[str, "asyncio.Future"] = {}
+            pure: List[Checker] = []
+            for name, checker in plan(stale):
+                if checker is None:
+                    tasks[name] = asyncio.ensure_future(_fetch_input(name, ctx))
+                elif asyncio.iscoroutinefunction(checker.run) or not checker.needs:
+                    tasks[name] = asyncio.ensure_future(_run_checker(checker, ctx, [tasks[n] for n in checker.needs]))
+                else:
+                    pure.append(checker)
+            
+            # Run tasks concurrently; stop what the unreachable host (or port) would fail anyway
+            try:
+                pending = set(tasks.values())
+                reached = set()
+                spared = set()
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for key in ("dns", "probe"):
+                        if key in tasks and tasks[key] in done:
+                            reason = _definitive_failure(key, tasks[key])
+                            if reason is None:
+                                reached.add(key)
+                            elif short_circuit is None:
+                                short_circuit = {"stage": key, "reason": reason}
+                                short_circuit["retry_after"] = health.record_failure(hostname if key == "dns" else endpoint, reason)
+                                if key == "probe":
+                                    spared = {t for n, t in tasks.items() if not _connects_to(n, url, parsed.port)}
+                    cancelled = pending - spared if short_circuit is not None else set()
+                    if cancelled:
+                        for task in cancelled:
+                            task.cancel()
+                        await asyncio.gather(*cancelled, return_exceptions=True)
+                        done |= cancelled
+                        pending -= cancelled
+                    
+                    reason = short_circuit["reason"] if short_circuit else None
+                    for key, task in tasks.items():
+                        if task not in done:
+                            continue
+                        revalidated = False
+                        if key in CHECKERS:
+                            entries = [(key, *_checker_result(task, reason))]
+                        else:
+                            entries = [(key, task.result(), False)] if INPUTS[key].report and _succeeded(task) else []
+                            # Pure checkers whose last input just arrived
+                            ready = [c for c in pure if key in c.needs and all(tasks[n].done() for n in c.needs)]
+                            pure = [c for c in pure if c not in ready]
+                            if key == "probe" and conditional and _not_modified(task):
+                                # 304: the page is unchanged since the stored results were computed
+                                entries.extend((c.name, state[c.name], True) for c in ready)
+                                reused.extend(c.name for c in ready)
+                                revalidated = True
+                            else:
+                                entries.extend((c.name, *_evaluate(c, ctx, [tasks[n] for n in c.needs], reason)) for c in ready)
+                        if incremental and not revalidated:
+                            changed.extend(_record_validators(new_state, key, task, entries))
+                            ran.extend(m for m, _, executed in entries if executed)
+                        for module, result, executed in entries:
+                            if module in CHECKERS:
+                                metrics.inc("cybersafe_checks_total", check=module, outcome=_outcome(result, executed, revalidated))
+                            if executed and cache is not None:
+                                cache.set_module(target, module, result, variants.get(module, ""))
+                            yield module, result
+            finally:
+                # The consumer may stop early; never leave checks running in the background
+                for task in tasks.values():
+                    task.cancel()
+        
+        if "dns" in reached and (short_circuit is None or short_circuit["stage"] != "dns"):
+            health.record_success(hostname)
+        if "probe" in reached:
+            health.record_success(endpoint)
+    
+    short_circuit = short_circuit or backoff
+    if short_circuit is not None:
+        metrics.inc("cybersafe_short_circuits_total", stage=short_circuit["stage"])
+        yield "short_circuit", short_circuit
+    if incremental:
+        cache.set(module_key(target, "validators"), new_state, INCREMENTAL_STATE_TTL)
+        yield "incremental", {"reused": reused, "executed": ran, "changed": changed}
+    if cache is not None:
+        yield "cache", {
+            "hits": from_cache,
+            "misses": [m for m in modules if m not in from_cache],
+        }
+    yield "timings", timings.summary(mode)
+
+async def run_scan(
+    url: str, active: bool, ports: list, client=None, tls_limiter=None, resolver=None, cache=None, health=None,
+    on_result: Optional[Callable[[str, Any], None]] = None, incremental: bool = False,
+):
+    """
+    Runs the scan asynchronously and returns the collected results (see iter_scan).
+    `on_result(key, value)` is called as each module completes, e.g. to render it progressively.
+    """
+    results = {}
+    async for key, value in iter_scan(url, active, ports, client, tls_limiter, resolver, cache, health, incremental):
+        results[key] = value
+        if on_result is not None:
+            on_result(key, value)
+    
+    # Stable ordering regardless of completion order
+    ordered = {"dns": results["dns"]} if "dns" in results else {}
+    ordered.update((m, results[m]) for m in CHECKERS if m in results)
+    for key in ("short_circuit", "incremental", "cache", "timings"):
+        if key in results:
+            ordered[key] = results[key]
+    return ordered
+
+async def scan_target(
+    url: str, active: bool, ports: List[int], client=None, tls_limiter=None, cache=None,
+    on_result: Optional[Callable[[str, Any], None]] = None, incremental: bool = False,
+) -> Dict[str, Any]:
+    """Runs a full scan and adds the overall score and timestamp."""
+    results = await run_scan(url, active, ports, client, tls_limiter, cache=cache, on_result=on_result, incremental=incremental)
+    
+    # Calculate Score
+    results["score"] = calculate_score(results)
+    results["timestamp"] = datetime.datetime.now().isoformat()
+    
+    return results
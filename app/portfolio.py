@@ -0,0 +1,175 @@
+"""Portfolio reports: one consolidated HTML or PDF report from a bulk-scan JSONL file."""
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import PORTFOLIO_CHUNK_SIZE, PORTFOLIO_PDF_WORKERS
+from app.utils import reports
+
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields scan records from a bulk-scan JSONL file, skipping blank lines."""
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+def summary_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact summary of one record: domain, score and finding counts per severity."""
+    results = record.get("results") or {}
+    row = {"domain": record.get("domain") or record.get("target"), "score": results.get("score")}
+    row.update({severity: 0 for severity in SEVERITIES})
+    for data in results.values():
+        if isinstance(data, dict):
+            for finding in data.get("findings", []):
+                severity = str(finding.get("severity", "")).lower()
+                if severity in row:
+                    row[severity] += 1
+    row["score_class"] = reports.score_class(row["score"])
+    return row
+
+def summarize(records: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary table (worst score first) and fleet totals."""
+    rows = [summary_row(record) for record in records]
+    scores = [row["score"] for row in rows if row["score"] is not None]
+    rows.sort(key=lambda row: (row["score"] is not None, row["score"] or 0, row["domain"] or ""))
+    return {
+        "total": len(rows),
+        "failed": len(rows) - len(scores),
+        "average": round(sum(scores) / len(scores)) if scores else None,
+        "rows": rows,
+    }
+
+def _section(record: Dict[str, Any]) -> Dict[str, Any]:
+    results = record.get("results") or {}
+    return {
+        "domain": record.get("domain") or record.get("target"),
+        "score": results.get("score"),
+        "score_class": reports.score_class(results.get("score")),
+        "error": record.get("error"),
+        "results": results,
+    }
+
+def write_portfolio_html(fp, path: str, date: Optional[str] = None) -> int:
+    """Streams the portfolio report for the JSONL file at `path` into `fp`; returns characters written."""
+    date = date or datetime.datetime.now().isoformat()
+    summary = summarize(iter_records(path))
+    written = 0
+    for chunk in reports.stream_portfolio_html(date, summary, (_section(r) for r in iter_records(path))):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+def _chunks(path: str, size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in iter_records(path):
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _render_part(html_path: str, pdf_path: str) -> str:
+    # Runs in a worker process
+    reports.generate_pdf_file(html_path, pdf_path)
+    os.remove(html_path)
+    return pdf_path
+
+def write_portfolio_pdf(
+    path: str,
+    output: str,
+    chunk_size: int = PORTFOLIO_CHUNK_SIZE,
+    workers: int = PORTFOLIO_PDF_WORKERS,
+    date: Optional[str] = None,
+) -> int:
+    """
+    Renders the portfolio report as a PDF. Domains are split into chunks of `chunk_size`,
+    each chunk is rendered to its own PDF on a pool of `workers` processes, and the parts
+    are concatenated in order. Returns the number of parts rendered.
+    """
+    if not reports.pdf_available():
+        raise RuntimeError("PDF generation unavailable (missing GTK libraries).")
+    if not PYPDF_AVAILABLE:
+        raise RuntimeError("Portfolio PDFs require pypdf (pip install pypdf).")
+    date = date or datetime.datetime.now().isoformat()
+    summary = summarize(iter_records(path))
+
+    with tempfile.TemporaryDirectory(prefix="cybersafe-portfolio-") as workdir:
+        parts: List[concurrent.futures.Future] = []
+        # spawn: workers must not inherit the parent's threads or open sockets
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunks = _chunks(path, chunk_size) if summary["total"] else iter([[]])
+            for index, chunk in enumerate(chunks):
+                html_path = os.path.join(workdir, f"part{index:05d}.html")
+                with open(html_path, "w", encoding="utf-8") as fp:
+                    # The summary table opens the first part only
+                    for piece in reports.stream_portfolio_html(date, summary if index == 0 else None, map(_section, chunk)):
+                        fp.write(piece)
+                parts.append(pool.submit(_render_part, html_path, os.path.join(workdir, f"part{index:05d}.pdf")))
+                # Keep at most two parts per worker waiting, so temporary HTML does not pile up
+                while sum(not part.done() for part in parts) > workers * 2:
+                    concurrent.futures.wait(parts, return_when=concurrent.futures.FIRST_COMPLETED)
+            pdf_paths = [part.result() for part in parts]
+
+        if len(pdf_paths) == 1:
+            shutil.copyfile(pdf_paths[0], output)
+        else:
+            writer = PdfWriter()
+            for pdf_path in pdf_paths:
+                writer.append(pdf_path)
+            with open(output, "wb") as fp:
+                writer.write(fp)
+            writer.close()
+    return len(pdf_paths)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.portfolio", description="Cybersafe portfolio report from bulk-scan JSONL.")
+    parser.add_argument("input", help="JSONL file written by 'python -m app.scan'.")
+    parser.add_argument("-o", "--output", help="HTML report file ('-' for stdout).")
+    parser.add_argument("--pdf", help="PDF report file.")
+    parser.add_argument("--chunk-size", type=int, default=PORTFOLIO_CHUNK_SIZE, help="Domains per PDF chunk.")
+    parser.add_argument("-w", "--workers", type=int, default=PORTFOLIO_PDF_WORKERS, help="Processes rendering PDF chunks.")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.output and not args.pdf:
+        parser.error("nothing to do: pass -o/--output and/or --pdf")
+    if args.chunk_size < 1 or args.workers < 1:
+        parser.error("--chunk-size and --workers must be at least 1")
+
+    date = datetime.datetime.now().isoformat()
+    if args.output:
+        sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            write_portfolio_html(sink, args.input, date)
+        finally:
+            if sink is not sys.stdout:
+                sink.close()
+    if args.pdf:
+        try:
+            parts = write_portfolio_pdf(args.input, args.pdf, args.chunk_size, args.workers, date)
+        except RuntimeError as e:
+            print(f"PDF export failed: {e}", file=sys.stderr)
+            return 1
+        print(f"Rendered {args.pdf} from {parts} parts.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
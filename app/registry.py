@@ -0,0 +1,82 @@
+"""Registry of the shared inputs and checkers each target's scan DAG is built from."""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.utils.domains import parse_target
+
+def url_port(url: str) -> Optional[int]:
+    """The target URL's port: where the probe GET, the OPTIONS request and their consumers connect."""
+    return parse_target(url).port
+
+class ScanContext(NamedTuple):
+    """What every input and checker of one target's scan may use."""
+    url: str
+    host: str
+    session: Any  # shared httpx.AsyncClient
+    tls_limiter: Any
+    resolver: Any
+    ports: List[int]
+    probe_headers: Dict[str, str]  # extra request headers for the probe GET (incremental rescans)
+    timings: Any = None  # app.utils.metrics.ScanTimings of this scan
+
+# `port(url)` of an input or checker is the port it connects to, None when it connects to no
+# single port (DNS, port scans); a timeout on the URL's port only stops the nodes on that port
+
+class Input(NamedTuple):
+    """A shared input: `fetch(ctx)` is awaited once per scan. `report` adds its value to the results."""
+    name: str
+    fetch: Callable[[ScanContext], Any]
+    report: bool = False
+    port: Optional[Callable[[str], Optional[int]]] = url_port
+
+class Checker(NamedTuple):
+    """A result module: `run(ctx, *inputs)`, sync or async. `active` ones only run in active scans."""
+    name: str
+    needs: Tuple[str, ...]
+    run: Callable[..., Any]
+    active: bool = False
+    port: Optional[Callable[[str], Optional[int]]] = url_port
+
+INPUTS: Dict[str, Input] = {}
+CHECKERS: Dict[str, Checker] = {}
+
+def register_input(name: str, report: bool = False, port: Optional[Callable[[str], Optional[int]]] = url_port) -> Callable:
+    """Decorator registering an async `fetch(ctx)` as the shared input `name`."""
+    def decorator(fetch: Callable[[ScanContext], Any]) -> Callable[[ScanContext], Any]:
+        INPUTS[name] = Input(name, fetch, report, port)
+        return fetch
+    return decorator
+
+def register_checker(
+    name: str, needs: Sequence[str] = (), active: bool = False, port: Optional[Callable[[str], Optional[int]]] = url_port,
+) -> Callable:
+    """Decorator registering `run(ctx, *inputs)` as the result module `name`."""
+    def decorator(run: Callable[..., Any]) -> Callable[..., Any]:
+        if name in INPUTS:
+            raise ValueError(f"Checker {name!r} clashes with the input of the same name")
+        unknown = [need for need in needs if need not in INPUTS]
+        if unknown:
+            raise ValueError(f"Checker {name!r} needs unregistered inputs: {', '.join(unknown)}")
+        CHECKERS[name] = Checker(name, tuple(needs), run, active, port)
+        return run
+    return decorator
+
+def checker_names(active: bool) -> List[str]:
+    """Checkers that run in a passive or active scan, in display order."""
+    return [name for name, checker in CHECKERS.items() if active or not checker.active]
+
+def plan(names: Sequence[str]) -> List[Tuple[str, Optional[Checker]]]:
+    """
+    Nodes to start for the checkers `names`, in registration order: each input once, before
+    its first consumer, as (input name, None), and each checker as (name, Checker).
+    """
+    nodes: List[Tuple[str, Optional[Checker]]] = []
+    started = set()
+    for name in CHECKERS:
+        if name not in names:
+            continue
+        checker = CHECKERS[name]
+        for need in checker.needs:
+            if need not in started:
+                started.add(need)
+                nodes.append((need, None))
+        nodes.append((name, checker))
+    return nodes
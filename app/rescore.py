@@ -0,0 +1,76 @@
+"""Re-evaluates the header and CORS rule tables over the scan history, without fetching anything."""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.scanner.cors_checker import CORS_RULESET
+from app.scanner.headers_checker import HEADER_RULESET
+from app.scanner.rules import RuleSet
+from app.utils.history import HistoryStore
+
+RULESETS = {"headers": HEADER_RULESET, "cors": CORS_RULESET}
+
+def compare(stored: Dict[str, Any], evaluated: Dict[str, Any]) -> Dict[str, Any]:
+    """Score before/after and finding descriptions added or removed by re-evaluation."""
+    before = {f.get("description") for f in stored.get("findings", [])}
+    after = {f["description"] for f in evaluated["findings"]}
+    return {
+        "score": [stored.get("score"), evaluated["score"]],
+        "added": sorted(after - before),
+        "removed": sorted(before - after),
+    }
+
+def rescore(
+    history: HistoryStore,
+    rulesets: Dict[str, RuleSet] = RULESETS,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    domain: Optional[str] = None,
+    changed_only: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Re-evaluates `rulesets` over every stored scan that captured response headers.
+    Yields {"scan_id", "domain", "scanned_at", <module>: compare(...)} per scan.
+    """
+    for scan in history.iter_results(["headers", *rulesets], since, until, domain):
+        captured = scan["results"].get("headers", {}).get("headers")
+        if not captured:
+            continue  # Headers module failed or was skipped: nothing to re-evaluate
+        record: Dict[str, Any] = {"scan_id": scan["id"], "domain": scan["domain"], "scanned_at": scan["scanned_at"]}
+        changed = False
+        for module, ruleset in rulesets.items():
+            delta = compare(scan["results"].get(module, {}), ruleset.evaluate(captured))
+            record[module] = delta
+            changed = changed or delta["added"] or delta["removed"] or delta["score"][0] != delta["score"][1]
+        if changed or not changed_only:
+            yield record
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.rescore", description="Re-run header and CORS rules over stored scans.")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout).")
+    parser.add_argument("--since", help="Only scans at or after this ISO timestamp.")
+    parser.add_argument("--until", help="Only scans before this ISO timestamp.")
+    parser.add_argument("--domain", help="Only scans of this domain.")
+    parser.add_argument("--all", action="store_true", help="Write every scan, not only those whose outcome changes.")
+    parser.add_argument("--db", help="History database (default: the configured HISTORY_DB).")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    history = HistoryStore(args.db) if args.db else HistoryStore()
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    try:
+        for record in rescore(history, since=args.since, until=args.until, domain=args.domain, changed_only=not args.all):
+            sink.write(json.dumps(record) + "\n")
+            count += 1
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        history.close()
+    print(f"Wrote {count} scans.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
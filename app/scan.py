@@ -0,0 +1,202 @@
+"""Headless bulk scanner: one JSON line per target, written as each scan completes."""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from app.config import BULK_CONCURRENCY, DEFAULT_PORTS, TLS_MAX_CONCURRENCY, TLS_PER_HOST_CONCURRENCY
+from app.pipeline import scan_key, scan_target
+from app.scanner.http_client import create_client
+from app.scanner.limits import HostLimiter
+from app.scanner.ports_checker import parse_ports
+from app.utils.caching import ScanCache
+from app.utils.domains import normalize_target
+from app.utils.history import HistoryStore
+from app.utils.metrics import MetricsFile
+from app.utils.singleflight import SingleFlight
+
+# Sentinel telling a worker (or the consumer) that no more items will arrive
+_STOP = object()
+
+async def scan_one(
+    target: str, active: bool, ports: List[int], client=None, tls_limiter=None, cache=None,
+    flights: Optional[SingleFlight] = None, history: Optional[HistoryStore] = None, incremental: bool = False,
+) -> Dict[str, Any]:
+    """
+    Scans a single target and wraps the outcome in a JSONL record.
+    With `flights`, a target already being scanned (e.g. a duplicate input line) shares that scan.
+    With `history`, the completed scan is recorded there.
+    `incremental` revalidates against the previous scan's validators kept in `cache` (see iter_scan).
+    """
+    record = {"target": target}
+    try:
+        url, domain = normalize_target(target)
+        record["domain"] = domain
+        if flights is None:
+            record["results"] = await scan_target(url, active, ports, client, tls_limiter, cache, incremental=incremental)
+        else:
+            record["results"] = await flights.do(
+                scan_key(url, active, ports),
+                lambda: scan_target(url, active, ports, client, tls_limiter, cache, incremental=incremental),
+            )
+        if history is not None:
+            await asyncio.to_thread(history.record, domain, url, record["results"])
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+async def scan_stream(
+    targets: Iterable[str],
+    concurrency: int = BULK_CONCURRENCY,
+    active: bool = False,
+    ports: Optional[List[int]] = None,
+    client=None,
+    cache: Optional[ScanCache] = None,
+    flights: Optional[SingleFlight] = None,
+    history: Optional[HistoryStore] = None,
+    incremental: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scans targets with at most `concurrency` scans in flight and yields each record
+    as soon as it finishes (completion order, not input order).
+    Targets are pulled lazily, so `targets` may be an open file or stdin.
+    With a `cache`, modules with fresh cached results are not re-run.
+    Duplicate targets in flight at the same time share one scan; pass `flights` to read the counts.
+    With `history`, every completed scan is recorded there.
+    With `incremental` (and a `cache`), targets are revalidated against their previous scan.
+    """
+    ports = ports or DEFAULT_PORTS
+    flights = flights if flights is not None else SingleFlight()
+    tls_limiter = HostLimiter(TLS_MAX_CONCURRENCY, TLS_PER_HOST_CONCURRENCY)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    done: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    # The stop sentinels are not sent once cancelled: a consumer that stopped early no longer
+    # drains the bounded queues, so the puts would block forever
+    async def feed():
+        iterator = iter(targets)
+        cancelled = False
+        try:
+            while True:
+                # Reading runs in a thread so a slow stdin pipe never stalls the event loop
+                line = await asyncio.to_thread(next, iterator, None)
+                if line is None:
+                    break
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                await pending.put(line)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for _ in range(concurrency):
+                    await pending.put(_STOP)
+
+    async def work(session):
+        cancelled = False
+        try:
+            while True:
+                target = await pending.get()
+                if target is _STOP:
+                    break
+                await done.put(await scan_one(target, active, ports, session, tls_limiter, cache, flights, history, incremental))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                await done.put(_STOP)
+
+    owned = client is None
+    if owned:
+        # Each target may hold two HTTP connections at once (shared GET + OPTIONS)
+        client = create_client(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+
+    feeder = asyncio.create_task(feed())
+    workers = [asyncio.create_task(work(client)) for _ in range(concurrency)]
+    try:
+        finished = 0
+        while finished < concurrency:
+            record = await done.get()
+            if record is _STOP:
+                finished += 1
+                continue
+            yield record
+        # Surface errors raised while reading the input
+        await feeder
+    finally:
+        for task in [feeder, *workers]:
+            task.cancel()
+        await asyncio.gather(feeder, *workers, return_exceptions=True)
+        if owned:
+            await client.aclose()
+
+async def _run(args: argparse.Namespace) -> int:
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    cache = ScanCache() if args.cache or args.incremental else None
+    history = None if args.no_history else HistoryStore()
+    flights = SingleFlight()
+    metrics = MetricsFile(args.metrics) if args.metrics else None
+    count = 0
+    try:
+        async for record in scan_stream(
+            source, args.concurrency, args.active, args.ports,
+            cache=cache, flights=flights, history=history, incremental=args.incremental,
+        ):
+            sink.write(json.dumps(record, default=str) + "\n")
+            sink.flush()
+            count += 1
+            if metrics is not None:
+                metrics.maybe_write()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        if cache is not None:
+            cache.close()
+        if history is not None:
+            history.close()
+        if metrics is not None:
+            metrics.close()
+    print(f"Scanned {count} targets ({flights.coalesced} duplicate scans coalesced).", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.scan", description="Cybersafe headless bulk scanner.")
+    parser.add_argument("input", nargs="?", default="-", help="File with one domain per line ('-' for stdin).")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout).")
+    parser.add_argument("-c", "--concurrency", type=int, default=BULK_CONCURRENCY, help="Maximum targets scanned at once.")
+    parser.add_argument("--cache", action="store_true", help="Reuse fresh per-module results from the scan cache.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Revalidate against the previous scan (conditional GET, certificate fingerprint) instead of rescanning from scratch.",
+    )
+    parser.add_argument("--no-history", action="store_true", help="Do not record results in the scan history database.")
+    parser.add_argument("--metrics", help="Prometheus text file for aggregated timings and counters (e.g. for node_exporter's textfile collector).")
+    parser.add_argument("--active", action="store_true", help="Also run the active port scan.")
+    parser.add_argument(
+        "--i-own-these-targets",
+        dest="consent",
+        action="store_true",
+        help="Confirm you own every target or have explicit permission to scan it (required with --active).",
+    )
+    parser.add_argument("--ports", type=parse_ports, default=DEFAULT_PORTS, help="Ports for --active, e.g. '22,80,443' or '1-65535'.")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.active and not args.consent:
+        parser.error("--active requires --i-own-these-targets. Scanning targets you do not own is illegal.")
+    return asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
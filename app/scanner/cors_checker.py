@@ -1,46 +1,54 @@
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .http_client import fetch_probe
+from .rules import Rule, RuleSet, all_of, equals
+from ..config import CORS_PROBE_ORIGIN
 
-def check_cors(url: str) -> Dict[str, Any]:
+async def check_cors(url: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
     """
     Checks for insecure CORS configurations.
     """
+    # The probe request carries an Origin header to trigger the CORS response
+    try:
+        response = await fetch_probe(url, client)
+    except Exception as e:
+        return {"score": 0, "findings": [], "details": {}, "error": str(e)}
+
+    return analyze_cors(response)
+
+# Deductions from a perfect score; reflecting the probe Origin with credentials zeroes it
+CORS_RULES = [
+    Rule("wildcard-origin", equals("Access-Control-Allow-Origin", "*"), points=-50, finding={
+        "severity": "Medium",
+        "description": "Access-Control-Allow-Origin is set to wildcard '*'.",
+        "remediation": "Restrict Access-Control-Allow-Origin to trusted domains."
+    }),
+    Rule("reflected-origin-credentials", all_of(
+        equals("Access-Control-Allow-Origin", CORS_PROBE_ORIGIN),
+        equals("Access-Control-Allow-Credentials", "true"),
+    ), points=-100, finding={
+        "severity": "High",
+        "description": "Server reflects arbitrary Origin with Access-Control-Allow-Credentials: true.",
+        "remediation": "Do not reflect the Origin header blindly if credentials are allowed."
+    }),
+]
+
+CORS_RULESET = RuleSet(CORS_RULES, base=100)
+
+def analyze_cors(response: httpx.Response) -> Dict[str, Any]:
+    """
+    Evaluates the CORS headers of a response fetched with the probe Origin. Performs no I/O.
+    """
     results = {
         "score": 100,
         "findings": [],
         "details": {}
     }
     
-    # We need to send a request with an Origin header to trigger CORS response
-    headers = {"Origin": "https://evil.com"}
-    
     try:
-        response = httpx.get(url, headers=headers, timeout=10)
-        
-        acao = response.headers.get("Access-Control-Allow-Origin")
-        acac = response.headers.get("Access-Control-Allow-Credentials")
-        
-        results["details"]["Access-Control-Allow-Origin"] = acao
-        results["details"]["Access-Control-Allow-Credentials"] = acac
-        
-        if acao == "*":
-            results["findings"].append({
-                "severity": "Medium",
-                "description": "Access-Control-Allow-Origin is set to wildcard '*'.",
-                "remediation": "Restrict Access-Control-Allow-Origin to trusted domains."
-            })
-            results["score"] -= 50
-            
-        if acao == "https://evil.com" and acac == "true":
-             results["findings"].append({
-                "severity": "High",
-                "description": "Server reflects arbitrary Origin with Access-Control-Allow-Credentials: true.",
-                "remediation": "Do not reflect the Origin header blindly if credentials are allowed."
-            })
-             results["score"] = 0
-             
-        results["score"] = max(0, results["score"])
-
+        results["details"]["Access-Control-Allow-Origin"] = response.headers.get("Access-Control-Allow-Origin")
+        results["details"]["Access-Control-Allow-Credentials"] = response.headers.get("Access-Control-Allow-Credentials")
+        results.update(CORS_RULESET.evaluate(response.headers))
     except Exception as e:
         results["error"] = str(e)
         results["score"] = 0
@@ -1,10 +1,73 @@
 import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from .http_client import fetch_probe
+from .rules import Rule, RuleSet, all_of, any_of, equals, matches, not_, present
 
-def check_headers(url: str) -> Dict[str, Any]:
+async def check_headers(url: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
     """
     Checks for the presence and configuration of security headers.
     """
+    try:
+        response = await fetch_probe(url, client)
+    except Exception as e:
+        return {"score": 0, "findings": [], "headers": {}, "error": str(e)}
+
+    return analyze_headers(response)
+
+UNSAFE_CSP = r"unsafe-inline|unsafe-eval"
+
+# Evaluated in order; a module score of 100 means every point below was earned (50 max)
+HEADER_RULES = [
+    Rule("hsts", present("Strict-Transport-Security"), points=10),
+    Rule("hsts-missing", not_(present("Strict-Transport-Security")), finding={
+        "severity": "High",
+        "description": "Missing Strict-Transport-Security (HSTS) header.",
+        "remediation": "Enable HSTS to force HTTPS connections."
+    }),
+    Rule("csp", all_of(present("Content-Security-Policy"), not_(matches("Content-Security-Policy", UNSAFE_CSP))), points=10),
+    Rule("csp-unsafe", matches("Content-Security-Policy", UNSAFE_CSP), points=5, finding={  # Partial credit
+        "severity": "Medium",
+        "description": "Content-Security-Policy contains unsafe directives ('unsafe-inline' or 'unsafe-eval').",
+        "remediation": "Refine CSP to avoid using unsafe directives."
+    }),
+    Rule("csp-missing", not_(present("Content-Security-Policy")), finding={
+        "severity": "High",
+        "description": "Missing Content-Security-Policy (CSP) header.",
+        "remediation": "Implement a CSP to mitigate XSS and other attacks."
+    }),
+    Rule("x-frame-options", present("X-Frame-Options"), points=10),
+    Rule("x-frame-options-missing", not_(present("X-Frame-Options")), finding={
+        "severity": "Medium",
+        "description": "Missing X-Frame-Options header.",
+        "remediation": "Set X-Frame-Options to DENY or SAMEORIGIN to prevent clickjacking."
+    }),
+    Rule("nosniff", equals("X-Content-Type-Options", "nosniff"), points=10),
+    Rule("nosniff-missing", not_(equals("X-Content-Type-Options", "nosniff")), finding={
+        "severity": "Low",
+        "description": "Missing or incorrect X-Content-Type-Options header.",
+        "remediation": "Set X-Content-Type-Options to 'nosniff'."
+    }),
+    Rule("referrer-policy", present("Referrer-Policy"), points=5),
+    Rule("referrer-policy-missing", not_(present("Referrer-Policy")), finding={
+        "severity": "Low",
+        "description": "Missing Referrer-Policy header.",
+        "remediation": "Set a Referrer-Policy to control information sent in Referer headers."
+    }),
+    Rule("permissions-policy", any_of(present("Permissions-Policy"), present("Feature-Policy")), points=5),
+    Rule("permissions-policy-missing", not_(any_of(present("Permissions-Policy"), present("Feature-Policy"))), finding={
+        "severity": "Low",
+        "description": "Missing Permissions-Policy (or Feature-Policy) header.",
+        "remediation": "Set Permissions-Policy to control browser features."
+    }),
+]
+
+# Compiled once at import; the module score is a percentage of the points available
+HEADER_RULESET = RuleSet(HEADER_RULES, max_points=50)
+
+def analyze_headers(response: httpx.Response) -> Dict[str, Any]:
+    """
+    Scores the security headers of an already fetched response. Performs no I/O.
+    """
     results = {
         "score": 0,
         "findings": [],
@@ -12,88 +75,8 @@ def check_headers(url: str) -> Dict[str, Any]:
     }
     
     try:
-        response = httpx.get(url, timeout=10, follow_redirects=True)
-        headers = response.headers
-        results["headers"] = dict(headers)
-        
-        # 1. Strict-Transport-Security
-        if "Strict-Transport-Security" in headers:
-            results["score"] += 10
-        else:
-            results["findings"].append({
-                "severity": "High",
-                "description": "Missing Strict-Transport-Security (HSTS) header.",
-                "remediation": "Enable HSTS to force HTTPS connections."
-            })
-
-        # 2. Content-Security-Policy
-        if "Content-Security-Policy" in headers:
-            csp = headers["Content-Security-Policy"]
-            if "unsafe-inline" in csp or "unsafe-eval" in csp:
-                 results["findings"].append({
-                    "severity": "Medium",
-                    "description": "Content-Security-Policy contains unsafe directives ('unsafe-inline' or 'unsafe-eval').",
-                    "remediation": "Refine CSP to avoid using unsafe directives."
-                })
-                 results["score"] += 5 # Partial credit
-            else:
-                results["score"] += 10
-        else:
-            results["findings"].append({
-                "severity": "High",
-                "description": "Missing Content-Security-Policy (CSP) header.",
-                "remediation": "Implement a CSP to mitigate XSS and other attacks."
-            })
-
-        # 3. X-Frame-Options
-        if "X-Frame-Options" in headers:
-            results["score"] += 10
-        else:
-            results["findings"].append({
-                "severity": "Medium",
-                "description": "Missing X-Frame-Options header.",
-                "remediation": "Set X-Frame-Options to DENY or SAMEORIGIN to prevent clickjacking."
-            })
-
-        # 4. X-Content-Type-Options
-        if "X-Content-Type-Options" in headers and headers["X-Content-Type-Options"] == "nosniff":
-            results["score"] += 10
-        else:
-             results["findings"].append({
-                "severity": "Low",
-                "description": "Missing or incorrect X-Content-Type-Options header.",
-                "remediation": "Set X-Content-Type-Options to 'nosniff'."
-            })
-            
-        # 5. Referrer-Policy
-        if "Referrer-Policy" in headers:
-            results["score"] += 5
-        else:
-             results["findings"].append({
-                "severity": "Low",
-                "description": "Missing Referrer-Policy header.",
-                "remediation": "Set a Referrer-Policy to control information sent in Referer headers."
-            })
-
-        # 6. Permissions-Policy
-        if "Permissions-Policy" in headers or "Feature-Policy" in headers:
-            results["score"] += 5
-        else:
-             results["findings"].append({
-                "severity": "Low",
-                "description": "Missing Permissions-Policy (or Feature-Policy) header.",
-                "remediation": "Set Permissions-Policy to control browser features."
-            })
-
-        # Normalize score to 100 max for this section
-        # Max points possible above: 10+10+10+10+5+5 = 50
-        # We want to return a raw score that will be weighted later, or a percentage?
-        # The prompt says "Deterministic weighted scoring: TLS (30%), headers (30%)..."
-        # So let's return a percentage (0-100) for this module.
-        
-        max_possible = 50
-        results["score"] = min(100, int((results["score"] / max_possible) * 100))
-
+        results["headers"] = dict(response.headers)
+        results.update(HEADER_RULESET.evaluate(response.headers))
     except Exception as e:
         results["error"] = str(e)
         results["score"] = 0
@@ -0,0 +1,80 @@
+import asyncio
+import socket
+import threading
+import time
+import httpx
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from ..config import HEALTH_BACKOFF_BASE, HEALTH_BACKOFF_MAX, HEALTH_MAX_HOSTS
+
+class HostHealth:
+    """
+    Remembers hosts whose first probe definitively failed and keeps them out of scans with
+    exponential backoff: HEALTH_BACKOFF_BASE after the first failure, doubling on each consecutive
+    one up to HEALTH_BACKOFF_MAX. A success resets it. Keys are hostnames (DNS failures) or
+    "host:port" endpoints (connect timeouts, which only say that one port is unreachable).
+    """
+
+    def __init__(self, base: float = HEALTH_BACKOFF_BASE, maximum: float = HEALTH_BACKOFF_MAX, max_hosts: int = HEALTH_MAX_HOSTS):
+        self.base = base
+        self.maximum = maximum
+        self.max_hosts = max_hosts
+        # host -> {"failures": int, "reason": str, "until": epoch seconds}
+        self._hosts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retry_after(self, host: str) -> float:
+        """Seconds until host may be probed again; 0 when it is not backed off."""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                return 0.0
+            return max(0.0, entry["until"] - time.time())
+
+    def status(self, host: str) -> Optional[Dict[str, Any]]:
+        """Failure count, last reason and remaining backoff for host, or None if healthy."""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                return None
+            return {
+                "failures": entry["failures"],
+                "reason": entry["reason"],
+                "retry_after": round(max(0.0, entry["until"] - time.time()), 1),
+            }
+
+    def record_failure(self, host: str, reason: str) -> float:
+        """Registers a definitive failure and returns the backoff applied, in seconds."""
+        with self._lock:
+            entry = self._hosts.pop(host, None) or {"failures": 0}
+            entry["failures"] += 1
+            backoff = min(self.maximum, self.base * 2 ** (entry["failures"] - 1))
+            entry["reason"] = reason
+            entry["until"] = time.time() + backoff
+            self._hosts[host] = entry
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+            return backoff
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+# Shared by every scan in this process (UI reruns and bulk runs alike)
+default_health = HostHealth()
+
+def is_definitive_failure(exc: BaseException) -> bool:
+    """
+    True for errors meaning the target cannot be reached, so every other check against it
+    would fail the same way: the name does not resolve, or connecting timed out. A refused
+    connection proves the host is up, and slow responses (read timeouts) do not qualify.
+    """
+    return isinstance(exc, (socket.gaierror, httpx.ConnectTimeout))
+
+def is_timeout(exc: BaseException) -> bool:
+    """True for errors raised because an operation ran out of time (connect, read, handshake)."""
+    return isinstance(exc, (httpx.TimeoutException, asyncio.TimeoutError, socket.timeout))
@@ -0,0 +1,180 @@
+import httpx
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from ..config import (
+    HTTP_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_PROBE_MODE,
+    HTTP_PROBE_MAX_BYTES,
+    CORS_PROBE_ORIGIN,
+    USER_AGENT,
+)
+
+def create_client(
+    max_connections: int = HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+) -> httpx.AsyncClient:
+    """
+    Creates a keep-alive AsyncClient meant to be shared by every passive check of a scan run.
+    The caller owns the client and is responsible for closing it.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=HTTP_TIMEOUT,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+@asynccontextmanager
+async def client_session(client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yields the given client untouched, or a short-lived one when none is supplied
+    (e.g. a checker called on its own outside of a scan run).
+    """
+    if client is not None:
+        yield client
+        return
+
+    async with create_client() as owned:
+        yield owned
+
+class RequestTrace:
+    """
+    Connection-level timings of one logical request, redirects and HEAD fallbacks included,
+    collected through httpcore's "trace" request extension (seconds, summed over requests).
+    A request that opened no connection went over a kept-alive one from the pool.
+    Mocked transports emit no events, so every count stays at 0.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.redirects = 0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.first_byte = 0.0
+        self._started: Dict[str, float] = {}
+
+    async def __call__(self, event: str, info: Dict[str, Any]) -> None:
+        # Events are "<layer>.<step>.started" then ".complete" or ".failed", e.g. "connection.connect_tcp.started"
+        step, _, phase = event.rpartition(".")
+        now = time.perf_counter()
+        if phase == "started":
+            self._started[step] = now
+            if step.endswith(".send_request_headers"):
+                self.requests += 1
+                self._started["request"] = now
+            return
+        if phase != "complete":
+            return
+        start = self._started.pop(step, now)
+        if step == "connection.connect_tcp":
+            self.connections += 1
+            self.connect += now - start
+        elif step == "connection.start_tls":
+            self.tls += now - start
+        elif step.endswith(".receive_response_headers"):
+            self.first_byte += now - self._started.pop("request", now)
+
+# Statuses that mean the server does not support HEAD for this resource
+HEAD_REJECTED_STATUSES = (405, 501)
+
+async def send_probe(
+    session: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    follow_redirects: bool = False,
+    mode: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    trace: Optional[RequestTrace] = None,
+) -> httpx.Response:
+    """
+    Sends a request whose response is only needed for its status line and headers.
+    See HTTP_PROBE_MODE in config for the available modes.
+    The returned response is closed; its body must not be accessed in "stream" or "head" mode.
+    With `trace`, connection timings of every request sent are added to it.
+    """
+    mode = mode or HTTP_PROBE_MODE
+    max_bytes = HTTP_PROBE_MAX_BYTES if max_bytes is None else max_bytes
+    extensions = {"trace": trace} if trace is not None else None
+
+    if mode == "get":
+        response = await session.request(
+            method, url, headers=headers, timeout=10, follow_redirects=follow_redirects, extensions=extensions,
+        )
+    else:
+        response = None
+        if mode == "head" and method == "GET":
+            response = await _stream_request(session, "HEAD", url, headers, follow_redirects, 0, extensions)
+            if response.status_code in HEAD_REJECTED_STATUSES:
+                response = None
+        if response is None:
+            response = await _stream_request(session, method, url, headers, follow_redirects, max_bytes, extensions)
+
+    if trace is not None:
+        trace.redirects += len(response.history)
+    return response
+
+async def _stream_request(
+    session: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    follow_redirects: bool,
+    max_bytes: int,
+    extensions: Optional[Dict[str, Any]] = None,
+) -> httpx.Response:
+    """Streams a request and stops reading once max_bytes of body have been received."""
+    request = session.build_request(method, url, headers=headers, timeout=10, extensions=extensions)
+    response = await session.send(request, stream=True, follow_redirects=follow_redirects)
+    try:
+        received = 0
+        # Draining a small body lets the pool reuse the connection; a larger one is cut off
+        # and the connection is dropped instead of downloading the rest.
+        if max_bytes > 0:
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+                if received >= max_bytes:
+                    break
+    finally:
+        await response.aclose()
+    return response
+
+async def fetch_probe(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    mode: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    trace: Optional[RequestTrace] = None,
+) -> httpx.Response:
+    """
+    Performs the single GET shared by the header and CORS analyzers.
+    The probe Origin is attached so the CORS response headers are present on the same response.
+    Extra `headers` (e.g. If-None-Match for incremental rescans) are sent along.
+    """
+    async with client_session(client) as session:
+        return await send_probe(
+            session,
+            "GET",
+            url,
+            headers={"Origin": CORS_PROBE_ORIGIN, **(headers or {})},
+            follow_redirects=True,
+            mode=mode,
+            trace=trace,
+        )
+
+async def fetch_options(
+    url: str, client: Optional[httpx.AsyncClient] = None, trace: Optional[RequestTrace] = None,
+) -> httpx.Response:
+    """Sends the OPTIONS request whose Allow header the methods checker evaluates."""
+    async with client_session(client) as session:
+        return await send_probe(session, "OPTIONS", url, trace=trace)
@@ -0,0 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+class HostLimiter:
+    """
+    Bounds concurrent operations both globally and per host.
+    Create one per event loop (e.g. per scan run); asyncio primitives cannot be shared across loops.
+    """
+
+    def __init__(self, global_limit: int, per_host_limit: int):
+        self._global = asyncio.Semaphore(global_limit)
+        self._per_host_limit = per_host_limit
+        # host -> [semaphore, number of holders and waiters]; dropped once unused so
+        # a bulk run over thousands of hosts does not keep a semaphore per host forever
+        self._hosts: Dict[str, List] = {}
+
+    @asynccontextmanager
+    async def acquire(self, host: str) -> AsyncIterator[None]:
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = [asyncio.Semaphore(self._per_host_limit), 0]
+            self._hosts[host] = entry
+        entry[1] += 1
+        try:
+            # Take the host slot first so waiting on a busy host never holds a global slot
+            async with entry[0]:
+                async with self._global:
+                    yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._hosts[host]
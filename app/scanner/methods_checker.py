@@ -1,10 +1,22 @@
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .http_client import fetch_options
 
-def check_methods(url: str) -> Dict[str, Any]:
+async def check_methods(url: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
     """
     Checks for dangerous HTTP methods enabled.
     """
+    try:
+        response = await fetch_options(url, client)
+    except Exception as e:
+        return {"score": 0, "findings": [], "details": {}, "error": str(e)}
+
+    return analyze_methods(response)
+
+def analyze_methods(response: httpx.Response) -> Dict[str, Any]:
+    """
+    Evaluates the Allow header of an OPTIONS response. Performs no I/O.
+    """
     results = {
         "score": 100,
         "findings": [],
@@ -12,7 +24,6 @@ def check_methods(url: str) -> Dict[str, Any]:
     }
     
     try:
-        response = httpx.options(url, timeout=10)
         allow_header = response.headers.get("Allow")
         
         if allow_header:
@@ -1,24 +1,310 @@
 import asyncio
+import errno
+import ipaddress
 import socket
-from typing import Dict, Any, List
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, Any, Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
+from ..utils.metrics import default_metrics
+from ..config import (
+    PORT_SCAN_TIMEOUT,
+    PORT_SCAN_MIN_TIMEOUT,
+    PORT_SCAN_MAX_CONCURRENCY,
+    PORT_SCAN_INITIAL_CONCURRENCY,
+    PORT_SCAN_MIN_CONCURRENCY,
+    PORT_SCAN_FD_RESERVE,
+    PORT_SCAN_FD_RETRIES,
+)
 
-async def check_port(hostname: str, port: int, timeout: float = 1.0) -> int:
+# resource is POSIX-only; without it the file-descriptor budget is simply not enforced
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Probe outcomes
+OPEN = "open"
+CLOSED = "closed"
+TIMEOUT = "timeout"
+FD_EXHAUSTED = "fd_exhausted"
+ERROR = "error"  # never probed: still out of descriptors after PORT_SCAN_FD_RETRIES
+
+def parse_ports(spec: str) -> List[int]:
+    """
+    Parses a port specification such as "22,80,443" or "1-1024,3306" into a sorted list.
+    """
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(p) for p in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ports.update(range(start, end + 1))
+    return sorted(ports)
+
+def fd_budget(reserve: int = PORT_SCAN_FD_RESERVE) -> Optional[int]:
+    """
+    Returns how many sockets may be open at once under the process file-descriptor limit,
+    keeping `reserve` descriptors for everything else. None when there is no known limit.
+    """
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return max(1, soft - reserve)
+
+class AdaptiveLimiter:
     """
-    Checks if a single port is open. Returns port number if open, 0 if closed/timeout.
+    Concurrency limit that grows additively while probes get answers and shrinks
+    multiplicatively on timeouts or descriptor exhaustion (AIMD).
+    Single event loop only: the bookkeeping is unlocked and the uncontended path never waits.
     """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def __aenter__(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        self.in_flight -= 1
+        self._wake()
+
+    def on_answer(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1)
+        self._wake()
+
+    def on_backoff(self, factor: float) -> None:
+        self.limit = max(self.minimum, self.limit * factor)
+
+    def _wake(self) -> None:
+        # Wake only as many waiters as there are free slots
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+class _TimeoutEstimator:
+    """
+    Per-host connect timeout derived from observed round trips (RFC 6298 style),
+    clamped between `minimum` and the configured `maximum`. Lets fast hosts finish
+    without waiting the full timeout on every filtered port.
+    """
+
+    def __init__(self, maximum: float, minimum: float):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+
+    def observe(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.maximum
+        return min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+async def _probe(address: str, port: int, timeout: float) -> Tuple[str, float]:
+    """TCP connect probe. Returns (outcome, round trip in seconds)."""
+    if _RAW_CONNECT and _is_ip(address):
+        return await _probe_raw(address, port, timeout)
+
+    start = time.perf_counter()
     try:
-        conn = asyncio.open_connection(hostname, port)
+        conn = asyncio.open_connection(address, port)
         reader, writer = await asyncio.wait_for(conn, timeout=timeout)
-        writer.close()
+    except asyncio.TimeoutError:
+        return TIMEOUT, timeout
+    except OSError as e:
+        if e.errno in (errno.EMFILE, errno.ENFILE):
+            return FD_EXHAUSTED, 0.0
+        # Refused or unreachable: the host answered (or the network did) without a service
+        return CLOSED, time.perf_counter() - start
+
+    rtt = time.perf_counter() - start
+    writer.close()
+    try:
         await writer.wait_closed()
-        return port
-    except:
-        return 0
+    except Exception:
+        pass
+    return OPEN, rtt
+
+# The raw probe needs add_writer, which the Windows proactor loop does not provide
+_RAW_CONNECT = sys.platform != "win32"
+
+@lru_cache(maxsize=4096)
+def _is_ip(address: str) -> bool:
+    try:
+        ipaddress.ip_address(address)
+        return True
+    except ValueError:
+        return False
 
-async def check_ports(url: str, ports: List[int]) -> Dict[str, Any]:
+async def _probe_raw(address: str, port: int, timeout: float) -> Tuple[str, float]:
+    """
+    Non-blocking connect() on a bare socket, waiting for writability with a timer instead of
+    asyncio.wait_for. Skips the task, transport and stream objects of open_connection, which
+    dominate the cost of probing tens of thousands of closed ports.
+    """
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    try:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+    except OSError as e:
+        if e.errno in (errno.EMFILE, errno.ENFILE):
+            return FD_EXHAUSTED, 0.0
+        raise
+
+    start = time.perf_counter()
+    try:
+        sock.setblocking(False)
+        err = sock.connect_ex((address, port))
+        if err in (errno.EINPROGRESS, errno.EAGAIN):
+            waiter = loop.create_future()
+            fd = sock.fileno()
+            loop.add_writer(fd, _resolve_waiter, waiter, True)
+            timer = loop.call_later(timeout, _resolve_waiter, waiter, False)
+            try:
+                connected = await waiter
+            finally:
+                loop.remove_writer(fd)
+                timer.cancel()
+            if not connected:
+                return TIMEOUT, timeout
+            err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+    finally:
+        sock.close()
+
+    rtt = time.perf_counter() - start
+    if err == 0:
+        return OPEN, rtt
+    if err in (errno.EMFILE, errno.ENFILE):
+        return FD_EXHAUSTED, 0.0
+    return CLOSED, rtt
+
+def _has_route(address: str) -> bool:
+    """
+    True when the kernel has a route to `address`. Connecting a UDP socket only looks the
+    route up, nothing is sent; without one it fails with ENETUNREACH (or EADDRNOTAVAIL /
+    EAFNOSUPPORT when the address family is not configured at all).
+    """
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.connect((address, 9))
+    except OSError:
+        return False
+    return True
+
+def _scan_address(addresses: Sequence[str]) -> str:
+    """
+    The first address with a route. An IPv6 address listed first on a host without IPv6
+    connectivity would otherwise answer every probe with ENETUNREACH, recorded as closed.
+    """
+    for address in addresses:
+        if not _is_ip(address) or _has_route(address):
+            return address
+    return addresses[0]
+
+def _resolve_waiter(waiter: "asyncio.Future", value: bool) -> None:
+    if not waiter.done():
+        waiter.set_result(value)
+
+async def scan_hosts(
+    hosts: Iterable[str],
+    ports: Sequence[int],
+    timeout: float = PORT_SCAN_TIMEOUT,
+    max_concurrency: int = PORT_SCAN_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    TCP connect scan of every (host, port) pair, for authorized targets only.
+    Work is generated lazily and processed by a fixed pool of workers whose effective
+    concurrency adapts to timeouts and to the file-descriptor limit, so memory stays flat
+    for full port ranges. The scan ends as soon as the last probe is answered.
+    `hosts` are best given as addresses (see check_ports), or every connect resolves the name.
+    Returns {"open": {host: [ports]}, "errors": {host: [ports]}, "stats": {...}}.
+    """
+    budget = fd_budget()
+    maximum = min(max_concurrency, budget) if budget else max_concurrency
+    limiter = AdaptiveLimiter(PORT_SCAN_INITIAL_CONCURRENCY, PORT_SCAN_MIN_CONCURRENCY, maximum)
+
+    work = ((host, port) for host in hosts for port in ports)
+    open_ports: Dict[str, List[int]] = {}
+    failed_ports: Dict[str, List[int]] = {}
+    estimators: Dict[str, _TimeoutEstimator] = {}
+    stats = {"probed": 0, OPEN: 0, CLOSED: 0, TIMEOUT: 0, FD_EXHAUSTED: 0, ERROR: 0}
+
+    async def worker():
+        # All workers share one generator; next() never awaits, so items are never duplicated
+        for host, port in work:
+            estimator = estimators.setdefault(host, _TimeoutEstimator(timeout, PORT_SCAN_MIN_TIMEOUT))
+            for attempt in range(PORT_SCAN_FD_RETRIES + 1):
+                async with limiter:
+                    outcome, rtt = await _probe(host, port, estimator.timeout())
+                if outcome != FD_EXHAUSTED:
+                    break
+                # Out of descriptors: halve concurrency and retry this port once slots free up
+                stats[FD_EXHAUSTED] += 1
+                limiter.on_backoff(0.5)
+                if attempt < PORT_SCAN_FD_RETRIES:
+                    await asyncio.sleep(0.05 * 2 ** attempt)
+            else:
+                # Descriptors never came back (held elsewhere in the process): give this port up
+                stats[ERROR] += 1
+                failed_ports.setdefault(host, []).append(port)
+                continue
+
+            stats["probed"] += 1
+            stats[outcome] += 1
+            if outcome == TIMEOUT:
+                limiter.on_backoff(0.9)
+            else:
+                estimator.observe(rtt)
+                limiter.on_answer()
+            if outcome == OPEN:
+                open_ports.setdefault(host, []).append(port)
+
+    # No more workers than probes: spawning the full pool for a handful of ports costs more than the scan
+    workers = limiter.maximum
+    if isinstance(hosts, Sequence):
+        workers = max(1, min(workers, len(hosts) * len(ports)))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+    for found in (*open_ports.values(), *failed_ports.values()):
+        found.sort()
+    stats["final_concurrency"] = int(limiter.limit)
+    return {"open": open_ports, "errors": failed_ports, "stats": stats}
+
+async def check_ports(url: str, ports: List[int], addresses: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Performs a simple TCP connect scan on the specified ports.
+    `addresses` are pre-resolved IPs for the host; the first one with a route is scanned
+    so that each port does not trigger its own DNS lookup.
     """
     results = {
         "score": 100,
@@ -28,20 +314,25 @@ async def check_ports(url: str, ports: List[int]) -> Dict[str, Any]:
     
     try:
         parsed = urlparse(url)
-        hostname = parsed.netloc
-        
-        # Limit concurrency
-        semaphore = asyncio.Semaphore(20)
+        hostname = _scan_address(addresses) if addresses else (parsed.hostname or parsed.netloc)
         
-        async def sem_check(p):
-            async with semaphore:
-                return await check_port(hostname, p)
-
-        tasks = [sem_check(p) for p in ports]
-        open_ports = await asyncio.gather(*tasks)
-        open_ports = [p for p in open_ports if p != 0]
+        scan = await scan_hosts([hostname], ports)
+        open_ports = scan["open"].get(hostname, [])
         
         results["details"]["open_ports"] = open_ports
+        results["details"]["address"] = hostname
+        results["details"]["scan"] = scan["stats"]
+        failed = scan["errors"].get(hostname, [])
+        if failed:
+            results["details"]["failed_ports"] = failed
+            results["findings"].append({
+                "severity": "Info",
+                "description": f"{len(failed)} port(s) could not be probed: the scanner ran out of file descriptors.",
+                "remediation": "Raise the open-file limit (ulimit -n) or scan fewer ports at once.",
+            })
+        for outcome in (OPEN, CLOSED, TIMEOUT, ERROR):
+            default_metrics.inc("cybersafe_port_probes_total", scan["stats"][outcome], outcome=outcome)
+        default_metrics.inc("cybersafe_timeouts_total", scan["stats"][TIMEOUT], stage="ports")
         
         if open_ports:
              results["findings"].append({
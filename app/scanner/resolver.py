@@ -0,0 +1,83 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from ..config import DNS_CACHE_TTL, DNS_CACHE_SIZE
+from ..utils.metrics import default_metrics
+
+class Resolver:
+    """
+    Resolves hostnames to their A and AAAA addresses, caching answers in-process.
+    getaddrinfo does not expose record TTLs, so answers are kept for a fixed `ttl`.
+    The cache is plain data, so one instance can be shared across event loops and scan runs.
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, max_entries: int = DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+
+    def lookup(self, hostname: str) -> Optional[List[str]]:
+        """Returns the cached addresses for hostname, or None when missing or expired."""
+        entry = self._cache.get(hostname)
+        if entry is None:
+            return None
+        expires, addresses = entry
+        if expires < time.monotonic():
+            self._cache.pop(hostname, None)
+            return None
+        self._cache.move_to_end(hostname)
+        return addresses
+
+    async def resolve(self, hostname: str) -> List[str]:
+        """Returns the addresses of hostname (IPv4 and IPv6, resolver order). Raises socket.gaierror."""
+        if _is_ip(hostname):
+            return [hostname]
+
+        cached = self.lookup(hostname)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(hostname, None, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+
+        self._cache[hostname] = (time.monotonic() + self.ttl, addresses)
+        self._cache.move_to_end(hostname)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return addresses
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+def _is_ip(hostname: str) -> bool:
+    try:
+        ipaddress.ip_address(hostname)
+        return True
+    except ValueError:
+        return False
+
+# Shared by every scan in this process (UI reruns and bulk runs alike)
+default_resolver = Resolver()
+
+async def resolve_target(hostname: str, resolver: Optional[Resolver] = None) -> Dict[str, Any]:
+    """
+    Resolution stage of a scan. Returns the "dns" section of the results:
+    the addresses, whether they came from the cache, and the time spent resolving.
+    """
+    resolver = resolver or default_resolver
+    results = {"hostname": hostname, "addresses": [], "cached": resolver.lookup(hostname) is not None}
+    if not _is_ip(hostname):
+        default_metrics.inc("cybersafe_cache_lookups_total", cache="dns", result="hit" if results["cached"] else "miss")
+
+    start = time.perf_counter()
+    try:
+        results["addresses"] = await resolver.resolve(hostname)
+    except Exception as e:
+        results["error"] = str(e)
+    results["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    return results
@@ -0,0 +1,109 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+class Condition(NamedTuple):
+    """A test on response headers. Build with present(), equals(), matches(), any_of(), all_of(), not_()."""
+    op: str
+    args: Tuple[Any, ...]
+
+class Rule(NamedTuple):
+    """
+    One declarative check: when `when` holds, `points` are added to the score and
+    `finding` (severity, description, remediation) is reported, if any.
+    """
+    id: str
+    when: Condition
+    points: int = 0
+    finding: Optional[Dict[str, str]] = None
+
+def present(header: str) -> Condition:
+    return Condition("present", (header,))
+
+def equals(header: str, value: str) -> Condition:
+    return Condition("equals", (header, value))
+
+def matches(header: str, pattern: str) -> Condition:
+    """Header present and its value contains a match for the regular expression `pattern`."""
+    return Condition("matches", (header, pattern))
+
+def any_of(*conditions: Condition) -> Condition:
+    return Condition("any", conditions)
+
+def all_of(*conditions: Condition) -> Condition:
+    return Condition("all", conditions)
+
+def not_(condition: Condition) -> Condition:
+    return Condition("not", (condition,))
+
+HeaderMap = Dict[str, str]
+Predicate = Callable[[HeaderMap], bool]
+
+def _compile(condition: Condition, names: set) -> Predicate:
+    op, args = condition
+    if op in ("present", "equals", "matches"):
+        name = args[0].lower()
+        names.add(name)
+        if op == "present":
+            return lambda h: name in h
+        if op == "equals":
+            value = args[1]
+            return lambda h: h.get(name) == value
+        search = re.compile(args[1]).search
+        return lambda h: name in h and search(h[name]) is not None
+    children = [_compile(child, names) for child in args]
+    if op == "any":
+        return lambda h: any(p(h) for p in children)
+    if op == "all":
+        return lambda h: all(p(h) for p in children)
+    if op == "not":
+        child = children[0]
+        return lambda h: not child(h)
+    raise ValueError(f"Unknown rule condition: {op!r}")
+
+class RuleSet:
+    """
+    A rule table compiled once into predicates over a lowercased header map.
+    Evaluation makes a single pass over the response headers, keeping only the names
+    the rules refer to, then runs the rules in table order.
+
+    The score starts at `base` plus the points of every matching rule. With `max_points`
+    it is reported as a percentage of that maximum; it is always clamped to 0-100.
+    """
+
+    def __init__(self, rules: Iterable[Rule], base: int = 0, max_points: Optional[int] = None):
+        self.rules = tuple(rules)
+        self.base = base
+        self.max_points = max_points
+        names: set = set()
+        self._compiled = [(_compile(rule.when, names), rule) for rule in self.rules]
+        self.names = frozenset(names)
+
+    def select(self, headers: Mapping[str, Optional[str]]) -> HeaderMap:
+        """
+        Lowercased view of the headers the rules use. Repeated names (differing only in case,
+        in a plain dict) are joined with ", " as httpx does; None values count as absent.
+        """
+        selected: HeaderMap = {}
+        for name, value in headers.items():
+            key = name.lower()
+            if key in self.names and value is not None:
+                selected[key] = f"{selected[key]}, {value}" if key in selected else value
+        return selected
+
+    def evaluate(self, headers: Mapping[str, Optional[str]]) -> Dict[str, Any]:
+        """Scores one header map (an httpx.Headers or a stored dict): {"score", "findings"}."""
+        selected = self.select(headers)
+        score = self.base
+        findings: List[Dict[str, str]] = []
+        for predicate, rule in self._compiled:
+            if predicate(selected):
+                score += rule.points
+                if rule.finding is not None:
+                    findings.append(dict(rule.finding))
+        if self.max_points:
+            score = min(100, int((score / self.max_points) * 100))
+        return {"score": max(0, min(100, score)), "findings": findings}
+
+    def evaluate_batch(self, header_maps: Iterable[Mapping[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Scores many stored header maps offline, e.g. to try new rules on historical captures."""
+        return [self.evaluate(headers) for headers in header_maps]
@@ -1,10 +1,81 @@
 import ssl
 import socket
+import asyncio
 import datetime
-from typing import Dict, Any
-from cryptography import x509
-from cryptography.hazmat.backends import default_backend
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
+from .limits import HostLimiter
+from ..config import TLS_TIMEOUT, TLS_EXPIRY_WARNING_DAYS
+from ..utils.metrics import default_metrics
+
+def _target(url: str) -> Tuple[str, int]:
+    """Returns the (hostname, port) to handshake with."""
+    parsed = urlparse(url)
+    return parsed.hostname or parsed.netloc, parsed.port or 443
+
+def tls_port(url: str) -> int:
+    """The port the TLS check connects to, which is 443 for plain-HTTP URLs."""
+    return _target(url)[1]
+
+def _analyze_certificate(results: Dict[str, Any], cert_bin: bytes, cipher: Any, version: Optional[str]) -> None:
+    """
+    Scores the peer certificate and negotiated protocol of a completed handshake into `results`.
+    Shared by the blocking and the asyncio checkers so both return the same shape.
+    """
+    results["details"]["cipher"] = cipher
+    results["details"]["version"] = version
+    
+    # cryptography is imported on the first certificate parse, not when the scanner loads
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    cert = x509.load_der_x509_certificate(cert_bin)
+    # Lets incremental rescans tell a rotated certificate from an unchanged one
+    results["details"]["fingerprint"] = cert.fingerprint(hashes.SHA256()).hex()
+    
+    # Check Expiry
+    not_after = cert.not_valid_after
+    now = datetime.datetime.utcnow()
+    days_left = (not_after - now).days
+    
+    results["details"]["expiry"] = not_after.isoformat()
+    results["details"]["days_left"] = days_left
+    
+    if days_left < 0:
+        results["findings"].append({
+            "severity": "Critical",
+            "description": f"Certificate expired on {not_after}.",
+            "remediation": "Renew the SSL certificate immediately."
+        })
+        results["score"] = 0 # Fail immediately
+    elif days_left < TLS_EXPIRY_WARNING_DAYS:
+        results["findings"].append({
+            "severity": "High",
+            "description": f"Certificate expires soon ({days_left} days).",
+            "remediation": "Renew the SSL certificate."
+        })
+        results["score"] += 50
+    else:
+        results["score"] += 100
+    
+    # Check Issuer (Self-signed detection)
+    issuer = cert.issuer.rfc4514_string()
+    subject = cert.subject.rfc4514_string()
+    results["details"]["issuer"] = issuer
+    results["details"]["subject"] = subject
+    
+    # Simple check for self-signed: issuer == subject (not always perfect but good heuristic for basic check)
+    # A better check is if verify_mode failed, but create_default_context verifies by default.
+    # If we are here, verification passed (unless we disabled it, which we didn't).
+    # So it is likely trusted.
+    
+    # Check Protocol Version
+    if version in ["TLSv1", "TLSv1.1"]:
+         results["findings"].append({
+            "severity": "High",
+            "description": f"Obsolete TLS version detected: {version}.",
+            "remediation": "Disable older TLS versions and support TLS 1.2 or 1.3."
+        })
+         results["score"] = max(0, results["score"] - 50) # Penalize
 
 def check_tls(url: str) -> Dict[str, Any]:
     """
@@ -17,67 +88,17 @@ def check_tls(url: str) -> Dict[str, Any]:
     }
     
     try:
-        parsed = urlparse(url)
-        hostname = parsed.netloc
-        port = 443
+        hostname, port = _target(url)
         
         context = ssl.create_default_context()
         
-        with socket.create_connection((hostname, port), timeout=5) as sock:
+        with socket.create_connection((hostname, port), timeout=TLS_TIMEOUT) as sock:
             with context.wrap_socket(sock, server_hostname=hostname) as ssock:
                 cert_bin = ssock.getpeercert(binary_form=True)
                 cipher = ssock.cipher()
                 version = ssock.version()
                 
-                results["details"]["cipher"] = cipher
-                results["details"]["version"] = version
-                
-                cert = x509.load_der_x509_certificate(cert_bin, default_backend())
-                
-                # Check Expiry
-                not_after = cert.not_valid_after
-                now = datetime.datetime.utcnow()
-                days_left = (not_after - now).days
-                
-                results["details"]["expiry"] = not_after.isoformat()
-                results["details"]["days_left"] = days_left
-                
-                if days_left < 0:
-                    results["findings"].append({
-                        "severity": "Critical",
-                        "description": f"Certificate expired on {not_after}.",
-                        "remediation": "Renew the SSL certificate immediately."
-                    })
-                    results["score"] = 0 # Fail immediately
-                elif days_left < 30:
-                    results["findings"].append({
-                        "severity": "High",
-                        "description": f"Certificate expires soon ({days_left} days).",
-                        "remediation": "Renew the SSL certificate."
-                    })
-                    results["score"] += 50
-                else:
-                    results["score"] += 100
-                
-                # Check Issuer (Self-signed detection)
-                issuer = cert.issuer.rfc4514_string()
-                subject = cert.subject.rfc4514_string()
-                results["details"]["issuer"] = issuer
-                results["details"]["subject"] = subject
-                
-                # Simple check for self-signed: issuer == subject (not always perfect but good heuristic for basic check)
-                # A better check is if verify_mode failed, but create_default_context verifies by default.
-                # If we are here, verification passed (unless we disabled it, which we didn't).
-                # So it is likely trusted.
-                
-                # Check Protocol Version
-                if version in ["TLSv1", "TLSv1.1"]:
-                     results["findings"].append({
-                        "severity": "High",
-                        "description": f"Obsolete TLS version detected: {version}.",
-                        "remediation": "Disable older TLS versions and support TLS 1.2 or 1.3."
-                    })
-                     results["score"] = max(0, results["score"] - 50) # Penalize
+        _analyze_certificate(results, cert_bin, cipher, version)
                 
     except ssl.SSLCertVerificationError as e:
         results["findings"].append({
@@ -91,3 +112,83 @@ def check_tls(url: str) -> Dict[str, Any]:
         results["score"] = 0
 
     return results
+
+async def check_tls_async(
+    url: str,
+    limiter: Optional[HostLimiter] = None,
+    addresses: Optional[List[str]] = None,
+    timeout: float = TLS_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Asyncio version of check_tls: the handshake runs on the event loop instead of a thread,
+    so thousands can be in flight at once. `limiter` bounds handshakes globally and per host.
+    `addresses` are pre-resolved IPs for the host; they are tried in order instead of resolving again.
+    """
+    results = {
+        "score": 0,
+        "findings": [],
+        "details": {}
+    }
+    
+    try:
+        hostname, port = _target(url)
+        context = ssl.create_default_context()
+        
+        if limiter is not None:
+            async with limiter.acquire(hostname):
+                cert_bin, cipher, version = await _handshake_any(hostname, addresses, port, context, timeout)
+        else:
+            cert_bin, cipher, version = await _handshake_any(hostname, addresses, port, context, timeout)
+            
+        _analyze_certificate(results, cert_bin, cipher, version)
+        
+    except ssl.SSLCertVerificationError as e:
+        results["findings"].append({
+            "severity": "Critical",
+            "description": f"Certificate verification failed: {e.verify_message}.",
+            "remediation": "Ensure the certificate is valid and issued by a trusted CA."
+        })
+        results["score"] = 0
+    except asyncio.TimeoutError:
+        default_metrics.inc("cybersafe_timeouts_total", stage="tls")
+        results["error"] = f"TLS handshake timed out after {timeout}s."
+        results["score"] = 0
+    except Exception as e:
+        results["error"] = str(e)
+        results["score"] = 0
+
+    return results
+
+async def _handshake_any(
+    hostname: str, addresses: Optional[List[str]], port: int, context: ssl.SSLContext, timeout: float
+) -> Tuple[bytes, Any, Optional[str]]:
+    """Handshakes with the first reachable address, falling back to the hostname itself."""
+    if not addresses:
+        return await _handshake(hostname, hostname, port, context, timeout)
+
+    for i, address in enumerate(addresses):
+        try:
+            return await _handshake(address, hostname, port, context, timeout)
+        except ssl.SSLError:
+            # The server answered; another address will not change the verdict
+            raise
+        except (OSError, asyncio.TimeoutError):
+            if i == len(addresses) - 1:
+                raise
+
+async def _handshake(
+    address: str, hostname: str, port: int, context: ssl.SSLContext, timeout: float
+) -> Tuple[bytes, Any, Optional[str]]:
+    """Opens a TLS connection, returns (DER certificate, cipher, protocol version) and closes it."""
+    conn = asyncio.open_connection(address, port, ssl=context, server_hostname=hostname)
+    reader, writer = await asyncio.wait_for(conn, timeout=timeout)
+    try:
+        ssl_object = writer.get_extra_info("ssl_object")
+        return ssl_object.getpeercert(binary_form=True), ssl_object.cipher(), ssl_object.version()
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            # The handshake data is already in hand; an unclean TLS shutdown is irrelevant
+            pass
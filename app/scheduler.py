@@ -0,0 +1,276 @@
+"""Recurring monitoring scheduler: rescans domain sets on their intervals (format in the README)."""
+import argparse
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import (
+    DEFAULT_PORTS,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_JITTER,
+    TLS_EXPIRY_WARNING_DAYS,
+    TLS_MAX_CONCURRENCY,
+    TLS_PER_HOST_CONCURRENCY,
+)
+from app.scan import scan_one
+from app.scanner.http_client import create_client
+from app.scanner.limits import HostLimiter
+from app.scanner.ports_checker import parse_ports
+from app.utils.caching import ScanCache
+from app.utils.domains import normalize_target
+from app.utils.history import HistoryStore
+from app.utils.metrics import MetricsFile, serve_metrics
+
+# Priority ranks; lower runs first when targets compete for the concurrency budget
+FAILED, EXPIRING, UNKNOWN, HEALTHY = range(4)
+
+def priority(record: Optional[Dict[str, Any]]) -> Tuple[int, float]:
+    """
+    Scheduling priority from a target's last scan record: (rank, days_left).
+    Failed scans first, then certificates expiring within the warning window (soonest first),
+    then targets never scanned, then everything else.
+    """
+    if record is None:
+        return UNKNOWN, math.inf
+    results = record.get("results") or {}
+    if record.get("error") or "short_circuit" in results:
+        return FAILED, math.inf
+    if any(isinstance(v, dict) and v.get("error") and not v.get("skipped") for v in results.values()):
+        return FAILED, math.inf
+    days_left = (results.get("tls") or {}).get("details", {}).get("days_left")
+    if days_left is not None and days_left < TLS_EXPIRY_WARNING_DAYS:
+        return EXPIRING, days_left
+    return HEALTHY, math.inf
+
+def spread_offset(target: str, interval: float) -> float:
+    """Stable position of a target inside its interval, uniform across targets."""
+    digest = hashlib.sha1(target.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 * interval
+
+def _parse_set_ports(value: Any, name: str) -> List[int]:
+    """Validates a set's "ports": a spec as on the command line ("1-1024,3306") or a list of ports."""
+    if isinstance(value, list) and all(isinstance(port, int) and not isinstance(port, bool) for port in value):
+        value = ",".join(map(str, value))
+    if not isinstance(value, str):
+        raise ValueError(f"set {name!r}: ports must be a list of ports or a spec such as '22,80,443'")
+    try:
+        return parse_ports(value)
+    except ValueError as e:
+        raise ValueError(f"set {name!r}: invalid ports {value!r} ({e})") from None
+
+def load_sets(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the schedule file (format in the README) into a list of domain sets.
+    Raises ValueError for invalid ports.
+    """
+    with open(path, encoding="utf-8") as fp:
+        config = json.load(fp)
+    sets = []
+    for entry in config["sets"]:
+        domains = list(entry.get("domains", []))
+        if entry.get("file"):
+            with open(entry["file"], encoding="utf-8") as fp:
+                domains += [line.strip() for line in fp if line.strip() and not line.startswith("#")]
+        name = entry.get("name", path)
+        sets.append({
+            "name": name,
+            "interval": float(entry["interval"]),
+            "domains": domains,
+            "active": bool(entry.get("active", False)),
+            "ports": _parse_set_ports(entry["ports"], name) if "ports" in entry else DEFAULT_PORTS,
+            "incremental": bool(entry.get("incremental", False)),
+        })
+    return sets
+
+class Scheduler:
+    """
+    Runs every target of every set once per interval, at a jittered offset, with at most
+    `concurrency` scans in flight. Due targets wait in a priority queue for a free slot.
+    Every run is a real rescan: `cache` only keeps the validators of incremental sets, module
+    results are never replayed from it.
+    """
+
+    def __init__(
+        self,
+        sets: List[Dict[str, Any]],
+        concurrency: int = SCHEDULER_CONCURRENCY,
+        jitter: float = SCHEDULER_JITTER,
+        history: Optional[HistoryStore] = None,
+        cache: Optional[ScanCache] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.sets = sets
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.history = history
+        self.cache = cache
+        self.rng = rng or random.Random()
+        self.completed = 0
+        self._seq = itertools.count()
+        # (due, seq, entry): targets waiting for their time
+        self._waiting: List[Tuple[float, int, Dict[str, Any]]] = []
+        # ((rank, days_left), due, seq, entry): targets due, waiting for a concurrency slot
+        self._ready: List[Tuple[Tuple[int, float], float, int, Dict[str, Any]]] = []
+
+    def _jittered(self, due: float, interval: float) -> float:
+        return due + self.rng.uniform(-self.jitter, self.jitter) * interval
+
+    def _last_record(self, domain: str) -> Optional[Dict[str, Any]]:
+        if self.history is None:
+            return None
+        latest = self.history.latest(domain)
+        return self.history.get(latest[0]["id"]) if latest else None
+
+    def _seed(self, now: float, once: bool) -> None:
+        for scan_set in self.sets:
+            interval = scan_set["interval"]
+            for target in scan_set["domains"]:
+                entry = {"target": target, "set": scan_set}
+                entry["priority"] = priority(self._last_record(normalize_target(target)[1]))
+                if once:
+                    due = now
+                elif entry["priority"][0] <= EXPIRING:
+                    # Known problems are rechecked right away instead of at their offset
+                    due = now
+                else:
+                    due = max(now, self._jittered(now + spread_offset(target, interval), interval))
+                heapq.heappush(self._waiting, (due, next(self._seq), entry))
+
+    async def run(
+        self,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+        once: bool = False,
+        client=None,
+    ) -> int:
+        """
+        Runs until cancelled (or, with `once`, until every target has been scanned once).
+        `on_record` receives each scan record as it completes. Returns the number of scans run.
+        """
+        loop = asyncio.get_running_loop()
+        self._seed(loop.time(), once)
+        tls_limiter = HostLimiter(TLS_MAX_CONCURRENCY, TLS_PER_HOST_CONCURRENCY)
+        owned = client is None
+        if owned:
+            client = create_client(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency * 2)
+        in_flight: Dict["asyncio.Task", Tuple[float, Dict[str, Any]]] = {}
+
+        try:
+            while self._waiting or self._ready or in_flight:
+                now = loop.time()
+                while self._waiting and self._waiting[0][0] <= now:
+                    due, seq, entry = heapq.heappop(self._waiting)
+                    heapq.heappush(self._ready, (entry["priority"], due, seq, entry))
+                while self._ready and len(in_flight) < self.concurrency:
+                    _, due, _, entry = heapq.heappop(self._ready)
+                    scan_set = entry["set"]
+                    # Monitoring observes the target: module results are never replayed from the TTL cache
+                    # (history would not record them anyway); incremental scans use it for validators only
+                    cache = self.cache if scan_set["incremental"] else None
+                    task = asyncio.ensure_future(scan_one(
+                        entry["target"], scan_set["active"], scan_set["ports"], client, tls_limiter, cache,
+                        history=self.history, incremental=scan_set["incremental"],
+                    ))
+                    in_flight[task] = (due, entry)
+
+                timeout = None
+                if self._waiting and len(in_flight) < self.concurrency:
+                    timeout = max(0.0, self._waiting[0][0] - loop.time())
+                if not in_flight:
+                    await asyncio.sleep(timeout or 0)
+                    continue
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    due, entry = in_flight.pop(task)
+                    record = task.result()
+                    record["set"] = entry["set"]["name"]
+                    self.completed += 1
+                    if on_record is not None:
+                        on_record(record)
+                    if not once:
+                        # Next run one interval after this one was due, so the spread is kept
+                        entry["priority"] = priority(record)
+                        interval = entry["set"]["interval"]
+                        next_due = max(loop.time(), self._jittered(due + interval, interval))
+                        heapq.heappush(self._waiting, (next_due, next(self._seq), entry))
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            if owned:
+                await client.aclose()
+        return self.completed
+
+async def _run(args: argparse.Namespace) -> int:
+    sink = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    history = None if args.no_history else HistoryStore()
+    cache = ScanCache()
+    scheduler = Scheduler(load_sets(args.schedule), args.concurrency, args.jitter, history, cache)
+    metrics = MetricsFile(args.metrics) if args.metrics else None
+    server = await serve_metrics(args.metrics_host, args.metrics_port) if args.metrics_port else None
+
+    def write(record: Dict[str, Any]) -> None:
+        sink.write(json.dumps(record, default=str) + "\n")
+        sink.flush()
+        if metrics is not None:
+            metrics.maybe_write()
+
+    try:
+        await scheduler.run(write, once=args.once)
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        cache.close()
+        if history is not None:
+            history.close()
+        if metrics is not None:
+            metrics.close()
+        if server is not None:
+            server.close()
+    print(f"Completed {scheduler.completed} scans.", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.scheduler", description="Cybersafe recurring monitoring scheduler.")
+    parser.add_argument("schedule", help="JSON file describing the domain sets and their intervals.")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file results are appended to ('-' for stdout).")
+    parser.add_argument("-c", "--concurrency", type=int, default=SCHEDULER_CONCURRENCY, help="Maximum scans in flight across all sets.")
+    parser.add_argument("--jitter", type=float, default=SCHEDULER_JITTER, help="Random shift of each run, as a fraction of its interval.")
+    parser.add_argument("--once", action="store_true", help="Scan every target once, by priority, then exit.")
+    parser.add_argument("--no-history", action="store_true", help="Do not record results in the scan history database.")
+    parser.add_argument("--metrics", help="Prometheus text file for aggregated timings and counters, rewritten as scans complete.")
+    parser.add_argument("--metrics-port", type=int, help="Also serve the metrics over HTTP on this port, at /metrics.")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Address for --metrics-port (default: loopback only).")
+    parser.add_argument(
+        "--i-own-these-targets",
+        dest="consent",
+        action="store_true",
+        help="Confirm you own every target or have explicit permission to scan it (required for sets with \"active\": true).",
+    )
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not 0 <= args.jitter < 0.5:
+        parser.error("--jitter must be in [0, 0.5)")
+    try:
+        sets = load_sets(args.schedule)
+    except ValueError as e:
+        parser.error(str(e))
+    if any(s["active"] for s in sets) and not args.consent:
+        parser.error("active sets require --i-own-these-targets. Scanning targets you do not own is illegal.")
+    try:
+        return asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import Tuple
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 def render_sidebar() -> Tuple[bool, bool, bool]:
     """
@@ -46,11 +46,26 @@ def render_sidebar() -> Tuple[bool, bool, bool]:
 
     return active_checked, advanced_tls_checked, (True, "") # Consent implicit for passive only? No, active is False.
 
-def render_results(results: dict):
-    """Renders the scan results."""
-    
-    # Score
-    score = results.get("score", 0)
+class ResultTab(NamedTuple):
+    """How one module's tab is rendered."""
+    label: str
+    subheader: str
+    style: str  # Streamlit call used for findings ("error" or "warning")
+    all_clear: str
+    details_key: str
+    missing: str
+
+# Tab layout by module, in display order
+RESULT_TABS = {
+    "tls": ResultTab("TLS/SSL", "TLS/SSL Configuration", "error", "No critical TLS issues found.", "details", "No TLS data available."),
+    "headers": ResultTab("Security Headers", "Security Headers", "warning", "Security headers look good.", "headers", "No headers data available."),
+    "cors": ResultTab("CORS", "CORS Configuration", "error", "No CORS issues found.", "details", "No CORS data available."),
+    "methods": ResultTab("HTTP Methods", "HTTP Methods", "warning", "HTTP methods look safe.", "details", "No methods data available."),
+    "ports": ResultTab("Open Ports", "Open Ports (Active Scan)", "error", "No open ports found (or scan disabled).", "details", "Active scan was not run."),
+}
+
+def render_score(score: int):
+    """Renders the overall risk score."""
     color = "green"
     if score < 50:
         color = "red"
@@ -58,89 +73,67 @@ def render_results(results: dict):
         color = "orange"
         
     st.markdown(f"## Overall Risk Score: :{color}[{score}/100]")
-    
-    # Tabs for sections
-    tabs = st.tabs(["TLS/SSL", "Security Headers", "CORS", "HTTP Methods", "Open Ports"])
-    
-    with tabs[0]:
-        st.subheader("TLS/SSL Configuration")
-        if "tls" in results:
-            data = results["tls"]
-            st.metric("Score", data.get("score", 0))
-            if data.get("findings"):
-                for f in data["findings"]:
-                    st.error(f"**{f['severity']}**: {f['description']}")
-                    st.info(f"**Remediation**: {f['remediation']}")
-            else:
-                st.success("No critical TLS issues found.")
-            
-            if "details" in data:
-                st.json(data["details"])
-        else:
-            st.info("No TLS data available.")
 
-    with tabs[1]:
-        st.subheader("Security Headers")
-        if "headers" in results:
-            data = results["headers"]
-            st.metric("Score", data.get("score", 0))
-            if data.get("findings"):
-                for f in data["findings"]:
-                    st.warning(f"**{f['severity']}**: {f['description']}")
-                    st.info(f"**Remediation**: {f['remediation']}")
-            else:
-                st.success("Security headers look good.")
-                
-            if "headers" in data:
-                with st.expander("View Raw Headers"):
-                    st.json(data["headers"])
+def render_module(module: str, data: dict):
+    """Renders one module's section (the body of its tab)."""
+    layout = RESULT_TABS[module]
+    
+    st.subheader(layout.subheader)
+    st.metric("Score", data.get("score", 0))
+    if data.get("findings"):
+        for f in data["findings"]:
+            getattr(st, layout.style)(f"**{f['severity']}**: {f['description']}")
+            st.info(f"**Remediation**: {f['remediation']}")
+    elif data.get("error"):
+        st.warning(f"Check did not complete: {data['error']}")
+    else:
+        st.success(layout.all_clear)
+        
+    if layout.details_key in data:
+        if module == "headers":
+            with st.expander("View Raw Headers"):
+                st.json(data[layout.details_key])
         else:
-            st.info("No headers data available.")
+            st.json(data[layout.details_key])
 
-    with tabs[2]:
-        st.subheader("CORS Configuration")
-        if "cors" in results:
-            data = results["cors"]
-            st.metric("Score", data.get("score", 0))
-            if data.get("findings"):
-                for f in data["findings"]:
-                    st.error(f"**{f['severity']}**: {f['description']}")
-                    st.info(f"**Remediation**: {f['remediation']}")
-            else:
-                st.success("No CORS issues found.")
-            if "details" in data:
-                st.json(data["details"])
-        else:
-            st.info("No CORS data available.")
+def create_results_view(expected_modules: List[str]) -> Dict[str, Any]:
+    """
+    Lays out the score and one tab per module with empty placeholders, so results can be
+    filled in as each module completes. Returns the placeholders keyed by module (and "score").
+    """
+    view = {"score": st.empty()}
+    view["score"].markdown("## Overall Risk Score: scanning...")
+    
+    tabs = st.tabs([layout.label for layout in RESULT_TABS.values()])
+    for tab, (module, layout) in zip(tabs, RESULT_TABS.items()):
+        with tab:
+            view[module] = st.empty()
+            with view[module].container():
+                st.subheader(layout.subheader)
+                if module in expected_modules:
+                    st.info("Waiting for results...")
+                else:
+                    st.info(layout.missing)
+    return view
 
-    with tabs[3]:
-        st.subheader("HTTP Methods")
-        if "methods" in results:
-            data = results["methods"]
-            st.metric("Score", data.get("score", 0))
-            if data.get("findings"):
-                for f in data["findings"]:
-                    st.warning(f"**{f['severity']}**: {f['description']}")
-                    st.info(f"**Remediation**: {f['remediation']}")
-            else:
-                st.success("HTTP methods look safe.")
-            if "details" in data:
-                st.json(data["details"])
-        else:
-            st.info("No methods data available.")
+def update_results_view(view: Dict[str, Any], key: str, value: Any):
+    """Fills the placeholder of a module that just completed. Other keys are ignored."""
+    if key in view and key != "score":
+        with view[key].container():
+            render_module(key, value)
 
-    with tabs[4]:
-        st.subheader("Open Ports (Active Scan)")
-        if "ports" in results:
-            data = results["ports"]
-            st.metric("Score", data.get("score", 0))
-            if data.get("findings"):
-                for f in data["findings"]:
-                    st.error(f"**{f['severity']}**: {f['description']}")
-                    st.info(f"**Remediation**: {f['remediation']}")
+def render_results(results: dict):
+    """Renders the scan results."""
+    
+    # Score
+    render_score(results.get("score", 0))
+    
+    # Tabs for sections
+    tabs = st.tabs([layout.label for layout in RESULT_TABS.values()])
+    for tab, (module, layout) in zip(tabs, RESULT_TABS.items()):
+        with tab:
+            if module in results:
+                render_module(module, results[module])
             else:
-                st.success("No open ports found (or scan disabled).")
-            if "details" in data:
-                st.json(data["details"])
-        else:
-            st.info("Active scan was not run.")
+                st.subheader(layout.subheader)
+                st.info(layout.missing)
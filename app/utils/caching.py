@@ -1,24 +1,129 @@
 import diskcache
+import hashlib
 import os
-from typing import Any
-from ..config import CACHE_DIR, CACHE_TTL
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from ..config import (
+    CACHE_DIR,
+    CACHE_TTL,
+    MEMORY_CACHE_SIZE,
+    MODULE_CACHE_TTLS,
+    TLS_CACHE_MAX_TTL,
+    TLS_EXPIRY_WARNING_DAYS,
+)
+
+class MemoryLRU:
+    """Thread-safe in-memory LRU with per-entry expiry. Sits in front of the disk cache."""
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+# Shared by every ScanCache in this process, so Streamlit reruns hit memory instead of disk
+_memory_tier = MemoryLRU()
 
 class ScanCache:
-    def __init__(self):
+    def __init__(self, memory: Optional[MemoryLRU] = None):
         self.cache = diskcache.Cache(CACHE_DIR)
+        self.memory = memory if memory is not None else _memory_tier
 
-    def get(self, key: str) -> Any:
-        """Retrieve a value from the cache."""
-        return self.cache.get(key)
+    def get(self, key: str, memory: bool = True) -> Any:
+        """
+        Retrieve a value from the cache. With `memory=False` only the disk tier is used,
+        for large values (rendered reports) that must not fill the entry-bounded memory tier.
+        """
+        if memory:
+            value = self.memory.get(key)
+            if value is not None:
+                return value
+
+        value, expire_time = self.cache.get(key, expire_time=True)
+        if value is not None and memory:
+            # Promote to the memory tier for the remainder of its disk lifetime
+            self.memory.set(key, value, expire_time if expire_time is not None else time.time() + CACHE_TTL)
+        return value
 
-    def set(self, key: str, value: Any, ttl: int = CACHE_TTL) -> None:
-        """Set a value in the cache with a TTL."""
+    def set(self, key: str, value: Any, ttl: int = CACHE_TTL, memory: bool = True) -> None:
+        """Set a value in the cache with a TTL (on disk only with `memory=False`)."""
         self.cache.set(key, value, expire=ttl)
+        if memory:
+            self.memory.set(key, value, time.time() + ttl)
+
+    def get_module(self, target: str, module: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        """Retrieve one checker's cached result for a target."""
+        return self.get(module_key(target, module, variant))
+
+    def set_module(self, target: str, module: str, result: Dict[str, Any], variant: str = "") -> None:
+        """
+        Cache one checker's result under its own key with the module's TTL.
+        Failed results are never cached, so the next scan retries them.
+        """
+        ttl = module_ttl(module, result)
+        if ttl > 0:
+            self.set(module_key(target, module, variant), result, ttl)
 
     def clear(self) -> None:
         """Clear the cache."""
         self.cache.clear()
+        self.memory.clear()
 
     def close(self) -> None:
         """Close the cache."""
         self.cache.close()
+
+def module_key(target: str, module: str, variant: str = "") -> str:
+    """Cache key of one checker's result, e.g. 'example.com:tls' or 'example.com:ports:<hash>'."""
+    key = f"{target}:{module}"
+    if variant:
+        key = f"{key}:{variant}"
+    return key
+
+def ports_variant(ports: Iterable[int]) -> str:
+    """Short, stable cache variant for a port list (full ranges would make unwieldy keys)."""
+    return hashlib.sha1(",".join(map(str, ports)).encode()).hexdigest()[:12]
+
+def module_ttl(module: str, result: Dict[str, Any]) -> int:
+    """
+    TTL in seconds for a checker's result; 0 means do not cache.
+    TLS results live until the certificate nears the expiry warning threshold, since nothing
+    else in them changes the score, capped at TLS_CACHE_MAX_TTL. Within the warning window
+    the score moves with every day left, so only the default TLS TTL applies.
+    """
+    if "error" in result:
+        return 0
+
+    ttl = MODULE_CACHE_TTLS.get(module, CACHE_TTL)
+    if module == "tls":
+        days_left = result.get("details", {}).get("days_left")
+        if days_left is None or days_left < TLS_EXPIRY_WARNING_DAYS:
+            return ttl
+        seconds = (days_left - TLS_EXPIRY_WARNING_DAYS) * 86400
+        # Never cache for less than the default module TTL, never beyond the cap
+        ttl = min(TLS_CACHE_MAX_TTL, max(ttl, seconds))
+    return ttl
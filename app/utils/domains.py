@@ -0,0 +1,66 @@
+import functools
+import pathlib
+from typing import NamedTuple, Tuple
+from urllib.parse import urlsplit
+from ..config import DOMAIN_CACHE_SIZE, SUFFIX_LIST_FILE
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+class Target(NamedTuple):
+    """A normalized scan target."""
+    url: str  # scan URL, https:// added when the input had no scheme
+    host: str  # lowercase hostname (or IP address) without a trailing dot
+    domain: str  # host as shown to the user, e.g. 'www.example.co.uk'
+    registrable: str  # registrable domain, e.g. 'example.co.uk'; the host itself for IPs and bare names
+    port: int  # explicit port, or the scheme's default
+
+    @property
+    def key(self) -> str:
+        """Canonical cache/coalescing key: the host, plus the port when it is not the default."""
+        if self.port == DEFAULT_PORTS.get(urlsplit(self.url).scheme):
+            return self.host
+        return f"{self.host}:{self.port}"
+
+@functools.lru_cache(maxsize=None)
+def suffix_extractor():
+    """
+    tldextract configured to never touch the network or the disk cache: it reads the pinned
+    SUFFIX_LIST_FILE when configured, otherwise the suffix list snapshot bundled with tldextract.
+    Built once per process.
+    """
+    import tldextract
+
+    urls = (pathlib.Path(SUFFIX_LIST_FILE).resolve().as_uri(),) if SUFFIX_LIST_FILE else ()
+    return tldextract.TLDExtract(cache_dir=None, suffix_list_urls=urls, fallback_to_snapshot=True)
+
+@functools.lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def parse_target(url_input: str) -> Target:
+    """Normalizes user input into a Target. Memoized: repeated inputs cost one dict lookup."""
+    url = url_input.strip()
+    if not url.startswith("http"):
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port or DEFAULT_PORTS.get(parts.scheme, 443)
+    except ValueError:
+        # Out-of-range or non-numeric port: let the checkers report the connection error
+        port = DEFAULT_PORTS.get(parts.scheme, 443)
+
+    extracted = suffix_extractor().extract_str(host)
+    if extracted.suffix:
+        registrable = f"{extracted.domain}.{extracted.suffix}"
+        domain = f"{extracted.subdomain}.{registrable}" if extracted.subdomain else registrable
+    else:
+        # IP addresses and names without a public suffix (e.g. localhost)
+        registrable = domain = host
+    return Target(url, host, domain, registrable, port)
+
+def normalize_target(url_input: str) -> Tuple[str, str]:
+    """
+    Normalizes user input into a scan URL and its domain.
+    Returns: (url, domain)
+    """
+    target = parse_target(url_input)
+    return target.url, target.domain
@@ -0,0 +1,263 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from ..config import HISTORY_DB
+
+Timestamp = Union[str, datetime.datetime]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    url TEXT NOT NULL,
+    scanned_at TEXT NOT NULL,
+    score INTEGER,
+    prev_id INTEGER,
+    short_circuit TEXT  -- JSON summary when the scan was cut short (host unreachable or backed off)
+);
+CREATE INDEX IF NOT EXISTS scans_domain_time ON scans (domain, scanned_at);
+CREATE INDEX IF NOT EXISTS scans_time ON scans (scanned_at);
+
+-- Most recent scan per domain, maintained on insert so "latest" never scans history
+CREATE TABLE IF NOT EXISTS latest (
+    domain TEXT PRIMARY KEY,
+    scan_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS modules (
+    scan_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    score INTEGER,
+    error TEXT,
+    result TEXT NOT NULL,
+    PRIMARY KEY (scan_id, module)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS modules_module ON modules (module, scan_id);
+
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    description TEXT NOT NULL,
+    remediation TEXT
+);
+CREATE INDEX IF NOT EXISTS findings_scan ON findings (scan_id, module, description);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings (severity, module, scan_id);
+"""
+
+class HistoryStore:
+    """
+    Permanent record of every completed scan, in SQLite.
+    Scans, per-module results and individual findings are stored in indexed tables, so
+    latest-per-domain, time-range and "what changed" queries stay fast at millions of rows.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            # Databases created before short circuits were recorded
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(scans)")}
+            if "short_circuit" not in columns:
+                self._conn.execute("ALTER TABLE scans ADD COLUMN short_circuit TEXT")
+
+    def record(self, domain: str, url: str, results: Dict[str, Any]) -> int:
+        """
+        Stores one scan (as returned by scan_target) and returns its id. A scan replayed
+        entirely from the module cache is not a new scan: the domain's latest id is returned.
+        """
+        cache = results.get("cache") or {}
+        replayed = bool(cache.get("hits")) and not cache.get("misses")
+        scanned_at = results.get("timestamp") or datetime.datetime.now().isoformat()
+        short_circuit = json.dumps(results["short_circuit"], default=str) if results.get("short_circuit") else None
+        with self._lock, self._conn:
+            prev = self._conn.execute("SELECT scan_id FROM latest WHERE domain = ?", (domain,)).fetchone()
+            if replayed and prev:
+                return prev["scan_id"]
+            scan_id = self._conn.execute(
+                "INSERT INTO scans (domain, url, scanned_at, score, prev_id, short_circuit) VALUES (?, ?, ?, ?, ?, ?)",
+                (domain, url, scanned_at, results.get("score"), prev["scan_id"] if prev else None, short_circuit),
+            ).lastrowid
+            modules, findings = [], []
+            for module, data in results.items():
+                if not isinstance(data, dict) or "score" not in data:
+                    continue  # score, timestamp, cache/short-circuit summaries
+                modules.append((scan_id, module, data.get("score"), data.get("error"), json.dumps(data, default=str)))
+                for finding in data.get("findings", []):
+                    findings.append((
+                        scan_id, module, finding.get("severity", ""), finding.get("description", ""), finding.get("remediation"),
+                    ))
+            self._conn.executemany("INSERT INTO modules VALUES (?, ?, ?, ?, ?)", modules)
+            self._conn.executemany("INSERT INTO findings VALUES (?, ?, ?, ?, ?)", findings)
+            self._conn.execute("INSERT OR REPLACE INTO latest (domain, scan_id) VALUES (?, ?)", (domain, scan_id))
+        return scan_id
+
+    def get(self, scan_id: int) -> Optional[Dict[str, Any]]:
+        """A stored scan with its full per-module results (and short circuit), or None."""
+        with self._lock:
+            scan = self._conn.execute("SELECT * FROM scans WHERE id = ?", (scan_id,)).fetchone()
+            if scan is None:
+                return None
+            rows = self._conn.execute("SELECT module, result FROM modules WHERE scan_id = ?", (scan_id,)).fetchall()
+        record = dict(scan)
+        record["results"] = {row["module"]: json.loads(row["result"]) for row in rows}
+        short_circuit = record.pop("short_circuit")
+        if short_circuit:
+            record["results"]["short_circuit"] = json.loads(short_circuit)
+        return record
+
+    def latest(self, domain: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most recent scan summary per domain (or for one domain)."""
+        query = "SELECT s.* FROM latest l JOIN scans s ON s.id = l.scan_id"
+        params: List[Any] = []
+        if domain is not None:
+            query += " WHERE l.domain = ?"
+            params.append(domain)
+        query += " ORDER BY l.domain LIMIT ?"
+        params.append(limit)
+        return self._query(query, params)
+
+    def scans(
+        self,
+        domain: Optional[str] = None,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """Scan summaries in [since, until), newest first, optionally for one domain."""
+        clauses, params = _time_range("scanned_at", since, until)
+        if domain is not None:
+            clauses.append("domain = ?")
+            params.append(domain)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT * FROM scans{where} ORDER BY scanned_at DESC LIMIT ?", params + [limit])
+
+    def diff(self, old_id: int, new_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-module changes between two scans: score before/after and the findings that
+        appeared or disappeared. Modules without changes are omitted.
+        """
+        with self._lock:
+            scores = {
+                (row["scan_id"], row["module"]): row["score"]
+                for row in self._conn.execute("SELECT scan_id, module, score FROM modules WHERE scan_id IN (?, ?)", (old_id, new_id))
+            }
+            findings = self._conn.execute(
+                "SELECT scan_id, module, severity, description, remediation FROM findings WHERE scan_id IN (?, ?)", (old_id, new_id)
+            ).fetchall()
+
+        old = {(f["module"], f["description"]): dict(f) for f in findings if f["scan_id"] == old_id}
+        new = {(f["module"], f["description"]): dict(f) for f in findings if f["scan_id"] == new_id}
+        changes: Dict[str, Dict[str, Any]] = {}
+        for module in sorted({m for _, m in scores}):
+            added = [_finding(new[k]) for k in new.keys() - old.keys() if k[0] == module]
+            removed = [_finding(old[k]) for k in old.keys() - new.keys() if k[0] == module]
+            before, after = scores.get((old_id, module)), scores.get((new_id, module))
+            if added or removed or before != after:
+                changes[module] = {"score": [before, after], "added": added, "removed": removed}
+        return changes
+
+    def new_findings(
+        self,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        module: Optional[str] = None,
+        severity: Optional[str] = None,
+        description: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Findings that a domain's scan in [since, until) has but its previous scan did not,
+        e.g. new_findings(since=week_ago, module="headers", description="%Strict-Transport-Security%")
+        lists the domains whose HSTS disappeared this week. `description` is a LIKE pattern.
+        """
+        clauses, params = _time_range("s.scanned_at", since, until)
+        clauses.append("s.prev_id IS NOT NULL")
+        for column, value, op in (("f.module", module, "="), ("f.severity", severity, "="), ("f.description", description, "LIKE")):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        query = f"""
+            SELECT s.domain, s.id AS scan_id, s.prev_id, s.scanned_at, f.module, f.severity, f.description
+            FROM scans s JOIN findings f ON f.scan_id = s.id
+            WHERE {' AND '.join(clauses)}
+              AND NOT EXISTS (
+                  SELECT 1 FROM findings p
+                  WHERE p.scan_id = s.prev_id AND p.module = f.module AND p.description = f.description
+              )
+            ORDER BY s.scanned_at DESC LIMIT ?
+        """
+        return self._query(query, params + [limit])
+
+    def iter_results(
+        self,
+        modules: Iterable[str],
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        domain: Optional[str] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Every scan in [since, until) with the stored results of `modules`, oldest first:
+        {"id", "domain", "url", "scanned_at", "score", "results": {module: result}}.
+        Read in batches of `batch_size` scans, so the whole history is never held in memory.
+        """
+        modules = list(modules)
+        clauses, params = _time_range("scanned_at", since, until)
+        if domain is not None:
+            clauses.append("domain = ?")
+            params.append(domain)
+        last_id = 0
+        while True:
+            where = " AND ".join(clauses + ["id > ?"])
+            scans = self._query(f"SELECT * FROM scans WHERE {where} ORDER BY id LIMIT ?", params + [last_id, batch_size])
+            if not scans:
+                return
+            ids = [scan["id"] for scan in scans]
+            rows = self._query(
+                f"SELECT scan_id, module, result FROM modules WHERE scan_id IN ({','.join('?' * len(ids))})"
+                f" AND module IN ({','.join('?' * len(modules))})",
+                ids + modules,
+            )
+            results: Dict[int, Dict[str, Any]] = {}
+            for row in rows:
+                results.setdefault(row["scan_id"], {})[row["module"]] = json.loads(row["result"])
+            for scan in scans:
+                scan["results"] = results.get(scan["id"], {})
+                yield scan
+            last_id = ids[-1]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+
+def _time_range(column: str, since: Optional[Timestamp], until: Optional[Timestamp]):
+    clauses, params = [], []
+    if since is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(_iso(since))
+    if until is not None:
+        clauses.append(f"{column} < ?")
+        params.append(_iso(until))
+    return clauses, params
+
+def _iso(value: Timestamp) -> str:
+    # Stored timestamps are isoformat() strings, which sort chronologically as text
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+def _finding(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {"severity": row["severity"], "description": row["description"], "remediation": row["remediation"]}
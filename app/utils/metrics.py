@@ -0,0 +1,245 @@
+import asyncio
+import bisect
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..config import METRICS_BUCKETS, METRICS_WRITE_INTERVAL
+
+# Every metric the scanner records: name -> (type, help)
+CATALOGUE = {
+    "cybersafe_scans_total": ("counter", "Scans run, by mode."),
+    "cybersafe_scan_seconds": ("histogram", "Wall time of a whole scan."),
+    "cybersafe_stage_seconds": ("histogram", "Time spent in each scan stage (shared inputs and checkers)."),
+    "cybersafe_checks_total": ("counter", "Checker results, by outcome: ok, error, skipped, cached or reused."),
+    "cybersafe_short_circuits_total": ("counter", "Scans cut short because the host was unreachable, by stage."),
+    "cybersafe_timeouts_total": ("counter", "Operations that timed out, by stage."),
+    "cybersafe_cache_lookups_total": ("counter", "Cache lookups, by cache (module, dns, report) and result (hit, miss)."),
+    "cybersafe_http_requests_total": ("counter", "HTTP requests sent, redirects and fallbacks included, by request."),
+    "cybersafe_http_redirects_total": ("counter", "HTTP redirects followed, by request."),
+    "cybersafe_http_connections_total": ("counter", "Connections used by HTTP requests, by state (opened, reused)."),
+    "cybersafe_http_connect_seconds": ("histogram", "TCP connect time of newly opened HTTP connections."),
+    "cybersafe_http_tls_seconds": ("histogram", "TLS handshake time of newly opened HTTPS connections."),
+    "cybersafe_http_first_byte_seconds": ("histogram", "Time from sending an HTTP request to receiving its response headers."),
+    "cybersafe_port_probes_total": ("counter", "Port probes, by outcome (open, closed, timeout, error)."),
+    "cybersafe_report_render_seconds": ("histogram", "Report rendering time, by format."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Metrics:
+    """
+    Thread-safe counters and timing histograms, exported in the Prometheus text format.
+    Names must be in CATALOGUE; labels are free-form keyword arguments.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [count per bucket..., count above the last bucket, count, sum]
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        _check(name, "counter")
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        _check(name, "histogram")
+        key = (name, _labels(labels))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(self.buckets) + 3)
+            series[bisect.bisect_left(self.buckets, seconds)] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    @contextmanager
+    def time(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observes the duration of the block, unless it raises."""
+        start = time.perf_counter()
+        yield
+        self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Current value of a counter, or the observation count of a histogram."""
+        key = (name, _labels(labels))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key][-2]
+            return self._counters.get(key, 0)
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+        lines = []
+        for name, (kind, description) in CATALOGUE.items():
+            series = sorted(key for key in (counters if kind == "counter" else histograms) if key[0] == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in series:
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(counters[key])}")
+                    continue
+                counts = histograms[key]
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {counts[-2]}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path: str) -> None:
+        """Writes render() to `path` atomically, so a collector never reads a partial file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _check(name: str, kind: str) -> None:
+    if CATALOGUE.get(name, (None,))[0] != kind:
+        raise ValueError(f"{name!r} is not a registered {kind}")
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+# Shared by every scan in this process (UI jobs, bulk runs and the scheduler alike)
+default_metrics = Metrics()
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+class ScanTimings:
+    """
+    Timing spans and connection timings of one scan. summary() is the scan's "timings"
+    section (milliseconds); everything is also recorded in `metrics`.
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics or default_metrics
+        self.stages: Dict[str, float] = {}
+        self.http: Dict[str, Dict[str, Any]] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times one stage. Cancelled stages (e.g. after a short circuit) are not recorded."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._finish(stage, start)
+            raise
+        self._finish(stage, start)
+
+    def _finish(self, stage: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        self.stages[stage] = _ms(elapsed)
+        self.metrics.observe("cybersafe_stage_seconds", elapsed, stage=stage)
+
+    def record_http(self, request: str, trace: Any) -> None:
+        """Adds the connection timings of one HTTP request (an http_client.RequestTrace)."""
+        reused = max(0, trace.requests - trace.connections)
+        self.http[request] = {
+            "requests": trace.requests,
+            "redirects": trace.redirects,
+            "connections_opened": trace.connections,
+            "connections_reused": reused,
+            "connect_ms": _ms(trace.connect),
+            "tls_ms": _ms(trace.tls),
+            "first_byte_ms": _ms(trace.first_byte),
+        }
+        metrics = self.metrics
+        metrics.inc("cybersafe_http_requests_total", trace.requests, request=request)
+        metrics.inc("cybersafe_http_redirects_total", trace.redirects, request=request)
+        metrics.inc("cybersafe_http_connections_total", trace.connections, request=request, state="opened")
+        metrics.inc("cybersafe_http_connections_total", reused, request=request, state="reused")
+        if trace.connections:
+            metrics.observe("cybersafe_http_connect_seconds", trace.connect, request=request)
+        if trace.tls:
+            metrics.observe("cybersafe_http_tls_seconds", trace.tls, request=request)
+        if trace.requests:
+            metrics.observe("cybersafe_http_first_byte_seconds", trace.first_byte, request=request)
+
+    def summary(self, mode: str) -> Dict[str, Any]:
+        """The "timings" section; observes the total as cybersafe_scan_seconds for `mode`."""
+        elapsed = time.perf_counter() - self._start
+        self.metrics.observe("cybersafe_scan_seconds", elapsed, mode=mode)
+        return {"total_ms": _ms(elapsed), "stages": dict(self.stages), "http": dict(self.http)}
+
+class MetricsFile:
+    """
+    Keeps a Prometheus textfile (e.g. for node_exporter's textfile collector) up to date during
+    a long run: maybe_write() rewrites it at most every `interval` seconds, close() once more.
+    """
+
+    def __init__(self, path: str, metrics: Optional[Metrics] = None, interval: float = METRICS_WRITE_INTERVAL):
+        self.path = path
+        self.metrics = metrics or default_metrics
+        self.interval = interval
+        self._written = float("-inf")
+
+    def maybe_write(self) -> None:
+        if time.monotonic() - self._written >= self.interval:
+            self.metrics.write(self.path)
+            self._written = time.monotonic()
+
+    def close(self) -> None:
+        self.metrics.write(self.path)
+
+async def serve_metrics(host: str, port: int, metrics: Optional[Metrics] = None) -> "asyncio.AbstractServer":
+    """Starts a minimal HTTP endpoint answering GET /metrics with the current metrics."""
+    metrics = metrics or default_metrics
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readuntil(b"\r\n\r\n")).split(b"\r\n", 1)[0].decode("latin-1")
+            method, _, rest = request_line.partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+            if method == "GET" and path == "/metrics":
+                status, body = "200 OK", metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
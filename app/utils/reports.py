@@ -1,19 +1,38 @@
-import jinja2
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple
+import concurrent.futures
+import functools
+import hashlib
 import json
+import multiprocessing
 import os
 import logging
+import threading
+import time
+from ..config import REPORT_CACHE_TTL, REPORT_PDF_WORKERS, REPORT_STREAM_CHUNK_SIZE, REPORT_TEMPLATE_CACHE_DIR
+from .caching import ScanCache
+from .metrics import default_metrics
 
-# Try to import WeasyPrint, handle missing GTK on Windows
-try:
-    from weasyprint import HTML
-    WEASYPRINT_AVAILABLE = True
-except OSError:
-    WEASYPRINT_AVAILABLE = False
-    logging.warning("WeasyPrint could not be loaded (likely missing GTK). PDF export disabled.")
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    logging.warning("WeasyPrint not installed. PDF export disabled.")
+if TYPE_CHECKING:
+    import jinja2
+
+# WeasyPrint (Pango/Cairo bindings) is by far the slowest import, so it is only loaded on
+# the first PDF export. None until probed by pdf_available().
+WEASYPRINT_AVAILABLE: Optional[bool] = None
+
+def pdf_available() -> bool:
+    """Whether PDF export works here. Imports WeasyPrint on first call; handles missing GTK on Windows."""
+    global WEASYPRINT_AVAILABLE
+    if WEASYPRINT_AVAILABLE is None:
+        try:
+            import weasyprint  # noqa: F401
+            WEASYPRINT_AVAILABLE = True
+        except OSError:
+            WEASYPRINT_AVAILABLE = False
+            logging.warning("WeasyPrint could not be loaded (likely missing GTK). PDF export disabled.")
+        except ImportError:
+            WEASYPRINT_AVAILABLE = False
+            logging.warning("WeasyPrint not installed. PDF export disabled.")
+    return WEASYPRINT_AVAILABLE
 
 TEMPLATE = """
 <!DOCTYPE html>
@@ -52,31 +71,285 @@ TEMPLATE = """
     {% endfor %}
     
     <h3>Raw Data</h3>
-    <pre>{{ raw_data }}</pre>
+    <pre>{% for chunk in raw_data %}{{ chunk }}{% endfor %}</pre>
+</body>
+</html>
+"""
+
+PORTFOLIO_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Cybersafe Portfolio Report</title>
+    <style>
+        body { font-family: sans-serif; }
+        h1, h2, h3 { color: #333; }
+        .score { font-weight: bold; }
+        .high { color: red; }
+        .medium { color: orange; }
+        .low { color: blue; }
+        .good { color: green; }
+        .finding { border: 1px solid #ccc; padding: 10px; margin-bottom: 10px; }
+        .severity { font-weight: bold; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+        .domain { page-break-before: always; }
+    </style>
+</head>
+<body>
+    {% if summary %}
+    <h1>Cybersafe Portfolio Report</h1>
+    <p>Date: {{ date }}</p>
+    <p>Domains: {{ summary.total }} | Average score: {{ summary.average }} | Failed scans: {{ summary.failed }}</p>
+    
+    <table>
+        <tr><th>Domain</th><th>Score</th><th>Critical</th><th>High</th><th>Medium</th><th>Low</th></tr>
+        {% for row in summary.rows %}
+        <tr>
+            <td>{{ row.domain }}</td>
+            <td class="score {{ row.score_class }}">{{ row.score if row.score is not none else "failed" }}</td>
+            <td>{{ row.critical }}</td><td>{{ row.high }}</td><td>{{ row.medium }}</td><td>{{ row.low }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+    {% endif %}
+    
+    {% for entry in sections %}
+    <div class="domain">
+        <h2>{{ entry.domain }}: <span class="score {{ entry.score_class }}">{{ entry.score if entry.score is not none else "failed" }}</span></h2>
+        {% if entry.error %}<p>Scan failed: {{ entry.error }}</p>{% endif %}
+        {% for module, data in entry.results.items() %}
+        {% if data.findings %}
+        <h3>{{ module|upper }} Findings</h3>
+        {% for finding in data.findings %}
+        <div class="finding">
+            <p><span class="severity {{ finding.severity|lower }}">{{ finding.severity }}</span>: {{ finding.description }}</p>
+            <p><strong>Remediation:</strong> {{ finding.remediation }}</p>
+        </div>
+        {% endfor %}
+        {% endif %}
+        {% endfor %}
+    </div>
+    {% endfor %}
 </body>
 </html>
 """
 
+REPORT_TEMPLATE = "report.html"
+PORTFOLIO_REPORT_TEMPLATE = "portfolio.html"
+
+@functools.lru_cache(maxsize=None)
+def report_environment() -> "jinja2.Environment":
+    """
+    Shared Jinja environment; each template is parsed and compiled once per process
+    (and once per machine with the bytecode cache).
+    """
+    import jinja2
+    
+    bytecode_cache = None
+    try:
+        os.makedirs(REPORT_TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(REPORT_TEMPLATE_CACHE_DIR)
+    except OSError:
+        logging.warning("Template cache directory unavailable; compiling report templates in memory only.")
+    return jinja2.Environment(
+        loader=jinja2.DictLoader({REPORT_TEMPLATE: TEMPLATE, PORTFOLIO_REPORT_TEMPLATE: PORTFOLIO_TEMPLATE}),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+    )
+
+def score_class(score: Optional[int]) -> str:
+    """CSS class for a score; a missing score (failed scan) counts as high risk."""
+    if score is None or score < 50:
+        return "high"
+    if score < 80:
+        return "medium"
+    return "good"
+
+def _report_context(target: str, date: str, score: int, results: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "target": target,
+        "date": date,
+        "score": score,
+        "score_class": score_class(score),
+        "results": results,
+        # Encoded piece by piece as the template consumes it, never as one big string
+        "raw_data": json.JSONEncoder(indent=2, default=str).iterencode(results),
+    }
+
 def generate_html(target: str, date: str, score: int, results: Dict[str, Any]) -> str:
     """Generates an HTML report."""
-    score_class = "good"
-    if score < 50:
-        score_class = "high"
-    elif score < 80:
-        score_class = "medium"
-        
-    template = jinja2.Template(TEMPLATE)
-    return template.render(
-        target=target,
-        date=date,
-        score=score,
-        score_class=score_class,
-        results=results,
-        raw_data=json.dumps(results, indent=2)
-    )
+    template = report_environment().get_template(REPORT_TEMPLATE)
+    return template.render(**_report_context(target, date, score, results))
+
+def stream_html(target: str, date: str, score: int, results: Dict[str, Any]) -> Iterator[str]:
+    """Yields the HTML report in chunks of about REPORT_STREAM_CHUNK_SIZE characters."""
+    return _stream(REPORT_TEMPLATE, _report_context(target, date, score, results))
+
+def stream_portfolio_html(date: str, summary: Optional[Dict[str, Any]], sections: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Yields a portfolio report (summary table, then one section per domain) in chunks.
+    `sections` is consumed lazily, so it can be a generator over results stored on disk.
+    Pass summary=None to render a continuation part holding only sections.
+    """
+    return _stream(PORTFOLIO_REPORT_TEMPLATE, {"date": date, "summary": summary, "sections": sections})
+
+def _stream(name: str, context: Dict[str, Any]) -> Iterator[str]:
+    template = report_environment().get_template(name)
+    buffer, size = [], 0
+    for piece in template.generate(**context):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= REPORT_STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def write_html(fp: TextIO, target: str, date: str, score: int, results: Dict[str, Any]) -> int:
+    """Streams the HTML report into an open text file or response; returns characters written."""
+    written = 0
+    for chunk in stream_html(target, date, score, results):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
 
 def generate_pdf(html_content: str) -> bytes:
     """Generates a PDF from HTML content."""
-    if not WEASYPRINT_AVAILABLE:
+    if not pdf_available():
         raise RuntimeError("PDF generation unavailable (missing GTK libraries).")
+    from weasyprint import HTML
     return HTML(string=html_content).write_pdf()
+
+def generate_pdf_file(html_path: str, pdf_path: str) -> None:
+    """Renders an HTML file straight to a PDF file, keeping large documents out of Python strings."""
+    if not pdf_available():
+        raise RuntimeError("PDF generation unavailable (missing GTK libraries).")
+    from weasyprint import HTML
+    HTML(filename=html_path).write_pdf(pdf_path)
+
+def generate_json(results: Dict[str, Any]) -> str:
+    """Generates the JSON report."""
+    return json.dumps(results, indent=2, default=str)
+
+def results_digest(results: Dict[str, Any]) -> str:
+    """Content hash of a results dict; identical results share every rendered artifact."""
+    canonical = json.dumps(results, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _render_pdf(html_content: str) -> bytes:
+    # Runs in a worker process (must stay importable at module level for pickling)
+    return generate_pdf(html_content)
+
+# PDF render states
+PDF_MISSING = "missing"
+PDF_PENDING = "pending"
+PDF_READY = "ready"
+PDF_FAILED = "failed"
+
+class ReportArtifacts:
+    """
+    Renders report artifacts only when asked for and caches them by target and results_digest,
+    so Streamlit reruns and repeated downloads reuse the same bytes. Artifacts are megabytes
+    each, so they live in the disk tier only, never in the entry-bounded memory tier.
+    PDFs are rendered in a process pool; callers poll pdf_status() until they are ready.
+    """
+
+    def __init__(self, cache: Optional[ScanCache] = None, workers: int = REPORT_PDF_WORKERS):
+        self.cache = cache if cache is not None else ScanCache()
+        self.workers = workers
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # artifact key -> render in progress, or the error of the last failed attempt
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def html(self, target: str, results: Dict[str, Any]) -> str:
+        """HTML report, rendered on first request."""
+        return self._cached(target, results, "html", lambda: generate_html(target, results.get("timestamp"), results.get("score"), results))
+
+    def json(self, results: Dict[str, Any]) -> str:
+        """JSON report, serialized on first request (it does not depend on the target)."""
+        return self._cached("", results, "json", lambda: generate_json(results))
+
+    def pdf_status(self, target: str, results: Dict[str, Any]) -> Tuple[str, Any]:
+        """
+        Returns (state, payload): (PDF_READY, bytes), (PDF_FAILED, error message),
+        (PDF_PENDING, None) while rendering, or (PDF_MISSING, None) if never requested.
+        """
+        key = _artifact_key(target, results, "pdf")
+        pdf = self.cache.get(key, memory=False)
+        if pdf is not None:
+            return PDF_READY, pdf
+        with self._lock:
+            if key in self._pending:
+                return PDF_PENDING, None
+            if key in self._errors:
+                return PDF_FAILED, self._errors[key]
+        return PDF_MISSING, None
+
+    def request_pdf(self, target: str, results: Dict[str, Any]) -> None:
+        """Starts rendering the PDF in the background. Duplicate requests join the running render."""
+        key = _artifact_key(target, results, "pdf")
+        if self.cache.get(key, memory=False) is not None:
+            return
+        with self._lock:
+            if key in self._pending:
+                return
+            self._errors.pop(key, None)
+            if not pdf_available():
+                self._errors[key] = "PDF generation unavailable (missing GTK libraries)."
+                return
+            future = self._executor().submit(_render_pdf, self.html(target, results))
+            self._pending[key] = future
+        start = time.perf_counter()
+        future.add_done_callback(lambda f: self._finish_pdf(key, f, start))
+
+    def shutdown(self) -> None:
+        """Stops the PDF workers."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cached(self, target: str, results: Dict[str, Any], fmt: str, render) -> Any:
+        key = _artifact_key(target, results, fmt)
+        artifact = self.cache.get(key, memory=False)
+        default_metrics.inc("cybersafe_cache_lookups_total", cache="report", result="miss" if artifact is None else "hit")
+        if artifact is None:
+            with default_metrics.time("cybersafe_report_render_seconds", format=fmt):
+                artifact = render()
+            self.cache.set(key, artifact, REPORT_CACHE_TTL, memory=False)
+        return artifact
+
+    def _executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs the scan event-loop thread is unsafe
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _finish_pdf(self, key: str, future: concurrent.futures.Future, start: float) -> None:
+        try:
+            self.cache.set(key, future.result(), REPORT_CACHE_TTL, memory=False)
+            # Queueing for a worker included: that is what the user waits for
+            default_metrics.observe("cybersafe_report_render_seconds", time.perf_counter() - start, format="pdf")
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = str(e) or e.__class__.__name__
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+def _artifact_key(target: str, results: Dict[str, Any], fmt: str) -> str:
+    return f"report:{target}:{results_digest(results)}:{fmt}"
+
+_default_artifacts: Optional[ReportArtifacts] = None
+_default_lock = threading.Lock()
+
+def get_report_artifacts() -> ReportArtifacts:
+    """Returns the process-wide report artifact cache."""
+    global _default_artifacts
+    with _default_lock:
+        if _default_artifacts is None:
+            _default_artifacts = ReportArtifacts()
+        return _default_artifacts
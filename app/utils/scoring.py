@@ -1,7 +1,7 @@
 from typing import Dict, Any
 from ..config import WEIGHTS
 
-def calculate_score(results: Dict[str, Any]) -> int:
+def calculate_score(results: Dict[str, Any], weights: Dict[str, int] = WEIGHTS) -> int:
     """
     Calculates the overall risk score based on individual module scores and weights.
     """
@@ -10,28 +10,28 @@ def calculate_score(results: Dict[str, Any]) -> int:
     
     # TLS
     if "tls" in results and "score" in results["tls"]:
-        total_score += results["tls"]["score"] * WEIGHTS["tls"]
-        total_weight += WEIGHTS["tls"]
+        total_score += results["tls"]["score"] * weights["tls"]
+        total_weight += weights["tls"]
         
     # Headers
     if "headers" in results and "score" in results["headers"]:
-        total_score += results["headers"]["score"] * WEIGHTS["headers"]
-        total_weight += WEIGHTS["headers"]
+        total_score += results["headers"]["score"] * weights["headers"]
+        total_weight += weights["headers"]
         
     # CORS
     if "cors" in results and "score" in results["cors"]:
-        total_score += results["cors"]["score"] * WEIGHTS["cors"]
-        total_weight += WEIGHTS["cors"]
+        total_score += results["cors"]["score"] * weights["cors"]
+        total_weight += weights["cors"]
         
     # Methods
     if "methods" in results and "score" in results["methods"]:
-        total_score += results["methods"]["score"] * WEIGHTS["methods"]
-        total_weight += WEIGHTS["methods"]
+        total_score += results["methods"]["score"] * weights["methods"]
+        total_weight += weights["methods"]
         
     # Ports (only if active scan was run)
     if "ports" in results and "score" in results["ports"]:
-        total_score += results["ports"]["score"] * WEIGHTS["ports"]
-        total_weight += WEIGHTS["ports"]
+        total_score += results["ports"]["score"] * weights["ports"]
+        total_weight += weights["ports"]
     
     if total_weight == 0:
         return 0
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the work, callers
+    arriving while it is still in flight await the same result instead of repeating it.
+    Nothing is remembered once the call completes (that is the cache's job).
+    Create one per event loop; the shared futures cannot cross loops.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Future"] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns fn()'s result, sharing a single execution among concurrent callers of `key`."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        # Shielded so one caller giving up does not cancel the work for everyone else
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Executions, duplicate calls saved by coalescing, and calls currently running."""
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": self.in_flight()}
+
+    def _forget(self, key: str, future: "asyncio.Future") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception retrieved when every caller has already given up
+            future.exception()
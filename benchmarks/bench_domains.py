@@ -0,0 +1,60 @@
+"""
+Per-call cost of domain normalization.
+
+    python benchmarks/bench_domains.py --count 1000000 --unique 50000
+
+Compares a fresh tldextract call per input (the old behaviour) with parse_target, cold
+(every input seen for the first time) and warm (memoized repeats, the common case for
+Streamlit reruns and bulk lists with duplicate hosts).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.domains import parse_target, suffix_extractor
+
+SUFFIXES = ["com", "org", "net", "co.uk", "com.au", "de", "io", "github.io", "gov.uk", "ac.jp"]
+
+def make_inputs(count: int, unique: int, seed: int = 0):
+    rng = random.Random(seed)
+    hosts = []
+    for i in range(unique):
+        host = f"site{i}.{rng.choice(SUFFIXES)}"
+        if rng.random() < 0.5:
+            host = f"www.{host}"
+        hosts.append(rng.choice([host, f"https://{host}", f"http://{host}:8080/path", f" {host.upper()} "]))
+    return [hosts[rng.randrange(unique)] for _ in range(count)], hosts
+
+def timed(fn, inputs):
+    start = time.perf_counter()
+    for value in inputs:
+        fn(value)
+    return (time.perf_counter() - start) / len(inputs) * 1e9
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="Inputs normalized (with repeats).")
+    parser.add_argument("--unique", type=int, default=50_000, help="Distinct inputs among them.")
+    args = parser.parse_args()
+
+    inputs, distinct = make_inputs(args.count, args.unique)
+    extractor = suffix_extractor()
+    start = time.perf_counter()
+    extractor.extract_str("example.com")  # Loads the bundled suffix list
+    print(f"suffix list load:          {(time.perf_counter() - start) * 1000:9.1f} ms (once per process)")
+
+    sample = distinct[: min(len(distinct), 100_000)]
+    print(f"tldextract per call:       {timed(extractor.extract_str, sample):9.0f} ns")
+    parse_target.cache_clear()
+    print(f"parse_target cold:         {timed(parse_target, distinct):9.0f} ns ({len(distinct):,} distinct inputs)")
+    print(f"parse_target warm:         {timed(parse_target, inputs):9.0f} ns ({len(inputs):,} inputs)")
+    info = parse_target.cache_info()
+    print(f"memo hits/misses:          {info.hits:,}/{info.misses:,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
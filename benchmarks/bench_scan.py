@@ -0,0 +1,271 @@
+"""
+Offline scanner benchmarks against local stand-in servers.
+
+    python benchmarks/bench_scan.py                    # run and compare with benchmarks/baseline.json
+    python benchmarks/bench_scan.py --save-baseline    # run and store the results as the baseline
+    python benchmarks/bench_scan.py --latency 20 --targets 1000 --threshold 0.25
+
+Measures per-check latency, full run_scan latency, bulk throughput (targets/s), peak Python
+memory of a bulk run and report rendering time. Nothing leaves the machine: HTTPS and HTTP
+origins (see servers.py), a closed and a filtered port are all local, and the origins run in a
+child process so their CPU time is not charged to the scanner.
+
+Gated metrics (medians, throughput, memory, rendering) that are worse than the baseline by
+more than --threshold (and, for timings, by more than --min-delta ms) are measured again, and
+fail the run with exit code 1 if the regression reproduces. Baselines are machine-specific and
+only comparable with the same options: re-save one when either changes.
+"""
+import argparse
+import asyncio
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from servers import INSECURE_HEADERS, FilteredPort, ServerProcess, closed_port, loopback_addresses, make_certificates, trust
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# The options a baseline was recorded with; results are only compared under the same ones
+CONFIG_KEYS = ("repeat", "targets", "concurrency", "hosts", "latency", "body_kb")
+
+class Suite:
+    """Collects metrics: {name: {"value", "unit", "better", "gate"}}."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, value: float, unit: str, better: str = "lower", gate: bool = True) -> None:
+        self.metrics[name] = {"value": round(value, 3), "unit": unit, "better": better, "gate": gate}
+        print(f"  {name:<28} {value:12.3f} {unit}")
+
+    async def latency(self, name: str, call: Callable[[], Awaitable[Any]], repeat: int) -> Any:
+        """Times `repeat` sequential calls after one warm-up; records p50 (gated) and p95 in ms."""
+        result = await call()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = await call()
+            samples.append((time.perf_counter() - start) * 1000)
+        self.record(f"{name}.p50", statistics.median(samples), "ms")
+        if len(samples) >= 2:
+            self.record(f"{name}.p95", statistics.quantiles(samples, n=20)[-1], "ms", gate=False)
+        return result
+
+def _require(condition: bool, message: str) -> None:
+    # The numbers are meaningless if the stand-ins did not behave like real hosts
+    if not condition:
+        raise SystemExit(f"benchmark setup is broken: {message}")
+
+async def bench_checks(suite: Suite, secure: str, large: str, repeat: int) -> None:
+    from app.scanner.cors_checker import check_cors
+    from app.scanner.headers_checker import check_headers
+    from app.scanner.http_client import create_client, fetch_probe
+    from app.scanner.methods_checker import check_methods
+    from app.scanner.ports_checker import check_ports
+    from app.scanner.tls_checker import check_tls_async
+
+    host = secure.split("://")[1].split(":")[0]
+    open_port = int(secure.rsplit(":", 1)[1])
+    filtered = FilteredPort(host)
+    try:
+        async with create_client() as client:
+            result = await suite.latency("check.headers", lambda: check_headers(secure, client), repeat)
+            _require(result["score"] == 100, f"headers check scored {result['score']}: {result.get('error')}")
+            await suite.latency("check.cors", lambda: check_cors(secure, client), repeat)
+            result = await suite.latency("check.methods", lambda: check_methods(secure, client), repeat)
+            _require("allowed_methods" in result["details"], f"methods check failed: {result}")
+            await suite.latency("probe.large_body", lambda: fetch_probe(large, client), repeat)
+        result = await suite.latency("check.tls", lambda: check_tls_async(secure), repeat)
+        _require(result["score"] == 100, f"TLS check scored {result['score']}: {result.get('error') or result['findings']}")
+        result = await suite.latency("check.ports", lambda: check_ports(secure, [open_port, closed_port(host)], [host]), repeat)
+        _require(result["details"]["open_ports"] == [open_port], f"port check saw {result['details']['open_ports']}")
+        # Each filtered probe waits for its timeout, so a few samples are enough
+        await suite.latency("check.ports_filtered", lambda: check_ports(secure, [filtered.port], [host]), max(3, repeat // 5))
+    finally:
+        filtered.close()
+
+async def bench_scans(suite: Suite, secure: str, repeat: int) -> Dict[str, Any]:
+    from app.pipeline import run_scan, scan_target
+    from app.scanner.health import HostHealth
+    from app.scanner.http_client import create_client
+
+    host = secure.split("://")[1].split(":")[0]
+    ports = [int(secure.rsplit(":", 1)[1]), closed_port(host)]
+    async with create_client() as client:
+        results = await suite.latency("scan.passive", lambda: run_scan(secure, False, [], client, health=HostHealth()), repeat)
+        _require(not any("error" in v for v in results.values() if isinstance(v, dict)), f"passive scan failed: {results}")
+        await suite.latency("scan.active", lambda: run_scan(secure, True, ports, client, health=HostHealth()), repeat)
+        return await scan_target(secure, False, [], client)
+
+async def _bulk(targets: List[str], concurrency: int) -> List[Dict[str, Any]]:
+    from app.scan import scan_stream
+    return [record async for record in scan_stream(targets, concurrency)]
+
+async def bench_bulk(suite: Suite, urls: List[str], count: int, concurrency: int) -> List[Dict[str, Any]]:
+    # Distinct paths keep every target a separate scan; hosts rotate across the origins
+    targets = [f"{urls[i % len(urls)]}/t{i}" for i in range(count)]
+    start = time.perf_counter()
+    records = await _bulk(targets, concurrency)
+    elapsed = time.perf_counter() - start
+    failed = [r for r in records if r.get("error") or r["results"].get("short_circuit")]
+    _require(len(records) == count and not failed, f"{len(failed)} of {count} bulk scans failed, e.g. {failed[:1]}")
+    suite.record("bulk.throughput", count / elapsed, "targets/s", better="higher")
+
+    tracemalloc.start()
+    try:
+        await _bulk(targets, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    suite.record("bulk.peak_memory", peak / 2 ** 20, "MiB")
+    return records
+
+def bench_reports(suite: Suite, results: Dict[str, Any], records: List[Dict[str, Any]], repeat: int) -> None:
+    from app.portfolio import write_portfolio_html
+    from app.utils import reports
+
+    def render_html():
+        return "".join(reports.stream_html("bench", results["timestamp"], results["score"], results))
+
+    def timed(name: str, fn: Callable[[], Any], times: int, batch: int = 1) -> None:
+        fn()  # Warm-up: template compilation and imports are not what is measured
+        samples = []
+        # As timeit does: no collections inside samples, and the best sample is the one recorded,
+        # since slower ones only measure interference from the rest of the machine
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(times):
+                start = time.perf_counter()
+                for _ in range(batch):
+                    fn()
+                samples.append((time.perf_counter() - start) * 1000 / batch)
+        finally:
+            gc.enable()
+        suite.record(name, min(samples), "ms")
+
+    # A single report renders in well under a millisecond; batches keep the samples stable
+    timed("report.html", render_html, repeat, batch=20)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "results.jsonl")
+        with open(path, "w", encoding="utf-8") as fp:
+            for record in records:
+                fp.write(json.dumps(record, default=str) + "\n")
+        timed("report.portfolio_html", lambda: write_portfolio_html(io.StringIO(), path, results["timestamp"]), max(3, repeat // 5))
+    if reports.pdf_available():
+        html = render_html()
+        timed("report.pdf", lambda: reports.generate_pdf(html), max(3, repeat // 5))
+    else:
+        print("  report.pdf                   skipped (WeasyPrint unavailable)")
+
+async def run_suite(args: argparse.Namespace, workdir: str) -> Suite:
+    addresses = loopback_addresses(args.hosts)
+    ca_path, cert_path, key_path = make_certificates(workdir, addresses)
+    trust(ca_path)
+
+    latency = args.latency / 1000
+    specs = [{"host": address, "tls": True, "latency": latency} for address in addresses]
+    specs.append({"host": addresses[0], "tls": False, "latency": latency, "headers": INSECURE_HEADERS, "body_size": args.body_kb * 1024})
+    suite = Suite()
+    with ServerProcess(specs, cert_path, key_path) as servers:
+        secure, large = servers.urls[0], servers.urls[-1]
+        print(f"{len(addresses)} HTTPS origins, latency {args.latency} ms")
+        await bench_checks(suite, secure, large, args.repeat)
+        results = await bench_scans(suite, secure, args.repeat)
+        records = await bench_bulk(suite, servers.urls[:-1], args.targets, args.concurrency)
+    bench_reports(suite, results, records, args.repeat)
+    return suite
+
+def compare(
+    metrics: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float, min_delta: float = 0.0
+) -> List[str]:
+    """
+    Prints each metric against the baseline and returns the gated ones that regressed:
+    worse by more than `threshold` (relative) and, for timings, by more than `min_delta` ms.
+    """
+    regressions = []
+    print(f"\n{'metric':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metric in metrics.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<28} {'-':>12} {metric['value']:12.3f}")
+            continue
+        change = metric["value"] / base["value"] - 1
+        worse = -change if metric["better"] == "higher" else change
+        flag = ""
+        if metric["gate"] and worse > threshold and not (metric["unit"] == "ms" and abs(metric["value"] - base["value"]) <= min_delta):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<28} {base['value']:12.3f} {metric['value']:12.3f} {change:+8.1%}{flag}")
+    return regressions
+
+def measure(args: argparse.Namespace) -> Suite:
+    with tempfile.TemporaryDirectory(prefix="cybersafe-bench-") as workdir:
+        return asyncio.run(run_suite(args, workdir))
+
+def best_of(first: Dict[str, Dict[str, Any]], second: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """The better value of each metric across two measurements."""
+    merged = dict(first)
+    for name, metric in second.items():
+        current = merged.get(name)
+        if current is None or (metric["value"] > current["value"] if metric["better"] == "higher" else metric["value"] < current["value"]):
+            merged[name] = metric
+    return merged
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Samples per latency metric.")
+    parser.add_argument("--targets", type=int, default=200, help="Targets in the bulk run.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Bulk scan concurrency.")
+    parser.add_argument("--hosts", type=int, default=8, help="Distinct loopback origins (127.0.0.x; 1 outside Linux).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server delay per response, in ms.")
+    parser.add_argument("--body-kb", type=int, default=1024, help="Body size of the large-body origin, in KiB.")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a metric counts as a regression (0.2 = 20%%).")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="Timing changes up to this many ms are noise, whatever the percentage.")
+    parser.add_argument("--no-confirm", dest="confirm", action="store_false", help="Fail on the first measurement instead of re-measuring regressions.")
+    args = parser.parse_args(argv)
+
+    suite = measure(args)
+
+    config = {key: getattr(args, key) for key in CONFIG_KEYS}
+    if args.save_baseline:
+        environment = {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w", encoding="utf-8") as fp:
+            json.dump({"config": config, "environment": environment, "metrics": suite.metrics}, fp, indent=2)
+            fp.write("\n")
+        print(f"\nBaseline saved to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as fp:
+        baseline = json.load(fp)
+    regressions = compare(suite.metrics, baseline["metrics"], args.threshold, args.min_delta)
+    if baseline.get("config") != config:
+        print(f"\nBaseline was recorded with {baseline.get('config')}, not {config}: not gating.")
+        return 0
+    if regressions and args.confirm:
+        # A regression has to reproduce: one noisy neighbour should not fail the run
+        print(f"\nRe-measuring to confirm {', '.join(regressions)}...")
+        regressions = compare(best_of(suite.metrics, measure(args).metrics), baseline["metrics"], args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} metrics regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Local stand-ins for the hosts the scanner talks to, so benchmarks never leave the machine.
+
+- StandInServer: HTTP/1.1 keep-alive server, optionally over TLS, with a configurable
+  response header set, body size, Allow header and per-response latency.
+- make_certificates: a throwaway CA and a leaf certificate for the loopback addresses.
+  trust() points SSL_CERT_FILE at the CA so the scanner's default contexts verify it.
+- ServerProcess: runs the servers in a child process, so their CPU time is not charged to
+  the scanner being measured.
+- closed_port / FilteredPort: a port that refuses connections and one that never answers.
+"""
+import asyncio
+import datetime
+import ipaddress
+import multiprocessing
+import os
+import socket
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+
+SECURE_HEADERS = {
+    "Strict-Transport-Security": "max-age=31536000",
+    "Content-Security-Policy": "default-src 'self'",
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "no-referrer",
+    "Permissions-Policy": "geolocation=()",
+    "ETag": '"bench-v1"',
+}
+INSECURE_HEADERS = {"Access-Control-Allow-Origin": "*", "Server": "bench"}
+
+_REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 404: "Not Found"}
+
+def make_certificates(directory: str, addresses: List[str]) -> Tuple[str, str, str]:
+    """
+    Writes a CA certificate and a leaf certificate/key valid for `addresses` (and localhost)
+    into `directory`. Returns (ca_path, cert_path, key_path).
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    now = datetime.datetime.utcnow()
+    ca_key = ec.generate_private_key(ec.SECP256R1())
+    ca_name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Cybersafe benchmark CA")])
+    ca_cert = (
+        x509.CertificateBuilder()
+        .subject_name(ca_name)
+        .issuer_name(ca_name)
+        .public_key(ca_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=365))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(x509.KeyUsage(False, False, False, False, False, True, True, False, False), critical=True)
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(ca_key.public_key()), critical=False)
+        .sign(ca_key, hashes.SHA256())
+    )
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    names = [x509.DNSName("localhost")] + [x509.IPAddress(ipaddress.ip_address(a)) for a in addresses]
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")]))
+        .issuer_name(ca_name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=90))
+        .add_extension(x509.SubjectAlternativeName(names), critical=False)
+        .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+        .add_extension(x509.ExtendedKeyUsage([x509.oid.ExtendedKeyUsageOID.SERVER_AUTH]), critical=False)
+        .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(ca_key.public_key()), critical=False)
+        .sign(ca_key, hashes.SHA256())
+    )
+
+    paths = tuple(os.path.join(directory, name) for name in ("ca.pem", "cert.pem", "key.pem"))
+    with open(paths[0], "wb") as fp:
+        fp.write(ca_cert.public_bytes(serialization.Encoding.PEM))
+    with open(paths[1], "wb") as fp:
+        fp.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(paths[2], "wb") as fp:
+        fp.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return paths
+
+def trust(ca_path: str) -> None:
+    """Makes ssl.create_default_context() and httpx clients created afterwards trust only `ca_path`."""
+    os.environ["SSL_CERT_FILE"] = ca_path
+
+def server_context(cert_path: str, key_path: str) -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+def loopback_addresses(count: int) -> List[str]:
+    """
+    Up to `count` distinct loopback addresses (127.0.0.1, 127.0.0.2, ...). Linux routes all of
+    127.0.0.0/8 to the loopback interface; elsewhere only 127.0.0.1 is returned.
+    """
+    addresses = []
+    for i in range(1, count + 1):
+        address = f"127.0.0.{i}"
+        try:
+            with socket.socket() as probe:
+                probe.bind((address, 0))
+        except OSError:
+            break
+        addresses.append(address)
+    return addresses or ["127.0.0.1"]
+
+class StandInServer:
+    """
+    Minimal HTTP/1.1 server answering every path of every request the scanner sends:
+    GET/HEAD with `headers` and a `body_size`-byte body (304 when If-None-Match matches the
+    ETag), OPTIONS with `allow`. Each response waits `latency` seconds first.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        tls: Optional[ssl.SSLContext] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body_size: int = 0,
+        allow: str = "GET, HEAD, OPTIONS",
+        latency: float = 0.0,
+    ):
+        self.host = host
+        self.tls = tls
+        self.headers = dict(SECURE_HEADERS if headers is None else headers)
+        self.body = b"x" * body_size
+        self.allow = allow
+        self.latency = latency
+        self.port = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"{'https' if self.tls else 'http'}://{self.host}:{self.port}"
+
+    async def start(self) -> "StandInServer":
+        self._server = await asyncio.start_server(self._handle, self.host, 0, ssl=self.tls, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StandInServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _response(self, method: str, request_headers: Dict[str, str]) -> bytes:
+        headers = dict(self.headers)
+        body = b""
+        if method == "OPTIONS":
+            status = 204
+            headers = {"Allow": self.allow}
+        elif self.headers.get("ETag") and request_headers.get("if-none-match") == self.headers["ETag"]:
+            status = 304
+        else:
+            status = 200
+            headers["Content-Length"] = str(len(self.body))
+            body = b"" if method == "HEAD" else self.body
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if status != 200:
+            lines.append("Content-Length: 0")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method = request_line.split(" ", 1)[0]
+                request_headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        request_headers[name.strip().lower()] = value.strip()
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(self._response(method, request_headers))
+                await writer.drain()
+                if request_headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ssl.SSLError):
+            # Client gone, including probes that stop reading a large body on purpose
+            pass
+        finally:
+            writer.close()
+
+async def _serve(specs: List[Dict[str, Any]], cert_path: Optional[str], key_path: Optional[str], conn) -> None:
+    tls = server_context(cert_path, key_path) if cert_path else None
+    servers = [await StandInServer(**{**spec, "tls": tls if spec.get("tls") else None}).start() for spec in specs]
+    conn.send([server.port for server in servers])
+    loop = asyncio.get_running_loop()
+    # Serve until the parent closes its end of the pipe
+    await loop.run_in_executor(None, conn.recv_bytes)
+
+def _serve_process(specs, cert_path, key_path, conn) -> None:
+    try:
+        asyncio.run(_serve(specs, cert_path, key_path, conn))
+    except EOFError:
+        pass
+
+class ServerProcess:
+    """
+    StandInServers in a child process. `specs` are StandInServer keyword arguments, with
+    "tls": True for HTTPS (using `cert_path`/`key_path`). Use as a context manager;
+    `urls` lists the server URLs in spec order.
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]], cert_path: Optional[str] = None, key_path: Optional[str] = None):
+        self.specs = specs
+        self.cert_path = cert_path
+        self.key_path = key_path
+        self.urls: List[str] = []
+        self.ports: List[int] = []
+
+    def __enter__(self) -> "ServerProcess":
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._process = context.Process(target=_serve_process, args=(self.specs, self.cert_path, self.key_path, child), daemon=True)
+        self._process.start()
+        child.close()
+        if not self._conn.poll(30):
+            self.__exit__()
+            raise RuntimeError("stand-in servers did not start")
+        self.ports = self._conn.recv()
+        self.urls = [
+            f"{'https' if spec.get('tls') else 'http'}://{spec.get('host', '127.0.0.1')}:{port}"
+            for spec, port in zip(self.specs, self.ports)
+        ]
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._conn.close()
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+def closed_port(host: str = "127.0.0.1") -> int:
+    """A port nothing listens on: connections are refused at once."""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+class FilteredPort:
+    """
+    A port whose connections time out, like a firewalled one: a listening socket whose accept
+    queue is full, so the kernel drops further SYNs (Linux; elsewhere it may be refused or open).
+    """
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self._listener = socket.socket()
+        self._listener.bind((host, 0))
+        self._listener.listen(0)
+        self.port = self._listener.getsockname()[1]
+        self._fillers = []
+        for _ in range(3):
+            filler = socket.socket()
+            filler.setblocking(False)
+            try:
+                filler.connect((host, self.port))
+            except BlockingIOError:
+                pass
+            self._fillers.append(filler)
+
+    def close(self) -> None:
+        for sock in self._fillers + [self._listener]:
+            sock.close()
@@ -0,0 +1,46 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from httpx import Response
+
+# Network calls of the scan pipeline, by the name of their fake
+PIPELINE_CALLS = {
+    "dns": "resolve_target",
+    "probe": "fetch_probe",
+    "options": "fetch_options",
+    "tls": "check_tls_async",
+    "ports": "check_ports",
+}
+
+@pytest.fixture
+def fake_network():
+    """
+    Patches the pipeline's network calls. Returns a function taking the fake result of each
+    (a return value, or an exception or async function used as side_effect) and returning
+    the mocks by the same names; `ports` is only patched when given.
+    """
+    patchers = []
+
+    def install(dns=None, probe=None, options=None, tls=None, ports=None):
+        fakes = {
+            "dns": dns if dns is not None else {"addresses": ["127.0.0.1"]},
+            "probe": probe if probe is not None else Response(200, headers={}),
+            "options": options if options is not None else Response(200, headers={"Allow": "GET, HEAD"}),
+            "tls": tls if tls is not None else {"score": 100, "findings": [], "details": {"days_left": 90}},
+        }
+        if ports is not None:
+            fakes["ports"] = ports
+        mocks = {}
+        for name, fake in fakes.items():
+            patcher = patch(f"app.pipeline.{PIPELINE_CALLS[name]}", new_callable=AsyncMock)
+            mocks[name] = patcher.start()
+            patchers.append(patcher)
+            if isinstance(fake, BaseException) or callable(fake):
+                mocks[name].side_effect = fake
+            else:
+                mocks[name].return_value = fake
+        return SimpleNamespace(**mocks)
+
+    yield install
+    for patcher in reversed(patchers):
+        patcher.stop()
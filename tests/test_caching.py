@@ -0,0 +1,62 @@
+import time
+import pytest
+from unittest.mock import patch
+from app.utils import caching
+from app.utils.caching import ScanCache, MemoryLRU, module_ttl
+from app.pipeline import run_scan
+
+@pytest.fixture
+def cache(tmp_path):
+    with patch.object(caching, "CACHE_DIR", str(tmp_path)):
+        scan_cache = ScanCache(memory=MemoryLRU(16))
+        yield scan_cache
+        scan_cache.close()
+
+def test_memory_tier_serves_hits(cache):
+    cache.set("key", {"score": 100}, ttl=60)
+    cache.cache.clear()  # Disk emptied: only the memory tier can answer
+    assert cache.get("key") == {"score": 100}
+
+def test_disk_hits_are_promoted(cache):
+    cache.cache.set("key", {"score": 50}, expire=60)
+    assert cache.get("key") == {"score": 50}
+    assert cache.memory.get("key") == {"score": 50}
+
+def test_memory_lru_evicts_and_expires():
+    lru = MemoryLRU(2)
+    lru.set("a", 1, time.time() + 60)
+    lru.set("b", 2, time.time() + 60)
+    lru.set("c", 3, time.time() + 60)
+    assert lru.get("a") is None
+    lru.set("d", 4, time.time() - 1)
+    assert lru.get("d") is None
+
+def test_module_ttl():
+    assert module_ttl("headers", {"score": 0, "error": "timeout"}) == 0
+    assert module_ttl("headers", {"score": 100}) == 3600
+    # Far from expiry: capped
+    assert module_ttl("tls", {"score": 100, "details": {"days_left": 300}}) == 7 * 86400
+    # Three days before the warning threshold
+    assert module_ttl("tls", {"score": 100, "details": {"days_left": 33}}) == 3 * 86400
+    # Within the warning window (or expired): the short default, not the days left
+    assert module_ttl("tls", {"score": 80, "details": {"days_left": 29}}) == 21600
+    assert module_ttl("tls", {"score": 0, "details": {"days_left": -5}}) == 21600
+
+async def test_run_scan_only_executes_stale_modules(cache, fake_network):
+    headers = {"score": 100, "findings": [], "headers": {}}
+    cors = {"score": 100, "findings": [], "details": {}}
+    cache.set_module("example.com", "headers", headers)
+    cache.set_module("example.com", "cors", cors)
+    
+    network = fake_network(dns={"addresses": ["93.184.216.34"]})
+    
+    results = await run_scan("https://example.com", False, [], cache=cache)
+    
+    network.probe.assert_not_called()
+    assert results["headers"] == headers
+    assert results["cache"] == {"hits": ["headers", "cors"], "misses": ["tls", "methods"]}
+    
+    # Everything is fresh now: nothing runs
+    results = await run_scan("https://example.com", False, [], cache=cache)
+    assert network.tls.call_count == 1
+    assert results["cache"]["misses"] == []
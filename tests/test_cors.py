@@ -1,23 +1,34 @@
 import pytest
-from app.scanner.cors_checker import check_cors
+from app.scanner.cors_checker import check_cors, analyze_cors
 import respx
 from httpx import Response
 
 @respx.mock
-def test_check_cors_secure():
+async def test_check_cors_secure():
     respx.get("https://secure.com").mock(return_value=Response(200, headers={
         "Access-Control-Allow-Origin": "https://trusted.com"
     }))
     
-    results = check_cors("https://secure.com")
+    results = await check_cors("https://secure.com")
     assert results["score"] == 100
 
 @respx.mock
-def test_check_cors_wildcard():
+async def test_check_cors_wildcard():
     respx.get("https://insecure.com").mock(return_value=Response(200, headers={
         "Access-Control-Allow-Origin": "*"
     }))
     
-    results = check_cors("https://insecure.com")
+    results = await check_cors("https://insecure.com")
     assert results["score"] <= 50
     assert any("wildcard" in f["description"] for f in results["findings"])
+
+def test_analyze_cors_reflected_origin_with_credentials():
+    # Pure analyzer: no network, just a response object
+    response = Response(200, headers={
+        "Access-Control-Allow-Origin": "https://evil.com",
+        "Access-Control-Allow-Credentials": "true"
+    })
+    
+    results = analyze_cors(response)
+    assert results["score"] == 0
+    assert any(f["severity"] == "High" for f in results["findings"])
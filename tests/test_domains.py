@@ -0,0 +1,28 @@
+import pytest
+from unittest.mock import patch
+from app.utils.domains import parse_target, normalize_target, suffix_extractor
+
+@pytest.mark.parametrize("value, expected", [
+    ("example.com", ("https://example.com", "example.com", "example.com", "example.com", 443)),
+    (" https://WWW.Example.co.uk/path ", ("https://WWW.Example.co.uk/path", "www.example.co.uk", "www.example.co.uk", "example.co.uk", 443)),
+    ("http://example.org:8080", ("http://example.org:8080", "example.org", "example.org", "example.org", 8080)),
+    ("localhost", ("https://localhost", "localhost", "localhost", "localhost", 443)),
+    ("http://127.0.0.1", ("http://127.0.0.1", "127.0.0.1", "127.0.0.1", "127.0.0.1", 80)),
+])
+def test_parse_target(value, expected):
+    assert tuple(parse_target(value)) == expected
+
+def test_key_omits_default_port():
+    assert parse_target("https://example.com:443").key == "example.com"
+    assert parse_target("https://example.com:8443").key == "example.com:8443"
+
+def test_normalize_target_is_memoized():
+    parse_target.cache_clear()
+    normalize_target("memo.example.com")
+    normalize_target("memo.example.com")
+    assert parse_target.cache_info().hits == 1
+
+def test_suffix_list_is_never_fetched():
+    suffix_extractor.cache_clear()
+    with patch("socket.getaddrinfo", side_effect=AssertionError("network access")):
+        assert suffix_extractor().extract_str("a.b.example.co.uk").suffix == "co.uk"
@@ -0,0 +1,40 @@
+import random
+import pytest
+from app.utils import fleet
+from app.utils.scoring import calculate_score
+
+def random_results(rng, n):
+    results = []
+    for _ in range(n):
+        result = {m: {"score": rng.randint(0, 100)} for m in ("tls", "headers", "cors", "methods")}
+        if rng.random() < 0.3:
+            result["ports"] = {"score": rng.choice([0, 20, 60, 100])}
+        if rng.random() < 0.05:
+            del result["tls"]
+        if rng.random() < 0.05:
+            result["headers"] = {"error": "timeout"}  # No score: excluded like calculate_score does
+        results.append(result)
+    results.append({})  # Nothing scored
+    return results
+
+@pytest.mark.parametrize("weights", [None, {"tls": 7, "headers": 3, "cors": 11, "methods": 13, "ports": 17}])
+def test_batch_scores_match_calculate_score(weights):
+    results = random_results(random.Random(0), 5000)
+    kwargs = {"weights": weights} if weights else {}
+    
+    assert fleet.score_batch(results, **kwargs) == [calculate_score(r, **kwargs) for r in results]
+
+def test_fleet_summary():
+    results = [
+        {"tls": {"score": 100}, "headers": {"score": 50}},
+        {"tls": {"score": 0}, "headers": {"score": 100}, "ports": {"score": 100}},
+    ]
+    
+    summary = fleet.fleet_summary(results, percentiles=(50,))
+    
+    assert summary["count"] == 2
+    assert summary["score"]["min"] == 57  # (0*30 + 100*30 + 100*10) / 70, truncated
+    assert summary["modules"]["tls"]["percentiles"] == {50: 50.0}
+    assert summary["modules"]["ports"]["count"] == 1
+    assert summary["modules"]["ports"]["histogram"][-1] == 1
+    assert summary["modules"]["cors"]["mean"] is None
@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+from app.scanner.health import HostHealth
+from app.pipeline import run_scan
+
+def test_backoff_grows_exponentially_and_resets():
+    health = HostHealth(base=10, maximum=35)
+    assert health.record_failure("down.com", "timeout") == 10
+    assert health.record_failure("down.com", "timeout") == 20
+    assert health.record_failure("down.com", "timeout") == 35
+    assert health.retry_after("down.com") > 0
+    
+    health.record_success("down.com")
+    assert health.retry_after("down.com") == 0
+    assert health.status("down.com") is None
+
+async def test_unreachable_host_short_circuits_and_backs_off(fake_network):
+    health = HostHealth(base=60)
+    
+    async def slow_options(url, client=None, trace=None):
+        await asyncio.sleep(10)
+    
+    network = fake_network(
+        dns={"addresses": [], "error": "Name or service not known"},
+        probe=httpx.ConnectError("Connection refused"),
+        options=slow_options,
+    )
+    
+    results = await asyncio.wait_for(run_scan("https://down.com", False, [], health=health), timeout=5)
+    
+    assert results["short_circuit"]["stage"] in ("dns", "probe")
+    assert results["methods"]["skipped"] is True
+    assert results["tls"]["skipped"] is True
+    network.tls.assert_not_called()
+    assert health.retry_after("down.com") > 0
+    
+    # Backed off: the next scan does not touch the network at all
+    network.dns.reset_mock()
+    results = await run_scan("https://down.com", False, [], health=health)
+    assert results["short_circuit"]["stage"] == "backoff"
+    network.dns.assert_not_called()
+
+async def test_refused_connection_is_not_a_short_circuit(fake_network):
+    health = HostHealth(base=60)
+    network = fake_network(probe=httpx.ConnectError("Connection refused"), options=httpx.ConnectError("Connection refused"))
+    
+    results = await run_scan("https://refused.com", False, [], health=health)
+    
+    # The host answered (with a reset): nothing is cancelled or backed off
+    assert "short_circuit" not in results
+    network.tls.assert_awaited_once()
+    assert health.retry_after("refused.com") == 0
+    assert health.retry_after("refused.com:443") == 0
+
+async def test_connect_timeout_backs_off_the_port_but_keeps_the_port_scan(fake_network):
+    health = HostHealth(base=60)
+    
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(10)
+    
+    async def slow_ports(url, ports, addresses=None):
+        await asyncio.sleep(0.1)
+        return {"score": 100, "findings": [], "details": {"open_ports": [22]}}
+    
+    network = fake_network(probe=httpx.ConnectTimeout("timed out"), options=slow, tls=slow, ports=slow_ports)
+    
+    results = await asyncio.wait_for(run_scan("https://filtered.com", True, [22], health=health), timeout=5)
+    assert results["short_circuit"]["stage"] == "probe"
+    assert results["tls"]["skipped"] is True
+    assert results["ports"]["details"]["open_ports"] == [22]
+    assert health.retry_after("filtered.com:443") > 0
+    assert health.retry_after("filtered.com") == 0
+    
+    # Only the backed-off port is skipped on the next scan
+    network.ports.reset_mock()
+    results = await run_scan("https://filtered.com", True, [22], health=health)
+    assert results["short_circuit"]["stage"] == "backoff"
+    assert results["headers"]["skipped"] is True
+    assert "skipped" not in results["ports"]
+    network.ports.assert_called_once()
+
+async def test_connect_timeout_on_http_keeps_the_tls_check(fake_network):
+    health = HostHealth(base=60)
+    
+    async def slow_options(url, client=None, trace=None):
+        await asyncio.sleep(10)
+    
+    async def slow_tls(url, limiter=None, addresses=None):
+        await asyncio.sleep(0.1)
+        return {"score": 100, "findings": [], "details": {}}
+    
+    network = fake_network(probe=httpx.ConnectTimeout("timed out"), options=slow_options, tls=slow_tls)
+    
+    # Port 80 does not answer; the TLS check connects to 443
+    results = await asyncio.wait_for(run_scan("http://plain.com", False, [], health=health), timeout=5)
+    assert results["short_circuit"]["stage"] == "probe"
+    assert results["methods"]["skipped"] is True
+    assert "skipped" not in results["tls"]
+    assert health.retry_after("plain.com:80") > 0
+    
+    results = await run_scan("http://plain.com", False, [], health=health)
+    assert results["headers"]["skipped"] is True
+    assert "skipped" not in results["tls"]
+    assert network.tls.call_count == 2
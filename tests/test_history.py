@@ -0,0 +1,74 @@
+import datetime
+import pytest
+from app.utils.history import HistoryStore
+
+HSTS = {"severity": "High", "description": "Missing Strict-Transport-Security header", "remediation": "Add HSTS"}
+CSP = {"severity": "Medium", "description": "Missing Content-Security-Policy header", "remediation": "Add CSP"}
+
+def scan(timestamp, score, headers_findings, tls_score=100):
+    return {
+        "headers": {"score": score, "findings": headers_findings, "headers": {}},
+        "tls": {"score": tls_score, "findings": [], "details": {"days_left": 90}},
+        "cache": {"hits": [], "misses": ["headers", "tls"]},
+        "score": score,
+        "timestamp": timestamp,
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+def test_record_and_get_round_trip(store):
+    results = scan("2024-01-01T00:00:00", 80, [CSP])
+    scan_id = store.record("example.com", "https://example.com", results)
+    
+    stored = store.get(scan_id)
+    assert stored["domain"] == "example.com"
+    assert stored["score"] == 80
+    assert stored["results"] == {"headers": results["headers"], "tls": results["tls"]}
+    assert store.get(scan_id + 1) is None
+
+def test_cache_replays_are_not_recorded_as_new_scans(store):
+    first = store.record("a.com", "https://a.com", scan("2024-01-01T00:00:00", 50, []))
+    replay = {**scan("2024-01-02T00:00:00", 50, []), "cache": {"hits": ["headers"], "misses": []}}
+    partial = {**scan("2024-01-03T00:00:00", 60, []), "cache": {"hits": ["headers"], "misses": ["tls"]}}
+    
+    assert store.record("a.com", "https://a.com", replay) == first
+    assert store.record("a.com", "https://a.com", partial) != first
+    assert [s["score"] for s in store.scans(domain="a.com")] == [60, 50]
+
+def test_latest_per_domain_and_time_ranges(store):
+    store.record("a.com", "https://a.com", scan("2024-01-01T00:00:00", 50, []))
+    newest = store.record("a.com", "https://a.com", scan("2024-01-08T00:00:00", 60, []))
+    store.record("b.com", "https://b.com", scan("2024-01-05T00:00:00", 70, []))
+    
+    assert [(s["domain"], s["id"]) for s in store.latest()] == [("a.com", newest), ("b.com", 3)]
+    assert store.latest("a.com")[0]["score"] == 60
+    
+    in_range = store.scans(since=datetime.datetime(2024, 1, 2), until="2024-01-08T00:00:00")
+    assert [s["domain"] for s in in_range] == ["b.com"]
+    assert [s["score"] for s in store.scans(domain="a.com")] == [60, 50]
+
+def test_diff_between_two_scans(store):
+    old = store.record("a.com", "https://a.com", scan("2024-01-01T00:00:00", 80, [CSP]))
+    new = store.record("a.com", "https://a.com", scan("2024-01-08T00:00:00", 50, [HSTS], tls_score=100))
+    
+    changes = store.diff(old, new)
+    
+    assert list(changes) == ["headers"]
+    assert changes["headers"]["score"] == [80, 50]
+    assert changes["headers"]["added"] == [HSTS]
+    assert changes["headers"]["removed"] == [CSP]
+
+def test_new_findings_answers_which_hsts_disappeared(store):
+    store.record("a.com", "https://a.com", scan("2024-01-01T00:00:00", 100, []))
+    store.record("a.com", "https://a.com", scan("2024-01-08T00:00:00", 70, [HSTS]))
+    store.record("b.com", "https://b.com", scan("2024-01-01T00:00:00", 70, [HSTS]))
+    store.record("b.com", "https://b.com", scan("2024-01-08T00:00:00", 70, [HSTS]))  # Never had HSTS
+    store.record("c.com", "https://c.com", scan("2024-01-08T00:00:00", 70, [HSTS]))  # First scan
+    
+    rows = store.new_findings(since="2024-01-07", module="headers", description="%Strict-Transport-Security%")
+    
+    assert [r["domain"] for r in rows] == ["a.com"]
@@ -0,0 +1,64 @@
+import respx
+from httpx import Response
+from app.scanner.http_client import create_client, client_session, fetch_probe
+from app.scanner.headers_checker import check_headers
+from app.scanner.cors_checker import check_cors
+
+async def test_client_session_reuses_given_client():
+    async with create_client() as client:
+        async with client_session(client) as session:
+            assert session is client
+        # The caller still owns the client, so it must not be closed
+        assert not client.is_closed
+
+async def test_client_session_owns_temporary_client():
+    async with client_session() as session:
+        owned = session
+    assert owned.is_closed
+
+@respx.mock
+async def test_checkers_share_client():
+    route = respx.get("https://shared.com").mock(return_value=Response(200, headers={}))
+
+    async with create_client(max_connections=1) as client:
+        await check_headers("https://shared.com", client)
+        await check_cors("https://shared.com", client)
+        assert not client.is_closed
+
+    assert route.call_count == 2
+
+@respx.mock
+async def test_fetch_probe_sends_origin():
+    route = respx.get("https://probe.com").mock(return_value=Response(200))
+
+    await fetch_probe("https://probe.com")
+    assert route.calls.last.request.headers["Origin"] == "https://evil.com"
+
+@respx.mock
+async def test_stream_probe_skips_large_body():
+    respx.get("https://big.com").mock(return_value=Response(
+        200, headers={"X-Frame-Options": "DENY"}, content=b"x" * 5_000_000
+    ))
+
+    response = await fetch_probe("https://big.com", mode="stream")
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.is_closed
+
+@respx.mock
+async def test_head_probe_falls_back_to_get():
+    respx.head("https://nohead.com").mock(return_value=Response(405))
+    get_route = respx.get("https://nohead.com").mock(return_value=Response(200, headers={"X-Frame-Options": "DENY"}))
+
+    response = await fetch_probe("https://nohead.com", mode="head")
+    assert get_route.called
+    assert response.status_code == 200
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+@respx.mock
+async def test_head_probe_uses_head_when_supported():
+    respx.head("https://head.com").mock(return_value=Response(200, headers={"X-Frame-Options": "DENY"}))
+    get_route = respx.get("https://head.com").mock(return_value=Response(200))
+
+    response = await fetch_probe("https://head.com", mode="head")
+    assert not get_route.called
+    assert response.request.method == "HEAD"
@@ -0,0 +1,103 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from app import jobs
+from app.jobs import JobQueue, QueueFull, DONE, FAILED
+
+def wait_for_status(queue, job_id, statuses, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job stayed {job['status']}")
+
+@pytest.fixture
+def queue_factory(tmp_path):
+    created = []
+    
+    def factory(**kwargs):
+        with patch.object(jobs, "ScanCache"), patch.object(jobs, "HistoryStore"):
+            queue = JobQueue(directory=str(tmp_path / "jobs"), **kwargs)
+        created.append(queue)
+        return queue
+    
+    yield factory
+    for queue in created:
+        queue.shutdown()
+
+def test_job_runs_in_background_and_persists_results(queue_factory, monkeypatch):
+    async def fake_scan_target(url, active, ports, client=None, tls_limiter=None, cache=None, on_result=None):
+        on_result("headers", {"score": 100, "findings": []})
+        return {"headers": {"score": 100, "findings": []}, "score": 100}
+    monkeypatch.setattr(jobs, "scan_target", fake_scan_target)
+    
+    queue = queue_factory(workers=2)
+    job_id = queue.submit("https://example.com", "example.com", False, [])
+    
+    job = wait_for_status(queue, job_id, (DONE,))
+    assert job["results"]["score"] == 100
+    assert job["modules"] == ["headers", "tls", "cors", "methods"]
+
+def test_failed_scan_is_recorded(queue_factory, monkeypatch):
+    async def failing_scan_target(*args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(jobs, "scan_target", failing_scan_target)
+    
+    queue = queue_factory(workers=1)
+    job = wait_for_status(queue, queue.submit("https://example.com", "example.com", False, []), (FAILED,))
+    assert job["error"] == "boom"
+
+def test_queue_depth_is_bounded(queue_factory, monkeypatch):
+    async def blocking_scan_target(*args, **kwargs):
+        await asyncio.sleep(10)
+    monkeypatch.setattr(jobs, "scan_target", blocking_scan_target)
+    
+    queue = queue_factory(workers=1, max_queue=1)
+    queue.submit("https://a.com", "a.com", False, [])
+    time.sleep(0.05)  # First job picked up by the only worker
+    queue.submit("https://b.com", "b.com", False, [])
+    with pytest.raises(QueueFull):
+        queue.submit("https://c.com", "c.com", False, [])
+
+def test_unfinished_jobs_are_marked_interrupted_on_restart(queue_factory, monkeypatch):
+    async def blocking_scan_target(*args, **kwargs):
+        await asyncio.sleep(10)
+    monkeypatch.setattr(jobs, "scan_target", blocking_scan_target)
+    
+    first = queue_factory(workers=1)
+    job_id = first.submit("https://a.com", "a.com", False, [])
+    wait_for_status(first, job_id, (jobs.RUNNING,))
+    
+    second = queue_factory(workers=1)
+    assert second.get(job_id)["status"] == FAILED
+
+def test_identical_in_flight_scans_share_one_job(queue_factory, monkeypatch):
+    release = asyncio.Event()
+    calls = []
+    
+    async def blocking_scan_target(url, *args, **kwargs):
+        calls.append(url)
+        await release.wait()
+        return {"score": 100}
+    monkeypatch.setattr(jobs, "scan_target", blocking_scan_target)
+    
+    queue = queue_factory(workers=2)
+    first = queue.submit("https://example.com", "example.com", False, [])
+    second = queue.submit("https://example.com", "example.com", False, [])
+    active = queue.submit("https://example.com", "example.com", True, [80])
+    
+    assert second == first
+    assert active != first
+    assert queue.stats()["coalesced"] == 1
+    assert queue.stats()["submitted"] == 2
+    
+    wait_for_status(queue, first, (jobs.RUNNING,))
+    queue._loop.call_soon_threadsafe(release.set)
+    wait_for_status(queue, first, (DONE,))
+    
+    # Finished scans are not joined; a new request starts a fresh job
+    third = queue.submit("https://example.com", "example.com", False, [])
+    assert third != first
@@ -0,0 +1,23 @@
+import asyncio
+from app.scanner.limits import HostLimiter
+
+async def test_host_limiter_bounds_per_host_and_global():
+    limiter = HostLimiter(global_limit=3, per_host_limit=1)
+    state = {"global": 0, "peak_global": 0, "per_host": {}, "peak_host": 0}
+
+    async def op(host):
+        async with limiter.acquire(host):
+            state["global"] += 1
+            state["per_host"][host] = state["per_host"].get(host, 0) + 1
+            state["peak_global"] = max(state["peak_global"], state["global"])
+            state["peak_host"] = max(state["peak_host"], state["per_host"][host])
+            await asyncio.sleep(0.001)
+            state["global"] -= 1
+            state["per_host"][host] -= 1
+
+    await asyncio.gather(*(op(f"host{i % 5}") for i in range(40)))
+
+    assert state["peak_global"] <= 3
+    assert state["peak_host"] == 1
+    # Per-host bookkeeping is released once a host goes idle
+    assert limiter._hosts == {}
@@ -0,0 +1,102 @@
+import httpx
+import pytest
+from app.pipeline import run_scan
+from app.scanner.http_client import RequestTrace
+from app.utils.metrics import Metrics, MetricsFile, ScanTimings, default_metrics, serve_metrics
+
+def test_render_prometheus_text_format():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("cybersafe_scans_total", mode="passive")
+    metrics.inc("cybersafe_scans_total", 2, mode="passive")
+    metrics.inc("cybersafe_checks_total", check='we"ird\\', outcome="ok")
+    for seconds in (0.05, 0.5, 3.0):
+        metrics.observe("cybersafe_stage_seconds", seconds, stage="dns")
+    
+    lines = metrics.render().splitlines()
+    
+    assert "# TYPE cybersafe_scans_total counter" in lines
+    assert 'cybersafe_scans_total{mode="passive"} 3' in lines
+    assert 'cybersafe_checks_total{check="we\\"ird\\\\",outcome="ok"} 1' in lines
+    # Buckets are cumulative and end with +Inf
+    assert 'cybersafe_stage_seconds_bucket{stage="dns",le="0.1"} 1' in lines
+    assert 'cybersafe_stage_seconds_bucket{stage="dns",le="1"} 2' in lines
+    assert 'cybersafe_stage_seconds_bucket{stage="dns",le="+Inf"} 3' in lines
+    assert 'cybersafe_stage_seconds_sum{stage="dns"} 3.55' in lines
+    assert 'cybersafe_stage_seconds_count{stage="dns"} 3' in lines
+    assert metrics.value("cybersafe_stage_seconds", stage="dns") == 3
+
+def test_unknown_or_mistyped_metrics_are_rejected():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        metrics.inc("cybersafe_typo_total")
+    with pytest.raises(ValueError):
+        metrics.observe("cybersafe_scans_total", 1.0)
+
+def test_metrics_file_is_rewritten_at_most_every_interval(tmp_path):
+    metrics = Metrics()
+    path = tmp_path / "out" / "cybersafe.prom"
+    exporter = MetricsFile(str(path), metrics, interval=3600)
+    
+    metrics.inc("cybersafe_scans_total", mode="active")
+    exporter.maybe_write()
+    metrics.inc("cybersafe_scans_total", mode="active")
+    exporter.maybe_write()
+    assert 'cybersafe_scans_total{mode="active"} 1' in path.read_text()
+    
+    exporter.close()
+    assert 'cybersafe_scans_total{mode="active"} 2' in path.read_text()
+    assert [p.name for p in path.parent.iterdir()] == ["cybersafe.prom"]
+
+async def test_request_trace_counts_new_and_reused_connections():
+    trace = RequestTrace()
+    # A first request over a new TLS connection, then one over the same kept-alive connection
+    for step in ("connection.connect_tcp", "connection.start_tls", "http11.send_request_headers", "http11.receive_response_headers"):
+        await trace(f"{step}.started", {})
+        await trace(f"{step}.complete", {})
+    await trace("http11.send_request_headers.started", {})
+    await trace("http11.receive_response_headers.complete", {})
+    
+    timings = ScanTimings(Metrics())
+    timings.record_http("probe", trace)
+    
+    http = timings.http["probe"]
+    assert (http["requests"], http["connections_opened"], http["connections_reused"]) == (2, 1, 1)
+    assert http["connect_ms"] >= 0 and http["first_byte_ms"] >= 0
+    assert timings.metrics.value("cybersafe_http_connections_total", request="probe", state="reused") == 1
+    assert timings.metrics.value("cybersafe_http_connect_seconds", request="probe") == 1
+
+async def test_scan_results_carry_timings_and_update_counters(fake_network):
+    before = default_metrics.value("cybersafe_checks_total", check="headers", outcome="ok")
+    timeouts = default_metrics.value("cybersafe_timeouts_total", stage="options")
+    
+    network = fake_network(options=httpx.ReadTimeout("timed out"))
+    
+    results = await run_scan("https://example.com", False, [])
+    
+    timings = results["timings"]
+    # The methods checker never ran: its input failed
+    assert set(timings["stages"]) == {"dns", "probe", "options", "headers", "tls", "cors"}
+    assert set(timings["http"]) == {"probe", "options"}
+    assert timings["total_ms"] >= max(timings["stages"].values())
+    assert isinstance(network.probe.call_args.kwargs["trace"], RequestTrace)
+    assert "error" in results["methods"]
+    assert default_metrics.value("cybersafe_checks_total", check="headers", outcome="ok") == before + 1
+    assert default_metrics.value("cybersafe_timeouts_total", stage="options") == timeouts + 1
+
+async def test_metrics_endpoint():
+    metrics = Metrics()
+    metrics.inc("cybersafe_scans_total", mode="passive")
+    server = await serve_metrics("127.0.0.1", 0, metrics)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"http://127.0.0.1:{port}/metrics")
+            missing = await client.get(f"http://127.0.0.1:{port}/")
+    finally:
+        server.close()
+        await server.wait_closed()
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'cybersafe_scans_total{mode="passive"} 1' in response.text
+    assert missing.status_code == 404
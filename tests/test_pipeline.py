@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import patch
+from httpx import Response
+from app.pipeline import iter_scan, run_scan
+
+async def test_iter_scan_yields_in_completion_order(fake_network):
+    async def slow_tls(url, limiter=None, addresses=None):
+        await asyncio.sleep(0.2)
+        return {"score": 100, "findings": [], "details": {}}
+    fake_network(tls=slow_tls)
+    
+    keys = [key async for key, _ in iter_scan("https://example.com", False, [])]
+    
+    # The slow handshake arrives last instead of holding back everything else
+    assert keys[-2:] == ["tls", "timings"]
+    assert set(keys) == {"dns", "headers", "cors", "methods", "tls", "timings"}
+
+async def test_run_scan_reports_each_module_as_it_completes(fake_network):
+    seen = []
+    fake_network()
+    
+    results = await run_scan("https://example.com", False, [], on_result=lambda k, v: seen.append(k))
+    
+    assert sorted(seen) == sorted(results.keys())
+    assert list(results.keys()) == ["dns", "headers", "tls", "cors", "methods", "timings"]
+
+async def test_incremental_rescan_revalidates_and_reuses(tmp_path, fake_network):
+    from app.utils import caching
+    from app.utils.caching import ScanCache, MemoryLRU
+    with patch.object(caching, "CACHE_DIR", str(tmp_path)):
+        cache = ScanCache(memory=MemoryLRU(16))
+    
+    network = fake_network(
+        probe=Response(200, headers={"ETag": '"v1"', "Strict-Transport-Security": "max-age=31536000"}),
+        tls={"score": 100, "findings": [], "details": {"fingerprint": "aa"}},
+    )
+    
+    first = await run_scan("https://example.com", False, [], cache=cache, incremental=True)
+    assert network.probe.call_args.kwargs["headers"] == {}
+    assert first["incremental"] == {"reused": [], "executed": ["headers", "cors", "tls", "methods"], "changed": []}
+    
+    # Same page (304), rotated certificate
+    network.probe.return_value = Response(304, headers={"ETag": '"v1"'})
+    network.tls.return_value = {"score": 100, "findings": [], "details": {"fingerprint": "bb"}}
+    
+    second = await run_scan("https://example.com", False, [], cache=cache, incremental=True)
+    
+    assert network.probe.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert second["headers"] == first["headers"]
+    assert second["incremental"]["reused"] == ["headers", "cors"]
+    assert sorted(second["incremental"]["executed"]) == ["methods", "tls"]
+    assert second["incremental"]["changed"] == ["tls"]
+    cache.close()
@@ -0,0 +1,83 @@
+import concurrent.futures
+import json
+import pytest
+from app import portfolio
+from app.utils import reports
+
+def write_results(path, count):
+    with open(path, "w", encoding="utf-8") as fp:
+        for i in range(count):
+            record = {"target": f"site{i}.com", "domain": f"site{i}.com"}
+            if i % 10 == 9:
+                record["error"] = "timeout"
+            else:
+                record["results"] = {
+                    "score": i % 100,
+                    "headers": {"score": 50, "findings": [{"severity": "High", "description": "Missing HSTS", "remediation": "Add it"}]},
+                    "cache": {"hits": [], "misses": ["headers"]},
+                }
+            fp.write(json.dumps(record) + "\n")
+
+def test_summarize_counts_and_orders_worst_first(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write_results(path, 20)
+    
+    summary = portfolio.summarize(portfolio.iter_records(str(path)))
+    
+    assert summary["total"] == 20
+    assert summary["failed"] == 2
+    # Failed scans first, then ascending score
+    assert [row["domain"] for row in summary["rows"][:3]] == ["site19.com", "site9.com", "site0.com"]
+    assert summary["rows"][2]["high"] == 1
+
+def test_html_report_has_summary_and_every_section(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write_results(path, 50)
+    out = tmp_path / "portfolio.html"
+    
+    with open(out, "w", encoding="utf-8") as fp:
+        portfolio.write_portfolio_html(fp, str(path), "2024-01-01")
+    
+    html = out.read_text(encoding="utf-8")
+    assert html.count('<div class="domain">') == 50
+    assert "Domains: 50 | Average score: 24 | Failed scans: 5" in html
+    assert "Scan failed: timeout" in html
+
+def test_pdf_is_rendered_in_chunks_and_concatenated(tmp_path, monkeypatch):
+    pypdf = pytest.importorskip("pypdf")
+    
+    def fake_render(html_path, pdf_path):
+        # One page per domain section in the part
+        writer = pypdf.PdfWriter()
+        for _ in range(max(1, open(html_path, encoding="utf-8").read().count('<div class="domain">'))):
+            writer.add_blank_page(100, 100)
+        with open(pdf_path, "wb") as fp:
+            writer.write(fp)
+    
+    class ThreadPool(concurrent.futures.ThreadPoolExecutor):
+        def __init__(self, workers, mp_context=None):
+            super().__init__(workers)
+    
+    monkeypatch.setattr(reports, "WEASYPRINT_AVAILABLE", True)
+    monkeypatch.setattr(reports, "generate_pdf_file", fake_render)
+    monkeypatch.setattr(portfolio.concurrent.futures, "ProcessPoolExecutor", ThreadPool)
+    path = tmp_path / "results.jsonl"
+    write_results(path, 25)
+    out = tmp_path / "portfolio.pdf"
+    
+    assert portfolio.write_portfolio_pdf(str(path), str(out), chunk_size=10, workers=2) == 3
+    assert len(pypdf.PdfReader(str(out)).pages) == 25
+
+def test_pdf_without_pypdf_fails_loudly(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(reports, "WEASYPRINT_AVAILABLE", True)
+    monkeypatch.setattr(portfolio, "PYPDF_AVAILABLE", False)
+    path = tmp_path / "results.jsonl"
+    write_results(path, 3)
+    
+    assert portfolio.main([str(path), "--pdf", str(tmp_path / "portfolio.pdf")]) == 1
+    assert "require pypdf" in capsys.readouterr().err
+    assert not (tmp_path / "portfolio.pdf").exists()
+
+def test_cli_requires_an_output():
+    with pytest.raises(SystemExit):
+        portfolio.main(["results.jsonl"])
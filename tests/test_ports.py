@@ -1,13 +1,15 @@
 import pytest
-from app.scanner.ports_checker import check_ports
-from unittest.mock import patch, AsyncMock
+import asyncio
+from app.scanner import ports_checker
+from app.scanner.ports_checker import check_ports, parse_ports, scan_hosts, AdaptiveLimiter
+from unittest.mock import patch, AsyncMock, MagicMock
 
 @pytest.mark.asyncio
 async def test_check_ports():
     with patch("asyncio.open_connection", new_callable=AsyncMock) as mock_conn:
-        # Mock successful connection for port 80
+        # Mock successful connection for port 80; StreamWriter.close() is synchronous
         mock_reader = AsyncMock()
-        mock_writer = AsyncMock()
+        mock_writer = MagicMock(wait_closed=AsyncMock())
         mock_conn.return_value = (mock_reader, mock_writer)
         
         results = await check_ports("https://example.com", [80])
@@ -16,3 +18,66 @@ async def test_check_ports():
     with patch("asyncio.open_connection", side_effect=OSError("Connection refused")):
         results = await check_ports("https://example.com", [80])
         assert 80 not in results["details"]["open_ports"]
+
+async def test_check_ports_skips_addresses_without_a_route():
+    server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    # A host without IPv6 connectivity: the AAAA record comes first but has no route
+    try:
+        with patch.object(ports_checker, "_has_route", side_effect=lambda address: ":" not in address) as mock_route:
+            results = await check_ports("https://example.com", [port], ["2001:db8::1", "127.0.0.1"])
+    finally:
+        server.close()
+        await server.wait_closed()
+    
+    assert results["details"]["address"] == "127.0.0.1"
+    assert results["details"]["open_ports"] == [port]
+    assert mock_route.call_count == 2
+    assert ports_checker._has_route("127.0.0.1")
+
+def test_parse_ports():
+    assert parse_ports("22,80, 443") == [22, 80, 443]
+    assert parse_ports("1-3,2,8080") == [1, 2, 3, 8080]
+    assert len(parse_ports("1-65535")) == 65535
+    with pytest.raises(ValueError):
+        parse_ports("0-10")
+
+async def test_ports_are_given_up_when_descriptors_stay_exhausted(monkeypatch):
+    probes = []
+    
+    async def exhausted(address, port, timeout):
+        probes.append(port)
+        return ports_checker.FD_EXHAUSTED, 0.0
+    
+    monkeypatch.setattr(ports_checker, "_probe", exhausted)
+    monkeypatch.setattr(ports_checker, "PORT_SCAN_FD_RETRIES", 2)
+    
+    results = await asyncio.wait_for(check_ports("https://example.com", [22, 80], ["127.0.0.1"]), timeout=5)
+    
+    assert results["details"]["failed_ports"] == [22, 80]
+    assert results["details"]["scan"]["error"] == 2
+    assert len(probes) == 6
+    assert any("could not be probed" in f["description"] for f in results["findings"])
+
+async def test_scan_hosts_finds_local_listener():
+    server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        results = await scan_hosts(["127.0.0.1"], range(port - 50, port + 50))
+    finally:
+        server.close()
+        await server.wait_closed()
+    
+    assert port in results["open"]["127.0.0.1"]
+    assert results["stats"]["probed"] == 100
+
+async def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveLimiter(initial=8, minimum=2, maximum=16)
+    limiter.on_backoff(0.5)
+    assert int(limiter.limit) == 4
+    for _ in range(100):
+        limiter.on_answer()
+    assert int(limiter.limit) == 16
+    for _ in range(100):
+        limiter.on_backoff(0.5)
+    assert int(limiter.limit) == 2
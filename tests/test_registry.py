@@ -0,0 +1,41 @@
+import pytest
+from httpx import Response
+from app import registry
+from app.pipeline import run_scan
+
+@pytest.fixture
+def extra_checkers():
+    # Checkers registered by a test are removed again afterwards
+    before = dict(registry.CHECKERS)
+    yield
+    registry.CHECKERS.clear()
+    registry.CHECKERS.update(before)
+
+async def test_new_checker_reuses_shared_inputs(extra_checkers, fake_network):
+    @registry.register_checker("server", needs=("probe",))
+    def server(ctx, response):
+        banner = response.headers.get("Server")
+        return {"score": 100, "findings": [], "details": {"server": banner}}
+    
+    @registry.register_checker("reachable", needs=("dns", "options"))
+    async def reachable(ctx, dns, options):
+        return {"score": 100, "findings": [], "details": {"addresses": dns["addresses"], "status": options.status_code}}
+    
+    network = fake_network(probe=Response(200, headers={"Server": "nginx"}), options=Response(204, headers={}))
+    
+    results = await run_scan("https://example.com", False, [])
+    
+    # One round trip per shared input, however many checkers use it
+    assert (network.dns.call_count, network.probe.call_count, network.options.call_count) == (1, 1, 1)
+    assert list(results) == ["dns", "headers", "tls", "cors", "methods", "server", "reachable", "timings"]
+    assert results["server"]["details"]["server"] == "nginx"
+    assert results["reachable"]["details"] == {"addresses": ["127.0.0.1"], "status": 204}
+
+def test_plan_starts_each_input_once_before_its_first_consumer():
+    nodes = [(name, checker is not None) for name, checker in registry.plan(["headers", "tls", "cors", "ports"])]
+    
+    assert nodes == [("probe", False), ("headers", True), ("dns", False), ("tls", True), ("cors", True), ("ports", True)]
+
+def test_unknown_input_is_rejected(extra_checkers):
+    with pytest.raises(ValueError):
+        registry.register_checker("cert-transparency", needs=("tls_session",))(lambda ctx, session: {})
@@ -0,0 +1,73 @@
+import concurrent.futures
+import pytest
+from unittest.mock import patch
+from app.utils import caching, reports
+from app.utils.caching import ScanCache, MemoryLRU
+from app.utils.reports import ReportArtifacts, results_digest, PDF_MISSING, PDF_READY, PDF_FAILED
+
+RESULTS = {"score": 90, "timestamp": "2024-01-01T00:00:00", "headers": {"score": 90, "findings": []}}
+
+@pytest.fixture
+def artifacts(tmp_path):
+    with patch.object(caching, "CACHE_DIR", str(tmp_path)):
+        cache = ScanCache(memory=MemoryLRU(16))
+    artifacts = ReportArtifacts(cache)
+    # Threads instead of worker processes so the patched renderer is visible
+    artifacts._pool = concurrent.futures.ThreadPoolExecutor(1)
+    yield artifacts
+    artifacts.shutdown()
+    cache.close()
+
+def test_digest_ignores_key_order():
+    assert results_digest({"a": 1, "b": 2}) == results_digest({"b": 2, "a": 1})
+    assert results_digest({"a": 1}) != results_digest({"a": 2})
+
+def test_html_is_rendered_once_per_content(artifacts):
+    with patch.object(reports, "generate_html", wraps=reports.generate_html) as render:
+        first = artifacts.html("example.com", RESULTS)
+        second = artifacts.html("example.com", dict(RESULTS))
+        assert first == second
+        assert render.call_count == 1
+        # Each target gets its own report, even for identical results
+        assert "other.com" in artifacts.html("other.com", RESULTS)
+        assert render.call_count == 2
+    # Artifacts stay out of the entry-bounded memory tier
+    assert artifacts.cache.memory.get(reports._artifact_key("example.com", RESULTS, "html")) is None
+
+def test_pdf_is_rendered_only_on_request(artifacts, monkeypatch):
+    monkeypatch.setattr(reports, "WEASYPRINT_AVAILABLE", True)
+    monkeypatch.setattr(reports, "generate_pdf", lambda html: b"%PDF")
+    
+    assert artifacts.pdf_status("example.com", RESULTS) == (PDF_MISSING, None)
+    
+    artifacts.request_pdf("example.com", RESULTS)
+    artifacts._pool.shutdown(wait=True)
+    
+    assert artifacts.pdf_status("example.com", RESULTS) == (PDF_READY, b"%PDF")
+    assert artifacts.pdf_status("other.com", RESULTS) == (PDF_MISSING, None)
+
+def test_pdf_failure_is_reported(artifacts, monkeypatch):
+    monkeypatch.setattr(reports, "WEASYPRINT_AVAILABLE", False)
+    
+    artifacts.request_pdf("example.com", RESULTS)
+    
+    state, error = artifacts.pdf_status("example.com", RESULTS)
+    assert state == PDF_FAILED
+    assert "unavailable" in error
+
+def test_template_is_compiled_once():
+    env = reports.report_environment()
+    assert env.get_template(reports.REPORT_TEMPLATE) is env.get_template(reports.REPORT_TEMPLATE)
+
+def test_streamed_html_matches_rendered_html(monkeypatch, tmp_path):
+    monkeypatch.setattr(reports, "REPORT_STREAM_CHUNK_SIZE", 64)
+    html = reports.generate_html("example.com", RESULTS["timestamp"], RESULTS["score"], RESULTS)
+    
+    chunks = list(reports.stream_html("example.com", RESULTS["timestamp"], RESULTS["score"], RESULTS))
+    assert len(chunks) > 1
+    assert "".join(chunks) == html
+    
+    path = tmp_path / "report.html"
+    with open(path, "w", encoding="utf-8") as fp:
+        assert reports.write_html(fp, "example.com", RESULTS["timestamp"], RESULTS["score"], RESULTS) == len(html)
+    assert path.read_text(encoding="utf-8") == html
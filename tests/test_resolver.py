@@ -0,0 +1,41 @@
+import asyncio
+import socket
+from unittest.mock import patch, AsyncMock
+from app.scanner.resolver import Resolver, resolve_target
+
+def _infos(*addresses):
+    return [(socket.AF_INET6 if ":" in a else socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, 0)) for a in addresses]
+
+async def test_resolver_caches_answers():
+    resolver = Resolver(ttl=60)
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "getaddrinfo", new_callable=AsyncMock) as mock_gai:
+        mock_gai.return_value = _infos("93.184.216.34", "93.184.216.34", "2606:2800::1")
+        
+        first = await resolver.resolve("example.com")
+        second = await resolver.resolve("example.com")
+        
+        assert first == second == ["93.184.216.34", "2606:2800::1"]
+        assert mock_gai.call_count == 1
+
+async def test_resolver_expires_answers():
+    resolver = Resolver(ttl=0)
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "getaddrinfo", new_callable=AsyncMock) as mock_gai:
+        mock_gai.return_value = _infos("10.0.0.1")
+        await resolver.resolve("example.com")
+        await resolver.resolve("example.com")
+        assert mock_gai.call_count == 2
+
+async def test_resolver_skips_ip_literals():
+    resolver = Resolver()
+    assert await resolver.resolve("127.0.0.1") == ["127.0.0.1"]
+
+async def test_resolve_target_reports_errors():
+    resolver = Resolver()
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "getaddrinfo", side_effect=socket.gaierror("Name or service not known")):
+        dns = await resolve_target("missing.invalid", resolver)
+        assert dns["addresses"] == []
+        assert "Name or service" in dns["error"]
+        assert "elapsed_ms" in dns
@@ -0,0 +1,63 @@
+import pytest
+from app.rescore import rescore
+from app.scanner.headers_checker import HEADER_RULESET
+from app.scanner.rules import Condition, Rule, RuleSet, all_of, equals, matches, not_, present
+from app.utils.history import HistoryStore
+
+SECURE = {
+    "strict-transport-security": "max-age=31536000",
+    "content-security-policy": "default-src 'self'",
+    "x-frame-options": "DENY",
+    "x-content-type-options": "nosniff",
+    "referrer-policy": "no-referrer",
+    "permissions-policy": "geolocation=()",
+}
+
+def test_rules_are_case_insensitive_and_join_repeated_headers():
+    ruleset = RuleSet([
+        Rule("nosniff", equals("X-Content-Type-Options", "nosniff"), points=50),
+        Rule("unsafe", matches("Content-Security-Policy", r"unsafe-eval"), points=-20, finding={"description": "unsafe"}),
+        Rule("no-hsts", not_(present("Strict-Transport-Security")), finding={"description": "hsts"}),
+    ], base=50)
+    
+    assert ruleset.evaluate({"X-CONTENT-TYPE-OPTIONS": "nosniff", "strict-transport-security": "max-age=1"}) == {"score": 100, "findings": []}
+    # Repeated (differently cased) names are joined like httpx joins them, so equality fails
+    assert ruleset.evaluate({"x-content-type-options": "nosniff", "X-Content-Type-Options": "nosniff"})["score"] == 50
+    # Stored captures may hold None for headers that were absent
+    result = ruleset.evaluate({"Content-Security-Policy": "script-src 'unsafe-eval'", "Strict-Transport-Security": None})
+    assert result == {"score": 30, "findings": [{"description": "unsafe"}, {"description": "hsts"}]}
+
+def test_evaluate_batch_on_stored_header_maps():
+    insecure = {"content-security-policy": "script-src 'unsafe-inline'"}
+    
+    secure_result, insecure_result = HEADER_RULESET.evaluate_batch([SECURE, insecure])
+    
+    assert secure_result == {"score": 100, "findings": []}
+    assert insecure_result["score"] == 10
+    assert [f["severity"] for f in insecure_result["findings"]] == ["High", "Medium", "Medium", "Low", "Low", "Low"]
+
+def test_unknown_condition_is_rejected():
+    with pytest.raises(ValueError):
+        RuleSet([Rule("bad", all_of(Condition("regex", ("x",)), present("y")))])
+
+def test_rescore_history_with_a_new_rule(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    headers = HEADER_RULESET.evaluate(SECURE)
+    store.record("a.com", "https://a.com", {"headers": {**headers, "headers": SECURE}, "score": 100, "timestamp": "2024-01-01T00:00:00"})
+    store.record("b.com", "https://b.com", {"headers": {"score": 0, "findings": [], "error": "timeout"}, "timestamp": "2024-01-02T00:00:00"})
+    
+    stricter = RuleSet([*HEADER_RULESET.rules, Rule("frame-deny", not_(equals("X-Frame-Options", "SAMEORIGIN")), points=-50, finding={
+        "severity": "Low", "description": "X-Frame-Options is not SAMEORIGIN.", "remediation": "",
+    })], max_points=50)
+    
+    try:
+        assert list(rescore(store, {"headers": HEADER_RULESET})) == []
+        changes = list(rescore(store, {"headers": stricter}))
+    finally:
+        store.close()
+    assert changes == [{
+        "scan_id": 1,
+        "domain": "a.com",
+        "scanned_at": "2024-01-01T00:00:00",
+        "headers": {"score": [100, 0], "added": ["X-Frame-Options is not SAMEORIGIN."], "removed": []},
+    }]
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import pytest
+from app import scan
+from app.utils.history import HistoryStore
+
+@pytest.fixture
+def fake_scan(monkeypatch):
+    state = {"in_flight": 0, "peak": 0}
+
+    async def fake_scan_target(url, active, ports, client=None, tls_limiter=None, cache=None, incremental=False):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.001)
+        state["in_flight"] -= 1
+        return {"score": 100, "url": url}
+
+    monkeypatch.setattr(scan, "scan_target", fake_scan_target)
+    return state
+
+async def test_scan_stream_respects_concurrency(fake_scan):
+    targets = [f"site{i}.com\n" for i in range(50)] + ["\n", "# comment\n"]
+    
+    records = [r async for r in scan.scan_stream(targets, concurrency=5)]
+    
+    assert len(records) == 50
+    assert {r["domain"] for r in records} == {f"site{i}.com" for i in range(50)}
+    assert fake_scan["peak"] <= 5
+
+async def test_scan_stream_coalesces_duplicate_targets(monkeypatch):
+    calls = []
+    
+    async def fake_scan_target(url, active, ports, client=None, tls_limiter=None, cache=None, incremental=False):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return {"score": 100}
+    monkeypatch.setattr(scan, "scan_target", fake_scan_target)
+    flights = scan.SingleFlight()
+    
+    records = [r async for r in scan.scan_stream(["example.com", "example.com", "other.com"], concurrency=3, flights=flights)]
+    
+    assert len(records) == 3
+    assert sorted(calls) == ["https://example.com", "https://other.com"]
+    assert flights.coalesced == 1
+
+async def test_scan_stream_closes_when_the_consumer_stops_early(fake_scan):
+    stream = scan.scan_stream([f"site{i}.com" for i in range(100)], concurrency=3)
+    
+    assert "domain" in await stream.__anext__()
+    # The queues are full and nothing drains them any more
+    await asyncio.wait_for(stream.aclose(), timeout=2)
+
+def test_cli_writes_jsonl(fake_scan, tmp_path, monkeypatch):
+    db = str(tmp_path / "history.sqlite3")
+    monkeypatch.setattr(scan, "HistoryStore", lambda: HistoryStore(db))
+    source = tmp_path / "domains.txt"
+    source.write_text("example.com\nhttps://www.example.org\n")
+    output = tmp_path / "out.jsonl"
+    
+    assert scan.main([str(source), "-o", str(output), "-c", "2"]) == 0
+    
+    lines = [json.loads(l) for l in output.read_text().splitlines()]
+    assert {l["domain"] for l in lines} == {"example.com", "www.example.org"}
+    assert all(l["results"]["score"] == 100 for l in lines)
+    assert {s["domain"] for s in HistoryStore(db).latest()} == {"example.com", "www.example.org"}
+
+def test_cli_active_requires_consent():
+    with pytest.raises(SystemExit):
+        scan.main(["--active", "-"])
@@ -0,0 +1,133 @@
+import asyncio
+import httpx
+import json
+import random
+import pytest
+from app import scheduler
+from app.scheduler import Scheduler, priority, spread_offset, FAILED, EXPIRING, UNKNOWN, HEALTHY
+from app.utils.history import HistoryStore
+
+def results(days_left=90, error=None):
+    tls = {"score": 100, "findings": [], "details": {"days_left": days_left}}
+    if error:
+        tls["error"] = error
+    return {"tls": tls, "score": 100, "timestamp": "2024-01-01T00:00:00"}
+
+def test_priority_ranks():
+    assert priority(None)[0] == UNKNOWN
+    assert priority({"error": "bad input"})[0] == FAILED
+    assert priority({"results": results(error="timeout")})[0] == FAILED
+    assert priority({"results": {**results(), "short_circuit": {"stage": "dns"}}})[0] == FAILED
+    assert priority({"results": results(days_left=5)}) == (EXPIRING, 5)
+    assert priority({"results": results(days_left=5)}) < priority({"results": results(days_left=20)})
+    assert priority({"results": results()})[0] == HEALTHY
+
+async def test_priority_of_a_stored_short_circuited_scan(tmp_path, fake_network):
+    from app.pipeline import run_scan
+    from app.scanner.health import HostHealth
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    fake_network(
+        dns={"addresses": [], "error": "Name or service not known"},
+        probe=httpx.ConnectTimeout("timed out"),
+        options=httpx.ConnectTimeout("timed out"),
+        tls=OSError("unreachable"),
+    )
+    
+    scan_id = history.record("down.com", "https://down.com", await run_scan("https://down.com", False, [], health=HostHealth()))
+    
+    # Read back as after a restart: the short circuit survives, not only the skipped modules
+    record = HistoryStore(str(tmp_path / "history.sqlite3")).get(scan_id)
+    assert record["results"]["short_circuit"]["stage"] == "dns"
+    assert priority(record)[0] == FAILED
+    history.close()
+
+def test_spread_offset_is_stable_and_spread():
+    offsets = [spread_offset(f"site{i}.com", 3600) for i in range(1000)]
+    assert offsets[0] == spread_offset("site0.com", 3600)
+    assert all(0 <= o < 3600 for o in offsets)
+    # Roughly uniform: every quarter of the interval gets a share
+    assert all(150 < sum(q * 900 <= o < (q + 1) * 900 for o in offsets) < 350 for q in range(4))
+
+@pytest.fixture
+def fake_scans(monkeypatch):
+    state = {"order": [], "in_flight": 0, "peak": 0}
+    
+    async def fake_scan_one(target, active, ports, client=None, tls_limiter=None, cache=None, history=None, incremental=False):
+        state["order"].append(target)
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.005)
+        state["in_flight"] -= 1
+        return {"target": target, "domain": target, "results": results()}
+    
+    monkeypatch.setattr(scheduler, "scan_one", fake_scan_one)
+    return state
+
+def make_set(domains, interval=3600):
+    return {"name": "test", "interval": interval, "domains": domains, "active": False, "ports": [], "incremental": False}
+
+async def test_once_runs_failed_and_expiring_targets_first(fake_scans, tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    history.record("healthy.com", "https://healthy.com", results())
+    history.record("failed.com", "https://failed.com", results(error="timeout"))
+    history.record("expiring.com", "https://expiring.com", results(days_left=3))
+    
+    run = Scheduler([make_set(["healthy.com", "new.com", "expiring.com", "failed.com"])], concurrency=1, history=history)
+    assert await run.run(once=True, client=object()) == 4
+    
+    assert fake_scans["order"] == ["failed.com", "expiring.com", "new.com", "healthy.com"]
+    history.close()
+
+async def test_recurring_runs_respect_concurrency_budget(fake_scans):
+    records = []
+    domains = [f"site{i}.com" for i in range(6)]
+    run = Scheduler([make_set(domains, interval=0.05)], concurrency=2, jitter=0.1, rng=random.Random(1))
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(run.run(records.append, client=object()), timeout=0.4)
+    
+    assert fake_scans["peak"] <= 2
+    # Every target came around several times
+    assert all(fake_scans["order"].count(d) >= 3 for d in domains)
+    assert records[0]["set"] == "test"
+
+async def test_recurring_runs_rescan_instead_of_replaying_the_cache(tmp_path, fake_network):
+    from unittest.mock import patch
+    from app.utils import caching
+    from app.utils.caching import ScanCache, MemoryLRU
+    with patch.object(caching, "CACHE_DIR", str(tmp_path)):
+        cache = ScanCache(memory=MemoryLRU(16))
+    records = []
+    
+    network = fake_network()
+    run = Scheduler([make_set(["example.com"], interval=0.05)], cache=cache, rng=random.Random(1))
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(run.run(records.append, client=object()), timeout=0.4)
+    cache.close()
+    
+    assert len(records) >= 2
+    # Every run fetched and handshook again
+    assert network.probe.call_count == network.tls.call_count == len(records)
+    assert all("cache" not in record["results"] for record in records)
+
+def test_set_ports_are_parsed_and_validated(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"sets": [
+        {"name": "spec", "interval": 60, "domains": ["a.com"], "ports": "1-3,22"},
+        {"name": "list", "interval": 60, "domains": ["b.com"], "ports": [443, 80]},
+    ]}))
+    assert [s["ports"] for s in scheduler.load_sets(str(path))] == [[1, 2, 3, 22], [80, 443]]
+    
+    for bad in ("1-70000", "http", [80, "x"], 8080):
+        path.write_text(json.dumps({"sets": [{"name": "bad", "interval": 60, "domains": ["a.com"], "ports": bad}]}))
+        with pytest.raises(ValueError):
+            scheduler.load_sets(str(path))
+        with pytest.raises(SystemExit):
+            scheduler.main([str(path)])
+
+def test_active_sets_require_consent(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"sets": [{"interval": 60, "domains": ["example.com"], "active": True}]}))
+    with pytest.raises(SystemExit):
+        scheduler.main([str(path)])
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from app.utils.singleflight import SingleFlight
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+    
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"score": 100}
+    
+    results = await asyncio.gather(*[flights.do("example.com", work) for _ in range(5)])
+    
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+    assert flights.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+async def test_completed_calls_are_not_reused():
+    flights = SingleFlight()
+    
+    async def work():
+        return 1
+    
+    await flights.do("a", work)
+    await flights.do("a", work)
+    
+    assert flights.executed == 2
+    assert flights.coalesced == 0
+
+async def test_errors_reach_every_caller():
+    flights = SingleFlight()
+    
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+    
+    results = await asyncio.gather(flights.do("a", work), flights.do("a", work), return_exceptions=True)
+    
+    assert [str(r) for r in results] == ["boom", "boom"]
+    assert flights.in_flight() == 0
+
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flights = SingleFlight()
+    
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    first = asyncio.create_task(flights.do("a", work))
+    second = asyncio.create_task(flights.do("a", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+import pytest
+from app.importtime import profile_imports, by_package
+
+# Deferred until first use (PDF export, certificate parse, target normalization, scanning)
+HEAVY = {"weasyprint", "cryptography", "tldextract", "httpx", "jinja2"}
+# The PDF, fleet statistics and templating stacks, which dominated the app's import time
+STARTUP_EXCLUDED = ("weasyprint", "numpy", "jinja2")
+
+@pytest.mark.parametrize("module", ["app.main", "app.utils.reports"])
+def test_cold_start_does_not_import_heavy_dependencies(module):
+    loaded = set(by_package(profile_imports(module)))
+    assert not loaded & HEAVY
+
+def test_bulk_cli_does_not_import_pdf_or_x509_stack():
+    loaded = set(by_package(profile_imports("app.scan")))
+    assert not loaded & {"weasyprint", "cryptography", "jinja2"}
+
+def test_app_startup_leaves_heavy_modules_unloaded():
+    # A fresh interpreter, so modules imported by other tests don't count
+    code = f"import sys, app.main; print(sorted(set({STARTUP_EXCLUDED!r}) & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
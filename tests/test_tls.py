@@ -1,6 +1,8 @@
 import pytest
-from app.scanner.tls_checker import check_tls
-from unittest.mock import patch, MagicMock
+import asyncio
+from app.scanner.tls_checker import check_tls, check_tls_async
+from app.scanner.limits import HostLimiter
+from unittest.mock import patch, MagicMock, AsyncMock
 import datetime
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
@@ -41,7 +43,7 @@ def test_check_tls_mock(mock_create_connection, mock_ssl_context):
     # But we want to test the logic inside check_tls.
     # Let's mock x509.load_der_x509_certificate
     
-    with patch("app.scanner.tls_checker.x509.load_der_x509_certificate") as mock_load:
+    with patch("cryptography.x509.load_der_x509_certificate") as mock_load:
         mock_cert = MagicMock()
         mock_load.return_value = mock_cert
         
@@ -62,3 +64,33 @@ def test_check_tls_mock(mock_create_connection, mock_ssl_context):
         assert results["score"] == 0
         assert any("expired" in f["description"] for f in results["findings"])
 
+
+async def test_check_tls_async_mock():
+    mock_ssl_object = MagicMock()
+    mock_ssl_object.version.return_value = "TLSv1.3"
+    mock_writer = MagicMock()
+    mock_writer.get_extra_info.return_value = mock_ssl_object
+    mock_writer.wait_closed = AsyncMock()
+    
+    with patch("asyncio.open_connection", new_callable=AsyncMock) as mock_conn, \
+         patch("cryptography.x509.load_der_x509_certificate") as mock_load:
+        mock_conn.return_value = (AsyncMock(), mock_writer)
+        mock_cert = MagicMock()
+        mock_load.return_value = mock_cert
+        mock_cert.not_valid_after = datetime.datetime.utcnow() + datetime.timedelta(days=10)
+        mock_cert.issuer.rfc4514_string.return_value = "CN=Trusted CA"
+        mock_cert.subject.rfc4514_string.return_value = "CN=mysite.com"
+        
+        results = await check_tls_async("https://mysite.com", HostLimiter(10, 1))
+        
+        # Same shape as the blocking checker: expiring soon costs half the score
+        assert results["score"] == 50
+        assert results["details"]["version"] == "TLSv1.3"
+        assert mock_conn.call_args.kwargs["server_hostname"] == "mysite.com"
+        mock_writer.close.assert_called_once()
+
+async def test_check_tls_async_timeout():
+    with patch("asyncio.open_connection", side_effect=asyncio.TimeoutError()):
+        results = await check_tls_async("https://mysite.com")
+        assert results["score"] == 0
+        assert "timed out" in results["error"]